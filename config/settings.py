@@ -36,6 +36,8 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
+        # Batch sub-so'rovlari tashqi so'rovda bir marta aniqlangan foydalanuvchini oladi (`project.multiplex`).
+        "project.multiplex.BatchAuthentication",
         "rest_framework.authentication.SessionAuthentication",
         "rest_framework.authentication.BasicAuthentication",
         "rest_framework_simplejwt.authentication.JWTAuthentication",
@@ -66,6 +68,8 @@ SWAGGER_SETTINGS = {
     # 'USE_SESSION_AUTH': False
 }
 
+OPENAPI_SCHEMA_FILE = BASE_DIR / "openapi.json"
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -101,15 +105,71 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # So'rovdagi o'zgarishlar va ularning sinxronlash jurnali (`project.sync`) bitta tranzaksiyada yoziladi.
+        "ATOMIC_REQUESTS": True,
     }
 }
 
+# `LocMemCache` har bir jarayonda alohida: `warm_cache` buyrug'i alohida ishga tushirilsa, server worker'lari
+# uni ko'rmaydi. Keshni `SERVER["WARM_CACHE"]` orqali master jarayonda fork'dan oldin isiting yoki bir nechta
+# server/host uchun umumiy backend (Redis, Memcached) sozlang.
 CACHES = {
     "default": {
         "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
     }
 }
 
+# `LocalBroker` faqat bitta jarayonda ishlaydi; bir nechta worker (`serve`) hodisalarni `DatabaseBroker` orqali ulashadi.
+LIVE_FEED = {
+    "BROKER": "project.events.DatabaseBroker",
+    "BACKLOG": 500,
+    "QUEUE_SIZE": 100,
+    "HEARTBEAT": 15,
+    "POLL_INTERVAL": 0.5,
+    "RETENTION": 3600,
+}
+
+COMMENT_ARCHIVE = {
+    "AFTER_DAYS": 180,
+    "BATCH_SIZE": 1000,
+}
+
+LESSON_MEDIA = {
+    "THUMBNAIL_SIZES": {"small": 160, "medium": 480, "large": 960},
+    "WORKERS": 2,
+}
+
+LESSON_PROGRESS = {
+    "FLUSH_INTERVAL": 5,
+    "MAX_BUFFER": 5000,
+}
+
+LEADERBOARD = {
+    "SIZE": 10,
+}
+
+BATCH_API = {
+    "MAX_REQUESTS": 20,
+    "WORKERS": 4,
+}
+
+SYNC = {
+    "PAGE_SIZE": 500,
+    "RETENTION_DAYS": 30,
+    # Eng uzun yozuvchi tranzaksiyadan katta bo'lishi kerak (qarang: `project.sync.get_settled_id`).
+    "SETTLE_SECONDS": 10,
+}
+
+SERVER = {
+    "BIND": "0.0.0.0:8000",
+    "WORKER_CLASS": "uvicorn.workers.UvicornWorker",
+    "MAX_REQUESTS": 1000,
+    "MAX_REQUESTS_JITTER": 100,
+    "TIMEOUT": 30,
+    "GRACEFUL_TIMEOUT": 30,
+    "WARM_CACHE": {"base_url": "http://localhost:8000", "time_budget": 30},
+}
+
 
 AUTH_PASSWORD_VALIDATORS = [
     # {
@@ -2,31 +2,16 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
-from drf_yasg import openapi
-from drf_yasg.views import get_schema_view
-from rest_framework import permissions
 
+from project.docs import schema_ui
 from project.views import logout_view
 
-schema_view = get_schema_view(
-    info=openapi.Info(
-        title="EduGround",
-        default_version="v1",
-        description="Test description",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contact@snippets.local"),
-        license=openapi.License(name="BSD License"),
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
-
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/", include("project.urls", namespace='v1')),
-    path("swagger/", schema_view.with_ui("swagger", cache_timeout=0), name="schema-swagger-ui"),
-    path("redoc/", schema_view.with_ui("redoc", cache_timeout=0), name="schema-redoc"),
+    path("swagger/", schema_ui("swagger"), name="schema-swagger-ui"),
+    path("redoc/", schema_ui("redoc"), name="schema-redoc"),
     path("auth/", include("rest_framework.urls")),
     path("logout/", logout_view, name="logout"),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
@@ -1,7 +1,118 @@
 from django.contrib import admin
+from django.core.files.storage import default_storage
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 
-from .models import Comment, Course, Lesson, Rating, User
+from .models import ArchivedComment, Change, Comment, Course, Lesson, LessonProgress, Rating, User
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Katta jadvallar uchun paginator: filtrsiz ro'yxatda PostgreSQL statistikasidan taxminiy sonni oladi.
+    """
+    estimate_threshold = 100_000
+
+    @cached_property
+    def count(self):
+        """
+        Filtr bo'lmasa `pg_class.reltuples` dan taxminiy sonni, aks holda aniq `COUNT(*)` ni qaytaradi.
+        """
+        queryset = self.object_list
+        connection = connections[queryset.db]
+
+        if connection.vendor == "postgresql" and not queryset.query.where:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT reltuples FROM pg_class WHERE relname = %s", [queryset.model._meta.db_table])
+                row = cursor.fetchone()
+
+            if row and row[0] >= self.estimate_threshold:
+                return int(row[0])
+
+        return super().count
+
+
+class InputFilter(admin.SimpleListFilter):
+    """
+    Barcha variantlarni yuklamasdan, qiymatni matn maydoni orqali qabul qiluvchi filtr.
+    """
+    template = "admin/input_filter.html"
+    lookup = None
+
+    def lookups(self, request, model_admin):
+        """
+        Variantlar ro'yxati yuklanmaydi.
+        """
+        return ()
+
+    def has_output(self):
+        """
+        Variantlar bo'lmasa ham filtr ko'rsatiladi.
+        """
+        return True
+
+    def get_facet_counts(self, pk_attname, filtered_qs):
+        """
+        "Sonlarni ko'rsatish" (`?_facets=True`) rejimida hisoblanadigan variant yo'q.
+        """
+        return {}
+
+    def choices(self, changelist):
+        """
+        Faqat "Hammasi" variantini va boshqa filtr parametrlarini qaytaradi.
+        """
+        all_choice = next(super().choices(changelist))
+        all_choice["query_parts"] = [
+            (key, value)
+            for key, values in changelist.get_filters_params().items()
+            for value in values
+            if key != self.parameter_name
+        ]
+        yield all_choice
+
+    def queryset(self, request, queryset):
+        """
+        Kiritilgan qiymat bo'yicha querysetni filtrlaydi.
+        """
+        value = (self.value() or "").strip()
+
+        if not value:
+            return queryset
+
+        return queryset.filter(**{self.lookup: value})
+
+
+class StudentEmailFilter(InputFilter):
+    title = "talaba emaili"
+    parameter_name = "student_email"
+    lookup = "students__email__iexact"
+
+
+class IdInputFilter(InputFilter):
+    """
+    ID bo'yicha filtr: raqam bo'lmagan qiymat bo'sh natija beradi.
+    """
+
+    def queryset(self, request, queryset):
+        value = (self.value() or "").strip()
+
+        if value and not value.isdigit():
+            return queryset.none()
+
+        return super().queryset(request, queryset)
+
+
+class LessonIdFilter(IdInputFilter):
+    title = "dars ID"
+    parameter_name = "lesson_id"
+    lookup = "lesson_id"
+
+
+class CourseIdFilter(IdInputFilter):
+    title = "kurs ID"
+    parameter_name = "course_id"
+    lookup = "course_id"
 
 
 @admin.register(User)
@@ -12,6 +123,8 @@ class UserAdmin(admin.ModelAdmin):
     list_per_page = 10
     list_filter = ["is_staff", "is_superuser", "date_joined"]
     ordering = ["date_joined"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     fieldsets = (
         ("Foydalanuvchi ma'lumotlari", {"fields": ("email", "first_name", "last_name")}),
@@ -25,24 +138,30 @@ class UserAdmin(admin.ModelAdmin):
 class CourseAdmin(admin.ModelAdmin):
     list_display = ["pk", "title", "description", "get_students"]
     search_fields = ["title", "description"]
-    list_filter = ["students"]
+    list_filter = [StudentEmailFilter]
     list_per_page = 10
     list_display_links = ["title"]
+    autocomplete_fields = ["students"]
 
     def get_students(self, obj):
-        return ", ".join([student.email for student in obj.students.all()])
+        return obj.student_count
 
-    get_students.short_description = "Foydalanuvchilar"
+    get_students.short_description = "Foydalanuvchilar soni"
+    get_students.admin_order_field = "student_count"
 
 
 @admin.register(Lesson)
 class LessonAdmin(admin.ModelAdmin):
     list_display = ["pk", "name", "course", "created_at", "view_video"]
     search_fields = ["name", "course__title"]
-    list_filter = ["course", "created_at"]
+    list_filter = [CourseIdFilter, "created_at"]
     list_display_links = ["name"]
+    list_select_related = ["course"]
+    autocomplete_fields = ["course"]
 
     def view_video(self, obj):
+        if obj.video and "small" in obj.thumbnails:
+            return format_html('<a href="{}" target="_blank"><img src="{}" alt="" height="40"></a>', obj.video.url, default_storage.url(obj.thumbnails["small"]))
         if obj.video:
             return format_html(f'<a href="{obj.video.url}" target="_blank">Videoni ko\'rish</a>')
         return "Video mavjud emas"
@@ -55,7 +174,27 @@ class LessonAdmin(admin.ModelAdmin):
 class CommentAdmin(admin.ModelAdmin):
     list_display = ["pk", "creator", "lesson", "short_text", "created_at"]
     search_fields = ["creator__email", "text", "lesson__name"]
-    list_filter = ["lesson", "created_at"]
+    list_filter = [LessonIdFilter, "created_at"]
+    list_select_related = ["creator", "lesson"]
+    autocomplete_fields = ["lesson", "creator"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def short_text(self, obj):
+        return obj.text[:50] + "..." if len(obj.text) > 50 else obj.text
+
+    short_text.short_description = "Izoh"
+
+
+@admin.register(ArchivedComment)
+class ArchivedCommentAdmin(admin.ModelAdmin):
+    list_display = ["pk", "creator", "lesson", "short_text", "created_at", "archived_at"]
+    search_fields = ["creator__email", "text"]
+    list_filter = [LessonIdFilter, "created_at"]
+    list_select_related = ["creator", "lesson"]
+    raw_id_fields = ["lesson", "creator"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def short_text(self, obj):
         return obj.text[:50] + "..." if len(obj.text) > 50 else obj.text
@@ -67,4 +206,28 @@ class CommentAdmin(admin.ModelAdmin):
 class RatingAdmin(admin.ModelAdmin):
     list_display = ["pk", "lesson", "creator", "liked"]
     search_fields = ["lesson__name", "creator__email"]
-    list_filter = ["liked", "lesson"]
+    list_filter = ["liked", LessonIdFilter]
+    list_select_related = ["creator", "lesson"]
+    autocomplete_fields = ["lesson", "creator"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(LessonProgress)
+class LessonProgressAdmin(admin.ModelAdmin):
+    list_display = ["pk", "user", "lesson", "position", "completed", "updated_at"]
+    search_fields = ["user__email", "lesson__name"]
+    list_filter = [LessonIdFilter, "completed"]
+    list_select_related = ["user", "lesson"]
+    raw_id_fields = ["user", "lesson"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(Change)
+class ChangeAdmin(admin.ModelAdmin):
+    list_display = ["pk", "kind", "object_id", "course_id", "user_id", "deleted", "created_at"]
+    list_filter = ["kind", "deleted"]
+    search_fields = ["=object_id", "=course_id"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import sync
+from .models import ArchivedComment, Change, Comment, Lesson
+
+DEFAULTS = {
+    "AFTER_DAYS": 180,
+    "BATCH_SIZE": 1000,
+}
+
+
+def get_setting(name):
+    """
+    `COMMENT_ARCHIVE` sozlamasidan qiymatni, bo'lmasa standart qiymatni qaytaradi.
+    """
+    return getattr(settings, "COMMENT_ARCHIVE", {}).get(name, DEFAULTS[name])
+
+
+def delete_comments(ids):
+    """
+    Izohlarni signallarsiz bitta `DELETE` bilan o'chiradi.
+    """
+    table = connection.ops.quote_name(Comment._meta.db_table)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table} WHERE id IN ({', '.join(['%s'] * len(ids))})", ids)
+
+
+def archive_batch(cutoff, batch_size):
+    """
+    `cutoff` dan eski izohlarning bitta bo'lagini arxiv jadvaliga ko'chiradi.
+
+    Izohlar o'chirilmayapti, balki ko'chirilyapti: `comment.deleted` hodisalari yuborilmaydi va har bir izoh uchun
+    signal ishlamaydi. `comments_count` arxivdagi izohlarni ham sanaydi, shuning uchun u va reyting jadvallari
+    o'zgarmaydi. Dars javobidan izohlar chiqib ketadi: dars versiyasi oshiriladi va sinxronlash jurnaliga
+    bo'lak uchun bir yo'la o'chirish yozuvlari tushadi.
+
+    Returns:
+    - Ko'chirilgan izohlar soni.
+    """
+    with transaction.atomic():
+        rows = list(
+            Comment.objects.filter(created_at__lt=cutoff)
+            .order_by("id")
+            .values("id", "lesson_id", "creator_id", "text", "created_at", course_id=F("lesson__course_id"))[:batch_size]
+        )
+
+        if not rows:
+            return 0
+
+        lesson_courses = {row["lesson_id"]: row.pop("course_id") for row in rows}
+
+        ArchivedComment.objects.bulk_create([ArchivedComment(**row) for row in rows], ignore_conflicts=True)
+        delete_comments([row["id"] for row in rows])
+
+        Lesson.touch(*lesson_courses)
+        sync.record_many([Change(kind=Change.COMMENT, object_id=row["id"], course_id=lesson_courses[row["lesson_id"]], deleted=True) for row in rows])
+
+    return len(rows)
+
+
+def archive_comments(older_than=None, batch_size=None, max_batches=None):
+    """
+    Eski izohlarni bo'laklab arxivga ko'chiradi; har bir bo'lak alohida tranzaksiyada.
+
+    Returns:
+    - Jami ko'chirilgan izohlar soni.
+    """
+    older_than = older_than or timedelta(days=get_setting("AFTER_DAYS"))
+    batch_size = batch_size or get_setting("BATCH_SIZE")
+    cutoff = timezone.now() - older_than
+
+    total = 0
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(cutoff, batch_size)
+
+        if not moved:
+            break
+
+        total += moved
+        batches += 1
+
+    return total
+
+
+def get_comment_history(lesson_id, before=None, limit=50):
+    """
+    Dars izohlarini yangidan eskiga qarab `id` bo'yicha (keyset) qaytaradi.
+
+    Avval asosiy jadvaldan, u tugasa arxivdan o'qiydi - mijoz uchun bu bitta uzluksiz ro'yxat.
+
+    Returns:
+    - `(comments, has_more)`
+    """
+    hot = Comment.objects.filter(lesson_id=lesson_id).select_related("creator")
+    cold = ArchivedComment.objects.filter(lesson_id=lesson_id).select_related("creator")
+
+    if before is not None:
+        hot = hot.filter(id__lt=before)
+        cold = cold.filter(id__lt=before)
+
+    comments = list(hot.order_by("-id")[: limit + 1])
+
+    if len(comments) <= limit:
+        comments += list(cold.order_by("-id")[: limit + 1 - len(comments)])
+
+    return comments[:limit], len(comments) > limit
@@ -0,0 +1,111 @@
+from functools import wraps
+from hashlib import md5
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def get_response_cache_key(request, etag):
+    """
+    Javob keshi kaliti: host, javob formati va resurs versiyasini bildiruvchi ETag dan tuziladi.
+
+    ETag resurs o'zgarganda o'zgaradi, shuning uchun eski yozuvlarni alohida o'chirish shart emas.
+    """
+    return ":".join(["response", request.get_host(), request.accepted_renderer.format, etag.strip('"')])
+
+
+def conditional_cache(timeout):
+    """
+    `list`/`retrieve` uchun dekorator.
+
+    - `If-None-Match`/`If-Modified-Since` mos kelsa, serializer ishga tushmasdan `304` qaytaradi.
+    - Aks holda serializer natijasini ETag asosidagi kalit bilan keshdan oladi yoki keshga yozadi.
+    - Javobga `ETag`, `Last-Modified` (view uni bersa) va `X-Cache` (`HIT`/`MISS`) sarlavhalarini qo'shadi.
+    - View `get_content_encoding(request)` ni bersa (masalan, gzip oqim), ETag ga kodlash qo'shimchasi qo'shiladi
+      va javobga (`304` ham) `Vary: Accept-Encoding` yoziladi: siqilgan va siqilmagan javoblar bir xil ETag olmaydi.
+    """
+
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            etag, last_modified = self.get_conditional_validators()
+
+            if etag is None:
+                return view_method(self, request, *args, **kwargs)
+
+            encoding = self.get_content_encoding(request) if hasattr(self, "get_content_encoding") else None
+
+            if encoding not in (None, "identity"):
+                etag = f'{etag[:-1]}-{encoding}"'
+
+            last_modified = int(last_modified.timestamp()) if last_modified else None
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+            if response is not None:
+                if encoding is not None:
+                    patch_vary_headers(response, ["Accept-Encoding"])
+
+                return response
+
+            key = get_response_cache_key(request, etag)
+            data = cache.get(key)
+
+            if data is not None:
+                response = Response(data)
+                response["X-Cache"] = "HIT"
+            else:
+                response = view_method(self, request, *args, **kwargs)
+
+                if isinstance(response, Response) and response.status_code == status.HTTP_200_OK:
+                    cache.set(key, response.data, timeout)
+                    response["X-Cache"] = "MISS"
+
+            if response.status_code == status.HTTP_200_OK:
+                response["ETag"] = etag
+
+                if last_modified:
+                    response["Last-Modified"] = http_date(last_modified)
+
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+class ConditionalGetMixin:
+    """
+    ConditionalGetMixin
+
+    `version` va `updated_at` maydonlari bor modellar uchun arzon ETag/Last-Modified hisoblaydi:
+    bitta ob'ekt uchun bitta qatorni, ro'yxat uchun esa bitta agregat so'rovni o'qiydi.
+
+    Ro'yxat uchun `Last-Modified` berilmaydi: `Max("updated_at")` qator ro'yxatdan chiqqanda (o'chirish,
+    kursdan chiqarish) o'zgarmaydi va `If-Modified-Since` eskirgan `304` qaytaradi. Ro'yxat faqat ETag
+    (qatorlar soni, versiyalar yig'indisi va oxirgi `pk`) bilan tekshiriladi.
+    """
+
+    def get_conditional_validators(self):
+        """
+        Joriy so'rov uchun `(etag, last_modified)` ni qaytaradi (ro'yxat uchun `last_modified` - `None`); ob'ekt topilmasa `(None, None)`.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        model_name = queryset.model._meta.model_name
+
+        if self.detail:
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            row = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]}).values("pk", "version", "updated_at").first()
+
+            if row is None:
+                return None, None
+
+            return quote_etag(f"{model_name}-{row['pk']}-{row['version']}"), row["updated_at"]
+
+        summary = queryset.aggregate(total=Count("pk"), versions=Sum("version"), last_id=Max("pk"))
+        key = f"{model_name}:{self.request.user.pk}:{self.request.get_full_path()}:{summary['total']}:{summary['versions']}:{summary['last_id']}"
+
+        return quote_etag(md5(key.encode(), usedforsecurity=False).hexdigest()), None
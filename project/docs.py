@@ -0,0 +1,77 @@
+from functools import cache
+
+from django.conf import settings
+from django.core.cache import cache as django_cache
+from django.http import HttpResponse
+
+SCHEMA_CACHE_KEY = "openapi-schema"
+
+
+def get_info():
+    """
+    API haqida umumiy ma'lumot (Swagger/ReDoc sarlavhasi).
+    """
+    from drf_yasg import openapi
+
+    return openapi.Info(
+        title="EduGround",
+        default_version="v1",
+        description="Test description",
+        terms_of_service="https://www.google.com/policies/terms/",
+        contact=openapi.Contact(email="contact@snippets.local"),
+        license=openapi.License(name="BSD License"),
+    )
+
+
+def generate_schema():
+    """
+    Barcha viewsetlarni tahlil qilib, OpenAPI sxemasini JSON (bytes) ko'rinishida yaratadi.
+    """
+    from drf_yasg.codecs import OpenAPICodecJson
+    from drf_yasg.generators import OpenAPISchemaGenerator
+
+    schema = OpenAPISchemaGenerator(info=get_info()).get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def get_schema():
+    """
+    Sxemani keshdan, bo'lmasa `OPENAPI_SCHEMA_FILE` faylidan, u ham bo'lmasa birinchi so'rovda yaratib qaytaradi.
+    """
+    schema = django_cache.get(SCHEMA_CACHE_KEY)
+
+    if schema is None:
+        path = settings.OPENAPI_SCHEMA_FILE
+        schema = path.read_bytes() if path.exists() else generate_schema()
+        django_cache.set(SCHEMA_CACHE_KEY, schema, timeout=None)
+
+    return schema
+
+
+@cache
+def get_ui_view(renderer):
+    """
+    drf_yasg UI view'ini birinchi murojaatda import qilib yaratadi.
+    """
+    from drf_yasg.views import get_schema_view
+    from rest_framework import permissions
+
+    schema_view = get_schema_view(info=get_info(), public=True, permission_classes=(permissions.AllowAny,))
+    return schema_view.with_ui(renderer, cache_timeout=0)
+
+
+def schema_ui(renderer):
+    """
+    Swagger/ReDoc sahifasi uchun view.
+
+    Sahifaning o'zi drf_yasg orqali (sxemasiz) chiziladi, `?format=openapi` so'rovi esa
+    oldindan tayyorlangan sxemani qaytaradi - viewsetlar har safar qayta tahlil qilinmaydi.
+    """
+
+    def view(request, *args, **kwargs):
+        if request.GET.get("format") == "openapi":
+            return HttpResponse(get_schema(), content_type="application/json")
+
+        return get_ui_view(renderer)(request, *args, **kwargs)
+
+    return view
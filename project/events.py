@@ -0,0 +1,384 @@
+import asyncio
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import LiveEvent
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "BROKER": "project.events.LocalBroker",
+    "BACKLOG": 500,
+    "QUEUE_SIZE": 100,
+    "HEARTBEAT": 15,
+    "RETRY": 3000,
+    "POLL_INTERVAL": 0.5,
+    "RETENTION": 3600,
+}
+
+
+def get_setting(name):
+    """
+    `LIVE_FEED` sozlamasidan qiymatni, bo'lmasa standart qiymatni qaytaradi.
+    """
+    return getattr(settings, "LIVE_FEED", {}).get(name, DEFAULTS[name])
+
+
+def lesson_channel(lesson_id):
+    """
+    Dars uchun kanal nomini qaytaradi.
+    """
+    return f"lesson:{lesson_id}"
+
+
+def make_event_id(epoch, seq):
+    return f"{epoch}-{seq}"
+
+
+def parse_event_id(value):
+    """
+    `Last-Event-ID` ni `(epoch, seq)` ko'rinishiga o'giradi (noto'g'ri qiymat uchun `None`).
+    """
+    epoch, _, seq = str(value).partition("-")
+
+    if not epoch.isdigit() or not seq.isdigit():
+        return None
+
+    return int(epoch), int(seq)
+
+
+class BaseBroker:
+    """
+    Hodisalarni jarayonlar orasida tarqatuvchi broker interfeysi.
+
+    Broker har bir hodisaga `epoch-seq` ko'rinishidagi `id` beradi va uni barcha obunachilarga (`subscribe`) yetkazadi.
+    `epoch` broker ishga tushgan vaqt (ms): jarayon qayta ishga tushsa `seq` 1 dan boshlanadi, lekin eski `id` lar
+    boshqa `epoch` ga tegishli bo'lgani uchun noma'lum deb topiladi va mijozga `reset` yuboriladi.
+
+    `floor` - shu jarayonga yetkazilgani kafolatlangan hodisalar chegarasi: `seq` i undan katta barcha hodisalar
+    `deliver` orqali o'tadi. Undan eski `Last-Event-ID` bilan ulangan mijozga `reset` yuboriladi.
+    """
+
+    floor = 0
+
+    def __init__(self):
+        self.callbacks = []
+        self.epoch = time.time_ns() // 1_000_000
+
+    def subscribe(self, callback):
+        """
+        Yetkazilgan hodisalarni qabul qiluvchi funksiyani ro'yxatga oladi.
+        """
+        self.callbacks.append(callback)
+
+    def publish(self, channel, event_type, data):
+        """
+        Hodisani brokerga yuboradi.
+        """
+        raise NotImplementedError
+
+    def deliver(self, event):
+        """
+        Hodisani barcha obunachilarga yetkazadi.
+        """
+        for callback in self.callbacks:
+            callback(event)
+
+
+class LocalBroker(BaseBroker):
+    """
+    Bitta jarayon ichida ishlaydigan broker (testlar va bitta worker uchun).
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, event_type, data):
+        with self._lock:
+            seq = next(self._ids)
+
+        event = {"id": make_event_id(self.epoch, seq), "seq": seq, "channel": channel, "type": event_type, "data": data}
+
+        self.deliver(event)
+
+
+class DatabaseBroker(BaseBroker):
+    """
+    Hodisalarni `LiveEvent` jadvali orqali barcha worker jarayonlariga tarqatuvchi broker.
+
+    `publish` hodisani jadvalga yozadi, har bir jarayon esa jadvalni `POLL_INTERVAL` soniyada o'qib, yangi
+    hodisalarni o'z obunachilariga yetkazadi (o'zi e'lon qilganlarini ham). `seq` - jadval `id` si: u barcha
+    worker'larda bir xil, shuning uchun `epoch` doimiy va boshqa worker'ga qayta ulangan mijoz `Last-Event-ID`
+    bo'yicha davom etadi. Jarayon ishga tushganda oxirgi `BACKLOG` ta hodisani o'qiydi. `id` lar tasdiqlash
+    tartibida kelmasligi mumkin: o'tkazib yuborilgan `id` lar `RETENTION` davomida qayta so'raladi.
+    """
+
+    epoch = 0
+
+    # O'tkazib yuborilgan `id` ni (bekor qilingan yoki hali tasdiqlanmagan yozuv) necha soniya kutish.
+    gap_timeout = 10
+
+    def __init__(self):
+        self.callbacks = []
+        self.last_id = None
+        self.gaps = {}
+        self.pruned_at = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self, callback):
+        super().subscribe(callback)
+
+        if get_setting("POLL_INTERVAL"):
+            self.start()
+
+    def publish(self, channel, event_type, data):
+        LiveEvent.objects.create(channel=channel, type=event_type, data=data)
+
+    def start(self):
+        """
+        So'rash oqimini (bir marta) ishga tushiradi.
+        """
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name="live-feed-poll", daemon=True)
+                self._thread.start()
+
+    def run(self):
+        while True:
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Jonli lenta hodisalari o'qilmadi")
+                connections.close_all()
+
+            time.sleep(get_setting("POLL_INTERVAL"))
+
+    def poll(self):
+        """
+        Jadvaldagi yangi hodisalarni obunachilarga yetkazadi.
+
+        Returns:
+        - Yetkazilgan hodisalar soni.
+        """
+        if self.last_id is None:
+            rows = list(LiveEvent.objects.order_by("-id")[:get_setting("BACKLOG")])[::-1]
+            self.floor = rows[0].id - 1 if rows else 0
+        else:
+            rows = list(LiveEvent.objects.filter(Q(id__gt=self.last_id) | Q(id__in=self.gaps)).order_by("id"))
+
+        now = time.monotonic()
+        self.gaps = {pk: since for pk, since in self.gaps.items() if now - since < self.gap_timeout}
+
+        for row in rows:
+            self.gaps.pop(row.id, None)
+
+            if self.last_id is not None and self.last_id < row.id <= self.last_id + get_setting("BACKLOG"):
+                self.gaps.update(dict.fromkeys(range(self.last_id + 1, row.id), now))
+
+            self.last_id = row.id if self.last_id is None else max(self.last_id, row.id)
+            self.deliver({"id": make_event_id(self.epoch, row.id), "seq": row.id, "channel": row.channel, "type": row.type, "data": row.data})
+
+        if self.last_id is None:
+            self.last_id = 0
+
+        if now - self.pruned_at > 60:
+            LiveEvent.objects.filter(created_at__lt=timezone.now() - timedelta(seconds=get_setting("RETENTION"))).delete()
+            self.pruned_at = now
+
+        return len(rows)
+
+
+class Subscription:
+    """
+    Bitta SSE ulanishining hodisalar navbati.
+
+    Navbat to'lib qolsa (mijoz sekin o'qisa), navbat tozalanadi va `None` qo'yiladi - ulanish yopiladi,
+    mijoz esa `Last-Event-ID` bilan qayta ulanib, qolgan hodisalarni backlogdan oladi.
+    """
+
+    def __init__(self, channel, loop, maxsize):
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def push(self, event):
+        """
+        Hodisani navbatga qo'yadi (faqat event loop oqimida chaqiriladi).
+        """
+        if self.overflowed:
+            return
+
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+            while not self.queue.empty():
+                self.queue.get_nowait()
+
+            self.queue.put_nowait(None)
+
+
+class EventBus:
+    """
+    Jarayon ichidagi pub/sub: brokerdan kelgan hodisalarni kanal obunachilariga tarqatadi
+    va qayta ulanish uchun har bir kanalning oxirgi hodisalarini saqlaydi.
+    """
+
+    def __init__(self, broker, backlog=DEFAULTS["BACKLOG"], queue_size=DEFAULTS["QUEUE_SIZE"]):
+        self.broker = broker
+        self.queue_size = queue_size
+        self.backlogs = defaultdict(lambda: deque(maxlen=backlog))
+        self.trimmed = {}
+        self.subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+        broker.subscribe(self.dispatch)
+
+    def publish(self, channel, event_type, data):
+        """
+        Hodisani broker orqali e'lon qiladi.
+        """
+        self.broker.publish(channel, event_type, data)
+
+    def dispatch(self, event):
+        """
+        Brokerdan kelgan hodisani backlogga yozadi va kanal obunachilariga yuboradi.
+        """
+        channel = event["channel"]
+
+        with self._lock:
+            backlog = self.backlogs[channel]
+
+            if len(backlog) == backlog.maxlen:
+                self.trimmed[channel] = backlog[0]["seq"]
+
+            backlog.append(event)
+            subscribers = list(self.subscribers[channel])
+
+        for subscription in subscribers:
+            subscription.loop.call_soon_threadsafe(subscription.push, event)
+
+    def subscribe(self, channel, last_event_id=None):
+        """
+        Kanalga obuna bo'ladi.
+
+        Returns:
+        - `(subscription, missed, complete)`: obuna, `last_event_id` dan keyingi hodisalar
+          va ular to'liqligini bildiruvchi bayroq. `last_event_id` noma'lum bo'lsa (boshqa `epoch`,
+          noto'g'ri format yoki hali berilmagan `seq`), `complete` - `False`.
+        """
+        subscription = Subscription(channel, asyncio.get_running_loop(), self.queue_size)
+
+        with self._lock:
+            backlog = list(self.backlogs[channel])
+            trimmed = self.trimmed.get(channel)
+            self.subscribers[channel].add(subscription)
+
+        if last_event_id is None:
+            return subscription, [], True
+
+        parsed = parse_event_id(last_event_id)
+
+        if parsed is None or parsed[0] != self.broker.epoch:
+            return subscription, [], False
+
+        seq = parsed[1]
+        latest = max((event["seq"] for event in backlog), default=0)
+        missed = sorted((event for event in backlog if event["seq"] > seq), key=lambda event: event["seq"])
+        complete = self.broker.floor <= seq <= latest and (trimmed is None or seq >= trimmed)
+
+        return subscription, missed, complete
+
+    def unsubscribe(self, subscription):
+        """
+        Obunani bekor qiladi.
+        """
+        with self._lock:
+            self.subscribers[subscription.channel].discard(subscription)
+
+            if not self.subscribers[subscription.channel]:
+                del self.subscribers[subscription.channel]
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def get_bus():
+    """
+    Sozlamalardagi broker bilan yaratilgan yagona `EventBus` ni qaytaradi.
+    """
+    global _bus
+
+    if _bus is None:
+        with _bus_lock:
+            if _bus is None:
+                broker = import_string(get_setting("BROKER"))()
+                _bus = EventBus(broker, backlog=get_setting("BACKLOG"), queue_size=get_setting("QUEUE_SIZE"))
+
+    return _bus
+
+
+def publish(channel, event_type, data):
+    """
+    Hodisani kanalga e'lon qiladi.
+    """
+    get_bus().publish(channel, event_type, data)
+
+
+def format_event(event):
+    """
+    Hodisani SSE formatidagi matnga aylantiradi.
+    """
+    data = json.dumps(event["data"], cls=DjangoJSONEncoder)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+
+async def stream(channel, last_event_id=None):
+    """
+    Kanal hodisalarini SSE oqimi sifatida qaytaradi: o'tkazib yuborilgan hodisalar, keyin yangilari va heartbeat.
+    """
+    bus = get_bus()
+    heartbeat = get_setting("HEARTBEAT")
+    subscription, missed, complete = bus.subscribe(channel, last_event_id)
+
+    try:
+        yield f"retry: {get_setting('RETRY')}\n\n"
+
+        if not complete:
+            yield "event: reset\ndata: {}\n\n"
+
+        for event in missed:
+            yield format_event(event)
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": heartbeat\n\n"
+                continue
+
+            if event is None:
+                yield "event: overflow\ndata: {}\n\n"
+                break
+
+            yield format_event(event)
+    finally:
+        bus.unsubscribe(subscription)
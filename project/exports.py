@@ -0,0 +1,115 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+
+from .models import ArchivedComment, Comment, Course, Rating
+
+EXPORT_FIELDS = {
+    "comments": ["id", "course_id", "lesson_id", "creator_id", "text", "created_at"],
+    "ratings": ["id", "course_id", "lesson_id", "creator_id", "liked"],
+    "enrollments": ["id", "course_id", "user_id"],
+}
+
+# `since`/`until` bo'yicha filtrlanadigan vaqt maydonlari (baholar va kursga yozilishlarda vaqt maydoni yo'q).
+TIMESTAMP_FIELDS = {
+    "comments": "created_at",
+}
+
+
+def get_export_queryset(kind, course_id=None, since=None, until=None, after_id=None):
+    """
+    Eksport uchun faqat kerakli ustunlarni `id` bo'yicha tartiblangan holda qaytaruvchi queryset.
+
+    Izohlar eksporti arxivlangan izohlarni ham o'z ichiga oladi (`UNION`): arxivga ko'chirilgan izoh asl `id`
+    bilan qoladi, shuning uchun `after_id` bo'yicha davom ettirish ikkala jadvalda ham ishlaydi.
+    `since`/`until` faqat `TIMESTAMP_FIELDS` dagi turlarga qo'llanadi; boshqa turlar uchun berilsa `ValueError`.
+    """
+    if (since is not None or until is not None) and kind not in TIMESTAMP_FIELDS:
+        raise ValueError(f"{kind} eksportini vaqt bo'yicha filtrlash mumkin emas")
+
+    filters = {"course_id": course_id, "since": since, "until": until, "after_id": after_id}
+
+    if kind == "comments":
+        querysets = [Comment.objects.all(), ArchivedComment.objects.all()]
+    elif kind == "ratings":
+        querysets = [Rating.objects.all()]
+    elif kind == "enrollments":
+        querysets = [Course.students.through.objects.all()]
+    else:
+        raise ValueError(f"Noma'lum eksport turi: {kind}")
+
+    querysets = [filter_export_queryset(kind, queryset, **filters).values_list(*EXPORT_FIELDS[kind]) for queryset in querysets]
+    queryset = querysets[0].union(*querysets[1:]) if len(querysets) > 1 else querysets[0]
+
+    return queryset.order_by("id")
+
+
+def filter_export_queryset(kind, queryset, course_id=None, since=None, until=None, after_id=None):
+    if kind != "enrollments":
+        queryset = queryset.annotate(course_id=F("lesson__course_id"))
+
+    if course_id is not None:
+        queryset = queryset.filter(course_id=course_id)
+
+    if since is not None:
+        queryset = queryset.filter(**{f"{TIMESTAMP_FIELDS[kind]}__gte": since})
+
+    if until is not None:
+        queryset = queryset.filter(**{f"{TIMESTAMP_FIELDS[kind]}__lt": until})
+
+    if after_id is not None:
+        queryset = queryset.filter(id__gt=after_id)
+
+    return queryset
+
+
+def iter_rows(kind, chunk_size=2000, **filters):
+    """
+    Eksport qatorlarini server tomonida bo'laklab o'qiydi.
+    """
+    return get_export_queryset(kind, **filters).iterator(chunk_size=chunk_size)
+
+
+class Echo:
+    """
+    `csv.writer` uchun yozilgan qatorni shunchaki qaytaruvchi "fayl".
+    """
+
+    def write(self, value):
+        return value
+
+
+def iter_ndjson(kind, rows):
+    """
+    Qatorlarni NDJSON (har bir qatorda bitta JSON ob'ekt) ko'rinishida qaytaradi.
+    """
+    fields = EXPORT_FIELDS[kind]
+
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def iter_csv(kind, rows):
+    """
+    Qatorlarni sarlavhali CSV ko'rinishida qaytaradi.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS[kind])
+
+    for row in rows:
+        yield writer.writerow(row)
+
+
+FORMATTERS = {
+    "ndjson": iter_ndjson,
+    "csv": iter_csv,
+}
+
+
+def export(kind, file_format="ndjson", chunk_size=2000, **filters):
+    """
+    Kurs faoliyatini (izohlar, baholar, yozilishlar) tanlangan formatda satrma-satr qaytaradi.
+    """
+    return FORMATTERS[file_format](kind, iter_rows(kind, chunk_size=chunk_size, **filters))
@@ -0,0 +1,77 @@
+from django.conf import settings
+
+from .models import Lesson, wilson_score
+
+DEFAULTS = {
+    "SIZE": 10,
+}
+
+# Metrika va uni saqlovchi (indekslangan) `Lesson` maydoni.
+METRICS = {
+    "rating": "rating_score",
+    "comments": "comments_count",
+}
+
+ENTRY_FIELDS = ["pk", "name", "course_id", "likes_count", "ratings_count", "comments_count"]
+
+
+def get_setting(name):
+    """
+    `LEADERBOARD` sozlamasidan qiymatni, bo'lmasa standart qiymatni qaytaradi.
+    """
+    return getattr(settings, "LEADERBOARD", {}).get(name, DEFAULTS[name])
+
+
+def make_entry(pk, name, course_id, likes_count, ratings_count, comments_count):
+    """
+    Reyting jadvali elementi.
+    """
+    return {
+        "lesson": pk,
+        "name": name,
+        "course": course_id,
+        "rating": likes_count / ratings_count * 100 if ratings_count else 0,
+        "ratings_count": ratings_count,
+        "comments_count": comments_count,
+    }
+
+
+def get_top(metric, course_id=None, limit=None):
+    """
+    Jadvalning eng yaxshi `limit` ta darsini (ball teng bo'lsa - kichik `id` birinchi) qaytaradi.
+
+    Ballar (`rating_score`, `comments_count`) baho yoki izoh bilan bir tranzaksiyada atomar yangilanadi, shuning
+    uchun barcha worker'lar bir xil jadvalni ko'radi. O'qish - indeks bo'yicha bitta `LIMIT` so'rovi: so'rov
+    yo'lida qayta qurish yoki keshni isitish yo'q.
+    """
+    lessons = Lesson.objects.order_by(f"-{METRICS[metric]}", "pk")
+
+    if course_id is not None:
+        lessons = lessons.filter(course_id=course_id)
+
+    return [make_entry(*row) for row in lessons.values_list(*ENTRY_FIELDS)[:limit or get_setting("SIZE")]]
+
+
+def reconcile(course_id=None, batch_size=2000):
+    """
+    `rating_score` ni saqlangan baho hisoblagichlaridan qayta hisoblaydi (`course_id` berilsa - faqat shu kurs darslari).
+
+    Odatda kerak emas: formula o'zgarganda yoki hisoblagichlar qo'lda tuzatilgandan keyin ishga tushiriladi.
+
+    Returns:
+    - Bali o'zgargan darslar soni.
+    """
+    lessons = Lesson.objects.order_by()
+
+    if course_id is not None:
+        lessons = lessons.filter(course_id=course_id)
+
+    changed = [
+        Lesson(pk=pk, rating_score=score)
+        for pk, likes_count, ratings_count, rating_score in lessons.values_list("pk", "likes_count", "ratings_count", "rating_score").iterator(chunk_size=batch_size)
+        if (score := wilson_score(likes_count, ratings_count)) != rating_score
+    ]
+
+    Lesson.objects.bulk_update(changed, ["rating_score"], batch_size=batch_size)
+
+    return len(changed)
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from project.archive import archive_comments, get_setting
+
+
+class Command(BaseCommand):
+    """
+    Eski izohlarni arxiv jadvaliga bo'laklab ko'chiradi.
+    """
+
+    help = "Belgilangan kundan eski izohlarni ArchivedComment jadvaliga ko'chiradi."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=get_setting("AFTER_DAYS"), help="Shu kundan eski izohlar arxivlanadi.")
+        parser.add_argument("--batch-size", type=int, default=get_setting("BATCH_SIZE"))
+        parser.add_argument("--max-batches", type=int, help="Bir ishga tushirishda ko'pi bilan shuncha bo'lak.")
+
+    def handle(self, *args, days, batch_size, max_batches, **options):
+        moved = archive_comments(older_than=timedelta(days=days), batch_size=batch_size, max_batches=max_batches)
+
+        self.stdout.write(self.style.SUCCESS(f"Arxivga ko'chirildi: {moved} ta izoh"))
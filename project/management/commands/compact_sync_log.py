@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from project.sync import compact, get_setting
+
+
+class Command(BaseCommand):
+    """
+    Sinxronlash jurnalini ixchamlaydi.
+    """
+
+    help = "Sinxronlash jurnalida har bir ob'ekt uchun oxirgi yozuvni qoldiradi va eski yozuvlarni o'chiradi (davriy ishga tushirish uchun)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=get_setting("RETENTION_DAYS"), help="Shu kundan eski yozuvlar o'chiriladi.")
+        parser.add_argument("--batch-size", type=int, default=get_setting("BATCH_SIZE"))
+
+    def handle(self, *args, days, batch_size, **options):
+        deleted = compact(retention_days=days, batch_size=batch_size)
+
+        self.stdout.write(self.style.SUCCESS(f"O'chirildi: {deleted} ta yozuv"))
@@ -0,0 +1,55 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_datetime
+
+from project import exports
+
+
+class Command(BaseCommand):
+    """
+    Kurs faoliyatini (izohlar, baholar, yozilishlar) NDJSON yoki CSV faylga eksport qiladi.
+    """
+
+    help = "Izohlar, baholar yoki kursga yozilishlarni NDJSON/CSV ko'rinishida eksport qiladi."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=sorted(exports.EXPORT_FIELDS))
+        parser.add_argument("--format", dest="file_format", choices=sorted(exports.FORMATTERS), default="ndjson")
+        parser.add_argument("--course", type=int)
+        parser.add_argument("--since", help="ISO 8601 vaqt (faqat izohlar uchun).")
+        parser.add_argument("--until", help="ISO 8601 vaqt (faqat izohlar uchun).")
+        parser.add_argument("--after-id", type=int, help="Shu id dan keyingi qatorlardan davom ettirish.")
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument("--output", "-o", help="Fayl yo'li (ko'rsatilmasa stdout).")
+
+    def parse_datetime(self, value):
+        if value is None:
+            return None
+
+        parsed = parse_datetime(value)
+
+        if parsed is None:
+            raise CommandError(f"Vaqt noto'g'ri: {value}")
+
+        return parsed
+
+    def handle(self, *args, kind, file_format, course, since, until, after_id, chunk_size, output, **options):
+        content = exports.export(
+            kind,
+            file_format=file_format,
+            chunk_size=chunk_size,
+            course_id=course,
+            since=self.parse_datetime(since),
+            until=self.parse_datetime(until),
+            after_id=after_id,
+        )
+
+        stream = open(output, "w", newline="", encoding="utf-8") if output else sys.stdout
+
+        try:
+            for line in content:
+                stream.write(line)
+        finally:
+            if output:
+                stream.close()
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from project import media
+from project.models import Lesson
+
+
+class Command(BaseCommand):
+    """
+    Mavjud darslar fayllari uchun thumbnail va metadata yaratadi.
+    """
+
+    help = "Hosilalari yo'q (yoki --all bilan barcha) darslar uchun thumbnail va metadata yaratadi."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Tayyor hosilalarni ham qayta yaratish.")
+        parser.add_argument("--sync", action="store_true", help="Jarayonlar puliga yubormasdan shu jarayonda bajarish.")
+
+    def handle(self, *args, all, sync, **options):
+        lessons = Lesson.objects.exclude(video="")
+
+        if not all:
+            lessons = lessons.exclude(media_status=Lesson.MEDIA_READY)
+
+        lesson_ids = list(lessons.values_list("pk", flat=True))
+
+        if sync or not media.get_setting("WORKERS"):
+            for lesson_id in lesson_ids:
+                media.generate_derivatives(lesson_id)
+        else:
+            executor = media.get_executor()
+            list(executor.map(media.generate_derivatives, lesson_ids))
+
+        self.stdout.write(self.style.SUCCESS(f"Hosilalar yaratildi: {len(lesson_ids)} ta dars"))
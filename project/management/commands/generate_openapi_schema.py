@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from project.docs import SCHEMA_CACHE_KEY, generate_schema
+
+
+class Command(BaseCommand):
+    """
+    OpenAPI sxemasini oldindan yaratib, faylga yozadi (deploy vaqtida ishga tushiriladi).
+    """
+
+    help = "OpenAPI sxemasini yaratib, OPENAPI_SCHEMA_FILE fayliga yozadi."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", "-o", help="Fayl yo'li (standart: settings.OPENAPI_SCHEMA_FILE).")
+
+    def handle(self, *args, output, **options):
+        path = output or settings.OPENAPI_SCHEMA_FILE
+        schema = generate_schema()
+
+        with open(path, "wb") as f:
+            f.write(schema)
+
+        cache.delete(SCHEMA_CACHE_KEY)
+
+        self.stdout.write(self.style.SUCCESS(f"Sxema yozildi: {path} ({len(schema)} bayt)"))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from project.leaderboard import reconcile
+
+
+class Command(BaseCommand):
+    """
+    Darslarning reyting jadvali ballarini baho hisoblagichlaridan qayta hisoblaydi.
+    """
+
+    help = "Darslarning `rating_score` balini baho hisoblagichlaridan qayta hisoblaydi (formula o'zgarganda yoki qo'lda tuzatishdan keyin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--course", type=int, help="Faqat shu kurs darslari qayta hisoblanadi.")
+
+    def handle(self, *args, course, **options):
+        count = reconcile(course)
+
+        self.stdout.write(self.style.SUCCESS(f"Bali yangilandi: {count} ta dars"))
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from project import events, server
+from project.server import get_setting
+
+
+class Command(BaseCommand):
+    """
+    Ilovani pre-fork production serverda (gunicorn + ASGI worker'lar) ishga tushiradi.
+    """
+
+    help = (
+        "Ilovani gunicorn va uvicorn worker'lari (config.asgi) orqali ishga tushiradi: ilova fork'dan oldin yuklanib "
+        "qiziydi, worker'lar max-requests'dan keyin qayta yaratiladi. HUP faqat worker'larni eski koddan qayta "
+        "yaratadi; yangi kodni yuklash uchun master jarayonga USR2, so'ng eski master'ga WINCH va QUIT yuboring."
+    )
+
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default=get_setting("BIND"))
+        parser.add_argument("--workers", type=int, default=get_setting("WORKERS"))
+        parser.add_argument("--worker-class", default=get_setting("WORKER_CLASS"), help="ASGI worker klassi (SSE oqimlari ASGI worker'ni talab qiladi).")
+        parser.add_argument("--max-requests", type=int, default=get_setting("MAX_REQUESTS"), help="Worker shuncha so'rovdan keyin qayta yaratiladi (0 - o'chirilgan).")
+        parser.add_argument("--max-requests-jitter", type=int, default=get_setting("MAX_REQUESTS_JITTER"))
+        parser.add_argument("--timeout", type=int, default=get_setting("TIMEOUT"))
+        parser.add_argument("--graceful-timeout", type=int, default=get_setting("GRACEFUL_TIMEOUT"))
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stderr.write(self.style.WARNING("DEBUG = True: production uchun o'chirib qo'ying."))
+
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            raise CommandError("gunicorn o'rnatilmagan: pip install gunicorn")
+
+        try:
+            import_string(options["worker_class"])
+        except ImportError:
+            raise CommandError(f"{options['worker_class']} topilmadi: pip install uvicorn")
+
+        if options["workers"] > 1 and issubclass(import_string(events.get_setting("BROKER")), events.LocalBroker):
+            self.stderr.write(self.style.WARNING(
+                "LIVE_FEED[\"BROKER\"] - LocalBroker: hodisalar boshqa worker'lardagi SSE mijozlarga yetmaydi. "
+                "project.events.DatabaseBroker'ni yoqing yoki --workers 1 bilan ishga tushiring."
+            ))
+
+        server.run(server.get_options(
+            bind=options["bind"],
+            workers=options["workers"],
+            worker_class=options["worker_class"],
+            max_requests=options["max_requests"],
+            max_requests_jitter=options["max_requests_jitter"],
+            timeout=options["timeout"],
+            graceful_timeout=options["graceful_timeout"],
+        ))
@@ -0,0 +1,118 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Count
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from project.models import Course, Lesson
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    Deploydan keyin eng ko'p ishlatiladigan resurslarni viewsetlar orqali chizib, javob keshini to'ldiradi.
+
+    Kesh faqat umumiy backend'da (Redis, Memcached) server worker'lariga ko'rinadi. `LocMemCache` bilan buyruq
+    `serve` master jarayonida fork'dan oldin chaqiriladi (`SERVER["WARM_CACHE"]`), alohida ishga tushirish foydasiz.
+    """
+
+    help = "Mashhur kurslar, yangi darslar va faol talabalarning kurslar ro'yxati uchun keshni isitadi."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://localhost:8000", help="Mijozlar murojaat qiladigan manzil (kesh kaliti va fayl URL'lari uchun).")
+        parser.add_argument("--courses", type=int, default=20, help="Eng ko'p talabali kurslar soni.")
+        parser.add_argument("--lessons", type=int, default=50, help="Eng yangi darslar soni.")
+        parser.add_argument("--students", type=int, default=100, help="Kurslar ro'yxati isitiladigan faol talabalar soni.")
+        parser.add_argument("--active-days", type=int, default=7, help="Oxirgi necha kunda kirgan talabalar faol hisoblanadi.")
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--time-budget", type=float, default=60, help="Soniyalarda; tugagach qolgan resurslar o'tkazib yuboriladi.")
+        parser.add_argument("--before-fork", action="store_true", help="Server master jarayonida fork'dan oldin chaqirilgan (jarayon ichidagi kesh worker'larga o'tadi).")
+
+    def get_targets(self, courses, lessons, students, active_days):
+        """
+        Isitiladigan `(path, user)` juftliklarini qaytaradi.
+        """
+        targets = []
+        staff = User.objects.filter(is_staff=True, is_active=True).first()
+
+        if staff is None:
+            self.stderr.write("Faol admin foydalanuvchi topilmadi: kurs va dars sahifalari o'tkazib yuboriladi.")
+        else:
+            hot_courses = Course.objects.annotate(student_total=Count("students")).order_by("-student_total", "pk").values_list("pk", flat=True)[:courses]
+            recent_lessons = Lesson.objects.order_by("-created_at").values_list("pk", flat=True)[:lessons]
+
+            targets += [(reverse("v1:course-detail", args=[pk]), staff) for pk in hot_courses]
+            targets += [(reverse("v1:lesson-detail", args=[pk]), staff) for pk in recent_lessons]
+
+        active_students = User.objects.filter(
+            is_active=True,
+            is_staff=False,
+            last_login__gte=timezone.now() - timedelta(days=active_days),
+        ).order_by("-last_login")[:students]
+
+        targets += [(reverse("v1:course-list"), student) for student in active_students]
+
+        return targets
+
+    def warm(self, path, user, base_url, deadline):
+        """
+        Bitta resursni viewset orqali chizadi va natijani (`MISS`, `HIT`, `SKIPPED`, `FAILED`) qaytaradi.
+        """
+        if time.monotonic() > deadline:
+            return "SKIPPED"
+
+        try:
+            request = APIRequestFactory().get(
+                path,
+                HTTP_ACCEPT="application/json",
+                HTTP_HOST=base_url.netloc,
+                secure=base_url.scheme == "https",
+            )
+            force_authenticate(request, user=user)
+
+            match = resolve(path)
+            response = match.func(request, *match.args, **match.kwargs)
+
+            return response.get("X-Cache", "FAILED") if response.status_code == 200 else "FAILED"
+        except Exception as exc:
+            self.stderr.write(f"{path}: {exc}")
+            return "FAILED"
+        finally:
+            connections.close_all()
+
+    def handle(self, *args, base_url, courses, lessons, students, active_days, concurrency, time_budget, before_fork, **options):
+        backend = caches["default"]
+
+        if isinstance(backend, DummyCache) or isinstance(backend, LocMemCache) and not before_fork:
+            self.stderr.write(self.style.WARNING(
+                f"{type(backend).__name__} jarayon ichida: isitilgan yozuvlar server worker'lariga ko'rinmaydi. "
+                "SERVER['WARM_CACHE'] orqali fork'dan oldin isiting yoki umumiy kesh backend'ini sozlang."
+            ))
+
+        started = time.monotonic()
+        deadline = started + time_budget
+        base_url = urlsplit(base_url)
+
+        targets = self.get_targets(courses, lessons, students, active_days)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda target: self.warm(*target, base_url, deadline), targets))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Keshga yozildi: {results.count('MISS')}, allaqachon keshda: {results.count('HIT')}, "
+                f"o'tkazib yuborildi: {results.count('SKIPPED')}, xato: {results.count('FAILED')} "
+                f"({time.monotonic() - started:.1f} s)"
+            )
+        )
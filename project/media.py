@@ -0,0 +1,236 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from multiprocessing import get_context
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow o'rnatilmagan bo'lsa faqat fayl hajmi saqlanadi
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "THUMBNAIL_SIZES": {"small": 160, "medium": 480, "large": 960},
+    "WORKERS": 2,
+}
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp", ".bmp"}
+
+# Worker jarayonlariga joriy jarayondagi qiymatlari bilan uzatiladigan sozlamalar (`DATABASES` dan tashqari).
+WORKER_SETTINGS = ["MEDIA_ROOT", "MEDIA_URL", "STORAGES", "LESSON_MEDIA", "SYNC"]
+
+
+def get_setting(name):
+    """
+    `LESSON_MEDIA` sozlamasidan qiymatni, bo'lmasa standart qiymatni qaytaradi.
+    """
+    return getattr(settings, "LESSON_MEDIA", {}).get(name, DEFAULTS[name])
+
+
+def probe_video(path):
+    """
+    `ffprobe` yordamida video o'lchami va davomiyligini aniqlaydi (`ffprobe` bo'lmasa bo'sh lug'at).
+    """
+    if shutil.which("ffprobe") is None:
+        return {}
+
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-select_streams", "v:0", "-show_entries", "stream=width,height:format=duration", "-of", "json", path],
+        capture_output=True,
+        check=True,
+        timeout=60,
+    )
+    data = json.loads(result.stdout or b"{}")
+    stream = (data.get("streams") or [{}])[0]
+    duration = data.get("format", {}).get("duration")
+
+    return {
+        "media_width": stream.get("width"),
+        "media_height": stream.get("height"),
+        "media_duration": float(duration) if duration else None,
+    }
+
+
+def extract_poster(path):
+    """
+    `ffmpeg` yordamida videoning birinchi soniyasidan kadr oladi (`ffmpeg` yoki Pillow bo'lmasa `None`).
+    """
+    if Image is None or shutil.which("ffmpeg") is None:
+        return None
+
+    result = subprocess.run(
+        ["ffmpeg", "-v", "error", "-ss", "1", "-i", path, "-frames:v", "1", "-f", "image2pipe", "-vcodec", "png", "-"],
+        capture_output=True,
+        check=True,
+        timeout=120,
+    )
+
+    return Image.open(BytesIO(result.stdout)) if result.stdout else None
+
+
+def make_thumbnails(image, lesson_id):
+    """
+    Rasmdan sozlamalardagi o'lchamlarda JPEG thumbnail'lar yaratib saqlaydi.
+
+    Fayl nomida mazmun xeshi bor: yangi fayl yangi URL oladi, shuning uchun brauzer va CDN keshlaridagi eski
+    thumbnail qaytarilmaydi, eski URL esa o'chirilguncha ishlashda davom etadi.
+
+    Returns:
+    - `{o'lcham nomi: fayl nomi}` lug'ati.
+    """
+    thumbnails = {}
+    image = image.convert("RGB")
+
+    for name, width in get_setting("THUMBNAIL_SIZES").items():
+        thumbnail = image.copy()
+        thumbnail.thumbnail((width, width))
+
+        buffer = BytesIO()
+        thumbnail.save(buffer, format="JPEG", quality=80, optimize=True)
+
+        content = buffer.getvalue()
+        path = f"thumbnails/{lesson_id}/{name}-{hashlib.sha256(content).hexdigest()[:12]}.jpg"
+        thumbnails[name] = path if default_storage.exists(path) else default_storage.save(path, ContentFile(content))
+
+    return thumbnails
+
+
+def generate_derivatives(lesson_id):
+    """
+    Dars fayli uchun metadata (hajm, o'lcham, davomiylik) va thumbnail/poster'larni yaratadi.
+
+    Worker jarayonida ishlaydi; natija `Lesson` ga `update()` bilan yoziladi.
+    """
+    # Modul worker jarayonida `django.setup()` dan oldin import qilinadi, shuning uchun model shu yerda olinadi.
+    from . import sync
+    from .models import Change, Lesson
+
+    lesson = Lesson.objects.filter(pk=lesson_id).first()
+
+    if lesson is None or not lesson.video:
+        return
+
+    source = lesson.video.name
+    fields = {"media_source": source, "media_status": Lesson.MEDIA_READY, "thumbnails": {}}
+
+    try:
+        fields["media_size"] = lesson.video.size
+        image = None
+
+        if PurePosixPath(source).suffix.lower() in IMAGE_EXTENSIONS:
+            if Image is not None:
+                with lesson.video.open("rb") as f:
+                    image = Image.open(f)
+                    image.load()
+        else:
+            path = lesson.video.path
+            fields.update(probe_video(path))
+            image = extract_poster(path)
+
+        if image is not None:
+            fields.setdefault("media_width", image.width)
+            fields.setdefault("media_height", image.height)
+            fields["thumbnails"] = make_thumbnails(image, lesson_id)
+    except Exception:
+        logger.exception("Dars %s fayli uchun hosilalar yaratilmadi", lesson_id)
+        fields["media_status"] = Lesson.MEDIA_FAILED
+
+    # Shu vaqt ichida fayl almashtirilgan bo'lsa, eski natija yozilmaydi.
+    with transaction.atomic():
+        updated = Lesson.objects.filter(pk=lesson_id, video=source).update(**fields)
+
+        if updated:
+            Lesson.touch(lesson_id)
+            sync.record(Change.LESSON, lesson_id, lesson.course_id)
+
+    if updated:
+        for path in set(lesson.thumbnails.values()) - set(fields["thumbnails"].values()):
+            default_storage.delete(path)
+
+
+def get_worker_settings():
+    """
+    Joriy jarayonda amalda bo'lgan sozlamalar: `override_settings` va test bazasi nomi ham hisobga olinadi.
+
+    Spawn qilingan worker sozlamalar modulini qaytadan import qiladi, shuning uchun bu qiymatlar unga alohida uzatiladi.
+    Xotiradagi SQLite test bazasi boshqa jarayondan ko'rinmaydi: bunday testlarda `WORKERS = 0` ishlatiladi.
+    """
+    worker_settings = {name: getattr(settings, name) for name in WORKER_SETTINGS if hasattr(settings, name)}
+    worker_settings["DATABASES"] = {alias: connections[alias].settings_dict for alias in connections}
+
+    return worker_settings
+
+
+def init_worker(settings_module, worker_settings):
+    """
+    Worker jarayonida Django'ni ota jarayondagi sozlamalar bilan ishga tushiradi.
+    """
+    import django
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+
+    for name, value in worker_settings.items():
+        setattr(settings, name, value)
+
+    django.setup()
+
+
+_executor = None
+_executor_settings = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Hosilalar uchun umumiy jarayonlar pulini (spawn) yaratadi yoki mavjudini qaytaradi.
+
+    Sozlamalar pul yaratilgandan keyin o'zgargan bo'lsa (masalan, `override_settings`), pul yangi sozlamalar bilan
+    qayta yaratiladi; eski puldagi vazifalar oxirigacha bajariladi.
+    """
+    global _executor, _executor_settings
+
+    worker_settings = get_worker_settings()
+
+    with _executor_lock:
+        if _executor is None or _executor_settings != worker_settings:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+
+            _executor = ProcessPoolExecutor(
+                max_workers=get_setting("WORKERS"),
+                mp_context=get_context("spawn"),
+                initializer=init_worker,
+                initargs=(os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings"), worker_settings),
+            )
+            _executor_settings = worker_settings
+
+    return _executor
+
+
+def log_failure(future):
+    if future.exception() is not None:
+        logger.error("Hosilalar vazifasi muvaffaqiyatsiz tugadi", exc_info=future.exception())
+
+
+def enqueue(lesson_id):
+    """
+    Dars fayli uchun hosilalar yaratishni navbatga qo'yadi (`WORKERS = 0` bo'lsa shu jarayonda bajaradi).
+    """
+    if not get_setting("WORKERS"):
+        generate_derivatives(lesson_id)
+        return
+
+    get_executor().submit(generate_derivatives, lesson_id).add_done_callback(log_failure)
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:23
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+
+
+def remove_duplicate_ratings(apps, schema_editor):
+    Rating = apps.get_model('project', 'Rating')
+
+    duplicates = Rating.objects.values('lesson_id', 'creator_id').annotate(last_id=Max('id'), total=Count('id')).filter(total__gt=1)
+
+    for row in duplicates:
+        Rating.objects.filter(lesson_id=row['lesson_id'], creator_id=row['creator_id']).exclude(id=row['last_id']).delete()
+
+
+def fill_rating_counts(apps, schema_editor):
+    Lesson = apps.get_model('project', 'Lesson')
+
+    lessons = Lesson.objects.annotate(
+        total=Count('ratings'),
+        likes=Count('ratings', filter=Q(ratings__liked=True)),
+    ).filter(total__gt=0)
+
+    for lesson in lessons:
+        Lesson.objects.filter(pk=lesson.pk).update(ratings_count=lesson.total, likes_count=lesson.likes)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0003_rename_user_rating_creator'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='ratings_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(remove_duplicate_ratings, migrations.RunPython.noop),
+        migrations.RunPython(fill_rating_counts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='rating',
+            constraint=models.UniqueConstraint(fields=('lesson', 'creator'), name='unique_rating_per_lesson_creator'),
+        ),
+    ]
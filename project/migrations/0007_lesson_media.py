@@ -0,0 +1,48 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0006_archived_comment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='media_duration',
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='media_height',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='media_size',
+            field=models.PositiveBigIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='media_source',
+            field=models.CharField(blank=True, editable=False, max_length=256),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='media_status',
+            field=models.CharField(choices=[('pending', 'Kutilmoqda'), ('ready', 'Tayyor'), ('failed', 'Xatolik')], default='pending', editable=False, max_length=16),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='media_width',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='thumbnails',
+            field=models.JSONField(default=dict, editable=False),
+        ),
+    ]
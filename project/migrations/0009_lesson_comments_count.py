@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:34
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_comments_count(apps, schema_editor):
+    Lesson = apps.get_model('project', 'Lesson')
+
+    lessons = Lesson.objects.annotate(
+        hot=Count('comments', distinct=True),
+        archived=Count('archived_comments', distinct=True),
+    )
+
+    for lesson in lessons:
+        if lesson.hot or lesson.archived:
+            Lesson.objects.filter(pk=lesson.pk).update(comments_count=lesson.hot + lesson.archived)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0008_lesson_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_comments_count, migrations.RunPython.noop),
+    ]
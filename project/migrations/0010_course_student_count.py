@@ -0,0 +1,27 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:43
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_student_count(apps, schema_editor):
+    Course = apps.get_model('project', 'Course')
+
+    for course in Course.objects.annotate(total=Count('students')).filter(total__gt=0):
+        Course.objects.filter(pk=course.pk).update(student_count=course.total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0009_lesson_comments_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='student_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_student_count, migrations.RunPython.noop),
+    ]
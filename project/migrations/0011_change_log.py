@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-19 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0010_course_student_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Change',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('course', 'Kurs'), ('lesson', 'Dars'), ('comment', 'Izoh'), ('rating', 'Baho'), ('enrollment', 'Kursga yozilish'), ('reset', 'Jurnal qirqildi')], max_length=16)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('course_id', models.PositiveBigIntegerField(null=True)),
+                ('user_id', models.PositiveBigIntegerField(null=True)),
+                ('deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['course_id', 'id'], name='change_course_id'), models.Index(fields=['kind', 'object_id', 'id'], name='change_object_id')],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.3 on 2026-10-19 02:03
+
+import math
+
+from django.db import migrations, models
+
+
+def wilson_score(likes, total, z=1.96):
+    if not total:
+        return 0
+
+    phat = likes / total
+    return (phat + z * z / (2 * total) - z * math.sqrt((phat * (1 - phat) + z * z / (4 * total)) / total)) / (1 + z * z / total)
+
+
+def fill_rating_score(apps, schema_editor):
+    Lesson = apps.get_model('project', 'Lesson')
+
+    lessons = [
+        Lesson(pk=pk, rating_score=wilson_score(likes, total))
+        for pk, likes, total in Lesson.objects.filter(ratings_count__gt=0).values_list('pk', 'likes_count', 'ratings_count')
+    ]
+    Lesson.objects.bulk_update(lessons, ['rating_score'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0011_change_log'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lesson',
+            name='rating_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_rating_score, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['-rating_score', 'id'], name='lesson_rating_score'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['course', '-rating_score', 'id'], name='lesson_course_rating_score'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['-comments_count', 'id'], name='lesson_comments_count'),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['course', '-comments_count', 'id'], name='lesson_course_comments_count'),
+        ),
+    ]
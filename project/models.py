@@ -1,5 +1,11 @@
+import math
+
 from django.contrib.auth.models import AbstractUser, BaseUserManager
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
 
 class UserManager(BaseUserManager):
@@ -72,6 +78,9 @@ class Course(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
     students = models.ManyToManyField(User, blank=True)
+    student_count = models.PositiveIntegerField(default=0, editable=False)
+    version = models.PositiveIntegerField(default=1, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         """
@@ -79,6 +88,32 @@ class Course(models.Model):
         """
         return self.title
 
+    @classmethod
+    def touch(cls, *course_ids):
+        """
+        Kurs versiyasini oshiradi va o'zgargan vaqtini yangilaydi (ETag/Last-Modified uchun).
+        """
+        cls.objects.filter(pk__in=course_ids).update(version=F("version") + 1, updated_at=timezone.now())
+
+    @classmethod
+    def refresh_student_count(cls, *course_ids):
+        """
+        Kurslar talabalari sonini bitta so'rov bilan qayta hisoblab saqlaydi.
+        """
+        counts = cls.students.through.objects.filter(course_id=OuterRef("pk")).values("course_id").annotate(count=Count("pk")).values("count")
+        cls.objects.filter(pk__in=course_ids).update(student_count=Coalesce(Subquery(counts), 0))
+
+
+def wilson_score(likes, total, z=1.96):
+    """
+    Yoqtirishlar ulushining Wilson ishonch oralig'i quyi chegarasi: kam baholi darslar yuqoriga chiqib ketmaydi.
+    """
+    if not total:
+        return 0
+
+    phat = likes / total
+    return (phat + z * z / (2 * total) - z * math.sqrt((phat * (1 - phat) + z * z / (4 * total)) / total)) / (1 + z * z / total)
+
 
 class Lesson(models.Model):
     """
@@ -88,6 +123,38 @@ class Lesson(models.Model):
     name = models.CharField(max_length=256)
     video = models.FileField(upload_to="videos/")
     created_at = models.DateTimeField(auto_now_add=True)
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    ratings_count = models.PositiveIntegerField(default=0, editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+    rating_score = models.FloatField(default=0, editable=False)
+    version = models.PositiveIntegerField(default=1, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    MEDIA_PENDING = "pending"
+    MEDIA_READY = "ready"
+    MEDIA_FAILED = "failed"
+    MEDIA_STATUS_CHOICES = [
+        (MEDIA_PENDING, "Kutilmoqda"),
+        (MEDIA_READY, "Tayyor"),
+        (MEDIA_FAILED, "Xatolik"),
+    ]
+
+    media_status = models.CharField(max_length=16, choices=MEDIA_STATUS_CHOICES, default=MEDIA_PENDING, editable=False)
+    media_source = models.CharField(max_length=256, blank=True, editable=False)
+    media_size = models.PositiveBigIntegerField(null=True, editable=False)
+    media_width = models.PositiveIntegerField(null=True, editable=False)
+    media_height = models.PositiveIntegerField(null=True, editable=False)
+    media_duration = models.FloatField(null=True, editable=False)
+    thumbnails = models.JSONField(default=dict, editable=False)
+
+    class Meta:
+        # Reyting jadvallari (`leaderboard`) shu indekslardan `LIMIT` bilan o'qiladi.
+        indexes = [
+            models.Index(fields=["-rating_score", "id"], name="lesson_rating_score"),
+            models.Index(fields=["course", "-rating_score", "id"], name="lesson_course_rating_score"),
+            models.Index(fields=["-comments_count", "id"], name="lesson_comments_count"),
+            models.Index(fields=["course", "-comments_count", "id"], name="lesson_course_comments_count"),
+        ]
 
     def __str__(self):
         """
@@ -95,6 +162,41 @@ class Lesson(models.Model):
         """
         return self.name
 
+    @property
+    def rating(self):
+        """
+        Dars reytingini foizda qaytaradi (saqlangan hisoblagichlar asosida).
+        """
+        return self.likes_count / self.ratings_count * 100 if self.ratings_count else 0
+
+    @classmethod
+    def touch(cls, *lesson_ids):
+        """
+        Dars va uning kursi versiyasini oshiradi (izoh yoki baho o'zgarganda chaqiriladi).
+        """
+        now = timezone.now()
+        cls.objects.filter(pk__in=lesson_ids).update(version=F("version") + 1, updated_at=now)
+        Course.objects.filter(lessons__in=lesson_ids).update(version=F("version") + 1, updated_at=now)
+
+    @classmethod
+    def increment_comments_count(cls, lesson_id, delta=1):
+        """
+        Dars izohlari hisoblagichini `delta` ga o'zgartiradi.
+        """
+        cls.objects.filter(pk=lesson_id).update(comments_count=F("comments_count") + delta)
+
+    @classmethod
+    def refresh_rating_counts(cls, lesson_id):
+        """
+        Dars baholari hisoblagichlarini va reyting jadvali balini bitta agregat so'rov bilan qayta hisoblab saqlaydi.
+        """
+        counts = Rating.objects.filter(lesson_id=lesson_id).aggregate(
+            ratings_count=Count("id"),
+            likes_count=Count("id", filter=Q(liked=True)),
+        )
+        cls.objects.filter(pk=lesson_id).update(**counts, rating_score=wilson_score(counts["likes_count"], counts["ratings_count"]))
+        return counts
+
 
 class Comment(models.Model):
     """
@@ -103,7 +205,33 @@ class Comment(models.Model):
     lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name="comments")
     creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name="comments")
     text = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        """
+        Izohni yaratgan foydalanuvchi to'liq ismini qaytaradi.
+        """
+        return self.creator.get_full_name()
+
+
+class ArchivedComment(models.Model):
+    """
+    Arxivlangan (eski) izohlar modeli.
+
+    `archive_comments` buyrug'i eski izohlarni `Comment` jadvalidan shu jadvalga asl `id` bilan ko'chiradi,
+    shunda dars javobidagi izohlar jadvali kichik bo'lib qoladi.
+    """
+    id = models.BigIntegerField(primary_key=True)
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name="archived_comments")
+    creator = models.ForeignKey(User, on_delete=models.CASCADE, related_name="archived_comments")
+    text = models.TextField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["lesson", "-id"], name="archived_comment_lesson_id"),
+        ]
 
     def __str__(self):
         """
@@ -120,8 +248,101 @@ class Rating(models.Model):
     creator = models.ForeignKey(User, on_delete=models.CASCADE)
     liked = models.BooleanField()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["lesson", "creator"], name="unique_rating_per_lesson_creator"),
+        ]
+
     def __str__(self):
         """
         Foydalanuvchi va baho holatini qaytaradi.
         """
         return f"{self.creator.get_full_name()} {'yoqdi' if self.liked else 'yoqmadi'}"
+
+
+class LessonProgress(models.Model):
+    """
+    Talabaning dars bo'yicha ko'rish holati (oxirgi pozitsiya va tugatilganligi).
+
+    Yozuvlar so'rov vaqtida emas, `project.progress` buferi orqali to'plab (upsert bilan) saqlanadi.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="lesson_progress")
+    lesson = models.ForeignKey(Lesson, on_delete=models.CASCADE, related_name="progress")
+    position = models.FloatField(default=0)
+    completed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "lesson"], name="unique_progress_per_user_lesson"),
+        ]
+
+    def __str__(self):
+        """
+        Foydalanuvchi va dars nomini qaytaradi.
+        """
+        return f"{self.user} - {self.lesson}"
+
+
+class Change(models.Model):
+    """
+    Sinxronlash uchun o'zgarishlar jurnali (delta sync).
+
+    Har bir yozuv ob'ekt o'zgargani yoki o'chirilgani (`deleted` - tombstone) haqida xabar beradi; `id` monoton
+    o'sadi va mijozning sync tokeni shu `id` ga asoslanadi. Yozuvlar signallardan ma'lumot o'zgarishi bilan bir
+    tranzaksiyada qo'shiladi (`ATOMIC_REQUESTS`) va `compact_sync_log` buyrug'i bilan davriy ixchamlanadi.
+    """
+    COURSE = "course"
+    LESSON = "lesson"
+    COMMENT = "comment"
+    RATING = "rating"
+    ENROLLMENT = "enrollment"
+    RESET = "reset"
+    KIND_CHOICES = [
+        (COURSE, "Kurs"),
+        (LESSON, "Dars"),
+        (COMMENT, "Izoh"),
+        (RATING, "Baho"),
+        (ENROLLMENT, "Kursga yozilish"),
+        (RESET, "Jurnal qirqildi"),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    course_id = models.PositiveBigIntegerField(null=True)
+    user_id = models.PositiveBigIntegerField(null=True)
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["course_id", "id"], name="change_course_id"),
+            models.Index(fields=["kind", "object_id", "id"], name="change_object_id"),
+        ]
+
+    def __str__(self):
+        """
+        O'zgarish turi va ob'ekt ID'sini qaytaradi.
+        """
+        return f"{self.kind} {self.object_id}" + (" (o'chirildi)" if self.deleted else "")
+
+
+class LiveEvent(models.Model):
+    """
+    Jonli lenta hodisalari (`project.events.DatabaseBroker`).
+
+    Worker'lar hodisani shu jadvalga yozadi va undan o'qiydi; `id` barcha worker'larda umumiy `Last-Event-ID` bo'ladi.
+    Eski yozuvlar `LIVE_FEED["RETENTION"]` dan keyin o'chiriladi.
+    """
+    id = models.BigAutoField(primary_key=True)
+    channel = models.CharField(max_length=64)
+    type = models.CharField(max_length=64)
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        """
+        Kanal va hodisa turini qaytaradi.
+        """
+        return f"{self.channel} {self.type}"
@@ -0,0 +1,262 @@
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections, transaction
+from django.urls import Resolver404, resolve
+from rest_framework import throttling
+from rest_framework.authentication import BaseAuthentication, SessionAuthentication
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "MAX_REQUESTS": 20,
+    "WORKERS": 4,
+}
+
+READ_METHODS = ("GET", "HEAD")
+
+# Sub-so'rovlar faqat shu URL namespace'idagi view'larga yuboriladi (admin, logout va boshqalar emas).
+NAMESPACE = "v1"
+
+# Sub-so'rov javobidan mijozga qaytariladigan sarlavhalar.
+RESPONSE_HEADERS = ["ETag", "Last-Modified", "Location", "X-Cache"]
+
+# Sub-so'rovga tashqi so'rovdan o'tmaydigan WSGI kalitlari.
+SKIPPED_ENVIRON = {"CONTENT_LENGTH", "CONTENT_TYPE", "HTTP_CONTENT_LENGTH", "HTTP_CONTENT_TYPE", "PATH_INFO", "QUERY_STRING", "REQUEST_METHOD", "wsgi.input"}
+
+
+def get_setting(name):
+    """
+    `BATCH_API` sozlamasidan qiymatni, bo'lmasa standart qiymatni qaytaradi.
+    """
+    return getattr(settings, "BATCH_API", {}).get(name, DEFAULTS[name])
+
+
+class BatchCache:
+    """
+    Bitta batch sub-so'rovlari uchun umumiy kesh qatlami.
+
+    Kalit asosiy keshdan bir marta o'qiladi, o'zgarishlar xotirada to'planib, batch oxirida (`flush`) bir marta
+    yoziladi. Qiymatlar sub-so'rovlar orasida ulashiladi: masalan, throttle tarixi har bir sub-so'rovni hisobga
+    oladi, lekin keshga bitta `get`/`set` bilan murojaat qilinadi.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.data = {}
+        self.timeouts = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self.data:
+                self.data[key] = self.backend.get(key)
+
+            value = self.data[key]
+
+        return default if value is None else value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        with self._lock:
+            self.data[key] = value
+            self.timeouts[key] = timeout
+
+    def flush(self):
+        with self._lock:
+            for key, timeout in self.timeouts.items():
+                self.backend.set(key, self.data[key], timeout)
+
+            self.timeouts = {}
+
+
+class BatchContext:
+    """
+    Tashqi so'rovda bir marta aniqlangan foydalanuvchi, autentifikatsiya va batch keshi.
+    """
+
+    def __init__(self, request):
+        self.user = request.user
+        self.auth = request.auth
+        self.cache = BatchCache(caches[DEFAULT_CACHE_ALIAS])
+
+
+class BatchAuthentication(BaseAuthentication):
+    """
+    Sub-so'rovni tashqi batch so'rovida aniqlangan foydalanuvchi bilan autentifikatsiya qiladi.
+
+    Kontekst faqat jarayon ichida yaratilgan sub-so'rovga (`build_request`) biriktiriladi, tashqi mijoz uni
+    sarlavha orqali bera olmaydi. Tashqi so'rov o'z autentifikatorlari (JWT, sessiya va CSRF) bilan allaqachon
+    tekshirilgan, shuning uchun token qayta dekodlanmaydi va foydalanuvchi bazadan qayta o'qilmaydi.
+    """
+
+    def authenticate(self, request):
+        context = getattr(request._request, "batch", None)
+
+        if context is None or not context.user.is_authenticated:
+            return None
+
+        return context.user, context.auth
+
+
+class BatchCacheThrottleMixin:
+    """
+    Batch sub-so'rovida throttle tarixini `BatchCache` orqali o'qiydi va yozadi.
+    """
+
+    def allow_request(self, request, view):
+        context = getattr(request._request, "batch", None)
+
+        if context is not None:
+            self.cache = context.cache
+
+        return super().allow_request(request, view)
+
+
+class AnonRateThrottle(BatchCacheThrottleMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(BatchCacheThrottleMixin, throttling.UserRateThrottle):
+    pass
+
+
+def build_request(request, method, path, body, context=None):
+    """
+    Tashqi so'rov asosida sub-so'rov yaratadi.
+
+    `context` berilsa, sub-so'rov `BatchAuthentication` orqali tashqi so'rov foydalanuvchisi bilan bir marta
+    o'tgan autentifikatsiyani qayta ishlatadi. O'z autentifikatorlari bo'lgan view'lar uchun JWT/Basic sarlavhalari
+    tashqi so'rovdan o'tadi, sessiya bilan kirgan foydalanuvchi esa `request.user` orqali (middleware kabi) beriladi.
+    Har bir sub-so'rov saqlanmaydigan alohida sessiya oladi: sub-so'rov tashqi so'rov sessiyasini o'zgartira
+    yoki tozalay olmaydi.
+    """
+    url = urlsplit(path)
+    content = json.dumps(body).encode() if body is not None else b""
+
+    environ = {key: value for key, value in request.META.items() if key not in SKIPPED_ENVIRON}
+    environ.update(
+        REQUEST_METHOD=method,
+        PATH_INFO=url.path,
+        QUERY_STRING=url.query,
+        CONTENT_TYPE="application/json",
+        CONTENT_LENGTH=str(len(content)),
+    )
+    environ["wsgi.input"] = BytesIO(content)
+
+    subrequest = WSGIRequest(environ)
+    subrequest.session = import_module(settings.SESSION_ENGINE).SessionStore()
+    subrequest.user = request.user if isinstance(request.successful_authenticator, SessionAuthentication) else AnonymousUser()
+    subrequest.batch = context
+
+    return subrequest
+
+
+def get_body(response):
+    if not response.content:
+        return None
+
+    if response.get("Content-Type", "").startswith("application/json"):
+        return json.loads(response.content)
+
+    return response.content.decode(response.charset)
+
+
+def execute(request, item, batch_view, context=None):
+    """
+    Bitta sub-so'rovni mavjud router orqali jarayon ichida bajaradi va natijani lug'at ko'rinishida qaytaradi.
+
+    Yozuvchi sub-so'rov `ATOMIC_REQUESTS` dagi kabi alohida tranzaksiyada bajariladi: keyingi (parallel) o'qishlar
+    uning natijasini ko'radi, xatoda esa faqat shu sub-so'rov bekor qilinadi.
+    """
+    result = {"id": item.get("id")}
+    path = item["path"]
+
+    try:
+        match = resolve(urlsplit(path).path)
+    except Resolver404:
+        return {**result, "status": 404, "body": {"detail": "Manzil topilmadi."}}
+
+    if match.namespaces[:1] != [NAMESPACE]:
+        return {**result, "status": 400, "body": {"detail": "Batch so'rovda faqat API manzillari bajariladi."}}
+
+    if getattr(match.func, "view_class", None) is batch_view:
+        return {**result, "status": 400, "body": {"detail": "Batch so'rov ichida batch so'rov bo'lishi mumkin emas."}}
+
+    try:
+        subrequest = build_request(request, item["method"], path, item.get("body"), context)
+
+        with transaction.atomic() if item["method"] not in READ_METHODS else nullcontext():
+            response = match.func(subrequest, *match.args, **match.kwargs)
+
+            if hasattr(response, "render"):
+                response.render()
+    except Exception:
+        logger.exception("Batch sub-so'rovi bajarilmadi: %s %s", item["method"], path)
+        return {**result, "status": 500, "body": {"detail": "Server xatosi."}}
+
+    if response.streaming:
+        response.close()
+        return {**result, "status": 400, "body": {"detail": "Oqimli javoblar batch so'rovda qo'llab-quvvatlanmaydi."}}
+
+    headers = {name: response[name] for name in RESPONSE_HEADERS if response.has_header(name)}
+
+    return {**result, "status": response.status_code, "headers": headers, "body": get_body(response)}
+
+
+def execute_in_thread(request, item, batch_view, context):
+    try:
+        return execute(request, item, batch_view, context)
+    finally:
+        connections.close_all()
+
+
+def get_groups(items, parallel):
+    """
+    Sub-so'rovlarni ketma-ket bajariladigan guruhlarga ajratadi: `parallel` bo'lsa yonma-yon o'qishlar bitta guruhga tushadi.
+    """
+    groups = []
+
+    for item in items:
+        if parallel and item["method"] in READ_METHODS and groups and groups[-1][0]["method"] in READ_METHODS:
+            groups[-1].append(item)
+        else:
+            groups.append([item])
+
+    return groups
+
+
+def execute_all(request, items, batch_view, parallel=False):
+    """
+    Sub-so'rovlarni tartib bo'yicha bajaradi.
+
+    Yozuvchi so'rovlar doim ketma-ket bajariladi; `parallel` bo'lsa, ular orasidagi o'qishlar oqimlar pulida
+    bir vaqtda bajariladi. Natijalar so'rovlar tartibida qaytariladi. Autentifikatsiya tashqi so'rovda bir
+    marta bajariladi va barcha sub-so'rovlar umumiy `BatchContext` ni oladi.
+    """
+    context = BatchContext(request)
+    results = []
+
+    try:
+        for group in get_groups(items, parallel):
+            if len(group) == 1:
+                results.append(execute(request, group[0], batch_view, context))
+                continue
+
+            with ThreadPoolExecutor(max_workers=min(get_setting("WORKERS"), len(group))) as executor:
+                results.extend(executor.map(lambda item: execute_in_thread(request, item, batch_view, context), group))
+    finally:
+        context.cache.flush()
+
+    return results
@@ -22,7 +22,7 @@ class IsCourseStudent(BasePermission):
         Ob'ektga ruxsatni tekshiradi:
         - Agar foydalanuvchi kurs talabasi bo'lsa yoki admin bo'lsa, True qaytaradi.
         """
-        return request.user in obj.course.students.all() or bool(request.user and request.user.is_staff)
+        return obj.course.students.filter(pk=request.user.pk).exists() or bool(request.user and request.user.is_staff)
 
 
 class IsStudent(BasePermission):
@@ -34,4 +34,4 @@ class IsStudent(BasePermission):
         Ob'ektga ruxsatni tekshiradi:
         - Agar foydalanuvchi talaba ro'yxatida bo'lsa yoki admin bo'lsa, True qaytaradi.
         """
-        return request.user in obj.students.all() or bool(request.user and request.user.is_staff)
+        return obj.students.filter(pk=request.user.pk).exists() or bool(request.user and request.user.is_staff)
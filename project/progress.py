@@ -0,0 +1,239 @@
+import atexit
+import logging
+import threading
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Lesson, LessonProgress, User
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "FLUSH_INTERVAL": 5,
+    "MAX_BUFFER": 5000,
+}
+
+
+def get_setting(name):
+    """
+    `LESSON_PROGRESS` sozlamasidan qiymatni, bo'lmasa standart qiymatni qaytaradi.
+    """
+    return getattr(settings, "LESSON_PROGRESS", {}).get(name, DEFAULTS[name])
+
+
+def get_pending_key(user_id, lesson_id):
+    return f"progress:{user_id}:{lesson_id}"
+
+
+class ProgressBuffer:
+    """
+    Dars ko'rish hodisalarini xotirada to'playdigan write-behind bufer.
+
+    Har bir `(user_id, lesson_id)` uchun faqat oxirgi pozitsiya saqlanadi (`completed` bir marta `True`
+    bo'lsa, shunday qoladi). Bufer `MAX_BUFFER` ga yetganda, har `FLUSH_INTERVAL` soniyada va jarayon
+    tugashida bazaga bitta upsert bilan yoziladi.
+
+    Bufer har bir jarayonda alohida. Yo'qotish oynasi: jarayon silliq to'xtamasa (`SIGKILL`, OOM, worker
+    `timeout`), oxirgi `FLUSH_INTERVAL` soniyadagi (ko'pi bilan `MAX_BUFFER` ta) hodisa bazaga yetib bormaydi;
+    `HUP`, `max_requests` va oddiy to'xtatishda qolganlari `atexit` orqali yoziladi. Boshqa worker'lar yozilmagan
+    hodisalarni ko'rishi uchun har bir hodisa kesh orqali ham ulashiladi (`pending`): umumiy kesh backend'ida
+    (Redis, Memcached) o'qishlar darhol yangilanadi, jarayon ichidagi keshda esa `FLUSH_INTERVAL` gacha kechikadi.
+    """
+
+    def __init__(self, max_size=DEFAULTS["MAX_BUFFER"], flush_interval=DEFAULTS["FLUSH_INTERVAL"]):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def add(self, user_id, lesson_id, position, completed=False):
+        """
+        Hodisani buferga qo'shadi; bufer to'lsa shu oqimda bazaga yozadi.
+        """
+        self.start()
+
+        with self._lock:
+            previous = self.entries.get((user_id, lesson_id))
+            completed = completed or bool(previous and previous["completed"])
+            entry = self.entries[(user_id, lesson_id)] = {"position": position, "completed": completed, "updated_at": timezone.now()}
+            full = len(self.entries) >= self.max_size
+
+        cache.set(get_pending_key(user_id, lesson_id), entry, timeout=self.flush_interval * 2 + 60)
+
+        if full:
+            self.flush()
+
+    def pending(self, user_id, lesson_ids):
+        """
+        Foydalanuvchining barcha worker'lardagi oxirgi hodisalarini `{lesson_id: entry}` ko'rinishida qaytaradi.
+
+        Kesh yozuvlari bazaga yozilgandan keyin ham muddati tugaguncha qoladi: ular bazadagidan eski bo'lsa, e'tiborga olinmaydi.
+        """
+        keys = {lesson_id: get_pending_key(user_id, lesson_id) for lesson_id in lesson_ids}
+        shared = cache.get_many(keys.values())
+        entries = {lesson_id: shared[key] for lesson_id, key in keys.items() if key in shared}
+
+        with self._lock:
+            entries.update({lesson_id: dict(self.entries[(user_id, lesson_id)]) for lesson_id in lesson_ids if (user_id, lesson_id) in self.entries})
+
+        return entries
+
+    def flush(self):
+        """
+        Buferdagi hodisalarni bazaga yozadi.
+
+        Returns:
+        - Yozilgan yozuvlar soni.
+        """
+        with self._flush_lock:
+            with self._lock:
+                entries, self.entries = self.entries, {}
+
+            if not entries:
+                return 0
+
+            try:
+                return write(entries)
+            except Exception:
+                logger.exception("Dars progressi bazaga yozilmadi")
+                self.restore(entries)
+                return 0
+
+    def restore(self, entries):
+        """
+        Yozilmay qolgan hodisalarni, yangiroqlari bo'lmasa, buferga qaytaradi.
+        """
+        with self._lock:
+            for key, entry in entries.items():
+                current = self.entries.get(key)
+
+                if current is None:
+                    self.entries[key] = entry
+                elif entry["completed"]:
+                    current["completed"] = True
+
+    def start(self):
+        """
+        Davriy yozish oqimini (bir marta) ishga tushiradi.
+        """
+        if self._thread is not None:
+            return
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.run, name="lesson-progress-flush", daemon=True)
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def run(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+            connections.close_all()
+
+    def stop(self):
+        """
+        Davriy oqimni to'xtatadi va qolgan hodisalarni yozadi.
+        """
+        self._stopped.set()
+        self.flush()
+
+
+def write(entries):
+    """
+    Hodisalarni `(user, lesson)` bo'yicha `INSERT ... ON CONFLICT` bilan bazaga yozadi.
+
+    Bufer to'lguncha o'chirilgan dars yoki foydalanuvchining hodisalari tashlab yuboriladi: aks holda tashqi kalit
+    xatosi butun upsert'ni bekor qiladi va bufer har safar qaytarilib, progress umuman yozilmay qoladi.
+
+    Returns:
+    - Yozilgan yozuvlar soni.
+    """
+    lesson_ids = set(Lesson.objects.filter(pk__in={lesson_id for _, lesson_id in entries}).values_list("pk", flat=True))
+    user_ids = set(User.objects.filter(pk__in={user_id for user_id, _ in entries}).values_list("pk", flat=True))
+    missing = [key for key in entries if key[0] not in user_ids or key[1] not in lesson_ids]
+
+    if missing:
+        logger.warning("O'chirilgan dars yoki foydalanuvchining %s ta progress hodisasi tashlab yuborildi", len(missing))
+        entries = {key: entry for key, entry in entries.items() if key[0] in user_ids and key[1] in lesson_ids}
+
+    objects = [
+        LessonProgress(user_id=user_id, lesson_id=lesson_id, position=entry["position"], completed=entry["completed"], updated_at=entry["updated_at"])
+        for (user_id, lesson_id), entry in entries.items()
+    ]
+    completed = [Q(user_id=user_id, lesson_id=lesson_id) for (user_id, lesson_id), entry in entries.items() if entry["completed"]]
+
+    with transaction.atomic():
+        LessonProgress.objects.bulk_create(objects, update_conflicts=True, unique_fields=["user", "lesson"], update_fields=["position", "updated_at"])
+
+        # `completed` faqat `True` ga o'zgaradi: keyingi hodisalar tugatilgan darsni qaytadan ochmaydi.
+        if completed:
+            LessonProgress.objects.filter(reduce(or_, completed), completed=False).update(completed=True)
+
+    return len(objects)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """
+    Jarayon uchun yagona `ProgressBuffer` ni qaytaradi.
+    """
+    global _buffer
+
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ProgressBuffer(max_size=get_setting("MAX_BUFFER"), flush_interval=get_setting("FLUSH_INTERVAL"))
+
+    return _buffer
+
+
+def record(user_id, lesson_id, position, completed=False):
+    """
+    Dars ko'rish hodisasini buferga qo'shadi.
+    """
+    get_buffer().add(user_id, lesson_id, position, completed)
+
+
+def get_course_summary(user_id, course):
+    """
+    Talabaning kurs bo'yicha progressini jamlangan jadval va hali yozilmagan (istalgan worker'dagi) hodisalar asosida qaytaradi.
+    """
+    lesson_ids = list(course.lessons.order_by("pk").values_list("pk", flat=True))
+    rows = {
+        row["lesson_id"]: row
+        for row in LessonProgress.objects.filter(user_id=user_id, lesson_id__in=lesson_ids).values("lesson_id", "position", "completed", "updated_at")
+    }
+
+    for lesson_id, entry in get_buffer().pending(user_id, lesson_ids).items():
+        row = rows.setdefault(lesson_id, {"lesson_id": lesson_id, "completed": False, "updated_at": None})
+        row["completed"] = row["completed"] or entry["completed"]
+
+        if row["updated_at"] is None or entry["updated_at"] > row["updated_at"]:
+            row.update(position=entry["position"], updated_at=entry["updated_at"])
+
+    lessons = [
+        {"lesson": lesson_id, "position": rows[lesson_id]["position"], "completed": rows[lesson_id]["completed"], "updated_at": rows[lesson_id]["updated_at"]}
+        for lesson_id in lesson_ids
+        if lesson_id in rows
+    ]
+    completed = sum(1 for lesson in lessons if lesson["completed"])
+
+    return {
+        "course": course.pk,
+        "lessons_total": len(lesson_ids),
+        "lessons_completed": completed,
+        "percent": completed / len(lesson_ids) * 100 if lesson_ids else 0,
+        "lessons": lessons,
+    }
@@ -0,0 +1,85 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    `text/event-stream` (SSE) javoblari uchun renderer.
+
+    Oqimning o'zi `StreamingHttpResponse` sifatida qaytariladi; renderer kontent kelishuvi
+    va xatoliklarni `error` hodisasi ko'rinishida qaytarish uchun kerak.
+    """
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        return f"event: error\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n".encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    `application/x-ndjson` eksport javoblari uchun renderer.
+
+    Eksportning o'zi oqim sifatida qaytariladi; renderer kontent kelishuvi va xatoliklar uchun kerak.
+    """
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        return (json.dumps(data, cls=DjangoJSONEncoder) + "\n").encode(self.charset)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    `text/csv` eksport javoblari uchun renderer (xatoliklar bitta ustunli CSV sifatida qaytariladi).
+    """
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        return f"error\n{json.dumps(data, cls=DjangoJSONEncoder)}\n".encode(self.charset)
+
+
+class StreamingJSONRenderer(JSONRenderer):
+    """
+    Ro'yxatni bo'laklab JSON ko'rinishida uzatuvchi renderer.
+
+    Butun javob xotirada yig'ilmaydi: har bir bo'lak (serializer natijasi) alohida kodlanib uzatiladi.
+    """
+
+    def render_stream(self, chunks, envelope=None):
+        """
+        Bo'laklardan JSON massivini (yoki `envelope` berilsa, `results` kalitli sahifani) hosil qiluvchi generator.
+        """
+        if envelope is not None:
+            yield self.render(envelope)[:-1] + (b',"results":' if envelope else b'"results":')
+
+        yield b"["
+        first = True
+
+        for chunk in chunks:
+            if not chunk:
+                continue
+
+            rendered = self.render(list(chunk))[1:-1]
+            yield rendered if first else b"," + rendered
+            first = False
+
+        yield b"]"
+
+        if envelope is not None:
+            yield b"}"
@@ -1,9 +1,10 @@
 from django.contrib.auth import authenticate, get_user_model
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 
 User = get_user_model()
 
-from .models import Comment, Course, Lesson, Rating
+from .models import ArchivedComment, Comment, Course, Lesson, Rating
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -55,35 +56,98 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ["id", "lesson", "creator", "text", "created_at"]
 
 
+class CommentHistorySerializer(serializers.Serializer):
+    """
+    Dars izohlari tarixini (asosiy va arxivlangan izohlar) qaytarish uchun serializer.
+    """
+    id = serializers.IntegerField()
+    lesson = serializers.IntegerField(source="lesson_id")
+    creator = serializers.CharField()
+    text = serializers.CharField()
+    created_at = serializers.DateTimeField()
+    archived = serializers.SerializerMethodField()
+
+    def get_archived(self, instance):
+        """
+        Izoh arxivdan olinganini bildiradi.
+        """
+        return isinstance(instance, ArchivedComment)
+
+
+class CommentHistoryParamsSerializer(serializers.Serializer):
+    """
+    Izohlar tarixini sahifalash parametrlari uchun serializer.
+    """
+    before = serializers.IntegerField(required=False, min_value=1)
+    limit = serializers.IntegerField(required=False, default=50, min_value=1, max_value=100)
+
+
 class LessonSerializer(serializers.ModelSerializer):
     """
     Darslar haqida ma'lumot qaytarish uchun serializer.
     """
     comments = CommentSerializer(many=True, read_only=True)
     rating = serializers.SerializerMethodField()
+    thumbnails = serializers.SerializerMethodField()
+    media = serializers.SerializerMethodField()
 
     class Meta:
         model = Lesson
-        fields = ["id", "course", "name", "video", "created_at", "comments", "rating"]
+        fields = ["id", "course", "name", "video", "created_at", "comments", "rating", "thumbnails", "media"]
 
     def get_rating(self, instance: Lesson):
         """
-        Dars reytingini foizda hisoblaydi.
+        Dars reytingini foizda qaytaradi.
+        """
+        return instance.rating
+
+    def get_thumbnails(self, instance: Lesson):
+        """
+        Thumbnail/poster URL'larini o'lcham nomi bo'yicha qaytaradi.
+        """
+        request = self.context.get("request")
+        urls = {name: default_storage.url(path) for name, path in instance.thumbnails.items()}
+        return {name: request.build_absolute_uri(url) for name, url in urls.items()} if request else urls
+
+    def get_media(self, instance: Lesson):
+        """
+        Dars fayli metadata'sini qaytaradi.
         """
-        qs = instance.ratings.all()
-        return qs.filter(liked=True).count() / qs.count() * 100 if qs.count() != 0 else 0
+        return {
+            "status": instance.media_status,
+            "size": instance.media_size,
+            "width": instance.media_width,
+            "height": instance.media_height,
+            "duration": instance.media_duration,
+        }
 
 
 class CourseSerializer(serializers.ModelSerializer):
     """
     Kurslar haqida ma'lumot qaytarish uchun serializer.
     """
-    students = StudentSerializer(many=True, read_only=True)
     lessons = LessonSerializer(many=True, read_only=True)
 
     class Meta:
         model = Course
-        fields = ["id", "title", "description", "students", "lessons"]
+        fields = ["id", "title", "description", "student_count", "lessons"]
+
+
+class SyncCourseSerializer(serializers.ModelSerializer):
+    """
+    Sinxronlash javobida kursni (darslarsiz) qaytarish uchun serializer.
+    """
+    class Meta:
+        model = Course
+        fields = ["id", "title", "description", "student_count"]
+
+
+class SyncLessonSerializer(LessonSerializer):
+    """
+    Sinxronlash javobida darsni (izohlarsiz - ular alohida bo'limda) qaytarish uchun serializer.
+    """
+    class Meta(LessonSerializer.Meta):
+        fields = ["id", "course", "name", "video", "created_at", "rating", "thumbnails", "media"]
 
 
 class RatingSerializer(serializers.ModelSerializer):
@@ -97,6 +161,74 @@ class RatingSerializer(serializers.ModelSerializer):
         fields = ["id", "lesson", "creator", "liked"]
 
 
+class RatingUpsertSerializer(serializers.Serializer):
+    """
+    Darsga baho qo'yish yoki uni o'zgartirish uchun serializer.
+    """
+    liked = serializers.BooleanField()
+
+
+class LessonRatingSerializer(serializers.Serializer):
+    """
+    Dars reytingi va foydalanuvchining bahosini qaytarish uchun serializer.
+    """
+    lesson = serializers.IntegerField()
+    liked = serializers.BooleanField(allow_null=True)
+    rating = serializers.FloatField()
+    likes_count = serializers.IntegerField()
+    ratings_count = serializers.IntegerField()
+
+
+class ProgressEventSerializer(serializers.Serializer):
+    """
+    Dars ko'rish hodisasini (heartbeat) qabul qilish uchun serializer.
+    """
+    position = serializers.FloatField(min_value=0)
+    completed = serializers.BooleanField(default=False)
+
+
+class LessonProgressSerializer(serializers.Serializer):
+    """
+    Bitta dars bo'yicha progressni qaytarish uchun serializer.
+    """
+    lesson = serializers.IntegerField()
+    position = serializers.FloatField()
+    completed = serializers.BooleanField()
+    updated_at = serializers.DateTimeField()
+
+
+class CourseProgressSerializer(serializers.Serializer):
+    """
+    Talabaning kurs bo'yicha progressini qaytarish uchun serializer.
+    """
+    course = serializers.IntegerField()
+    lessons_total = serializers.IntegerField()
+    lessons_completed = serializers.IntegerField()
+    percent = serializers.FloatField()
+    lessons = LessonProgressSerializer(many=True)
+
+
+class LeaderboardParamsSerializer(serializers.Serializer):
+    """
+    Reyting jadvali parametrlari uchun serializer.
+    """
+    metric = serializers.ChoiceField(choices=["rating", "comments"], default="rating")
+    course = serializers.IntegerField(required=False, min_value=1)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=50)
+
+
+class LeaderboardEntrySerializer(serializers.Serializer):
+    """
+    Reyting jadvalidagi bitta darsni qaytarish uchun serializer.
+    """
+    lesson = serializers.IntegerField()
+    name = serializers.CharField()
+    course = serializers.IntegerField()
+    rating = serializers.FloatField()
+    ratings_count = serializers.IntegerField()
+    comments_count = serializers.IntegerField()
+
+
 class StudentIdSerializer(serializers.Serializer):
     """
     Talaba ID'sini qabul qilish uchun oddiy serializer.
@@ -104,6 +236,60 @@ class StudentIdSerializer(serializers.Serializer):
     student_id = serializers.IntegerField()
 
 
+class EnrollmentSerializer(serializers.Serializer):
+    """
+    Talabani kursga qo'shish yoki olib tashlash natijasini qaytarish uchun serializer.
+    """
+    course = serializers.IntegerField()
+    student = serializers.IntegerField()
+    enrolled = serializers.BooleanField()
+    student_count = serializers.IntegerField()
+
+
+class CourseStudentsParamsSerializer(serializers.Serializer):
+    """
+    Kurs talabalari ro'yxatini sahifalash va qidirish parametrlari uchun serializer.
+    """
+    after = serializers.IntegerField(required=False, min_value=0)
+    limit = serializers.IntegerField(required=False, default=50, min_value=1, max_value=200)
+    search = serializers.CharField(required=False, max_length=255)
+
+
+class SyncParamsSerializer(serializers.Serializer):
+    """
+    Sinxronlash parametrlari uchun serializer.
+    """
+    token = serializers.CharField(required=False, max_length=255)
+
+
+class ExportParamsSerializer(serializers.Serializer):
+    """
+    Faoliyat eksporti parametrlarini qabul qilish uchun serializer.
+    """
+    course = serializers.IntegerField(required=False)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+    after_id = serializers.IntegerField(required=False, min_value=0)
+
+
+class BatchRequestItemSerializer(serializers.Serializer):
+    """
+    Batch so'rov ichidagi bitta sub-so'rov uchun serializer.
+    """
+    id = serializers.CharField(required=False, max_length=64)
+    method = serializers.ChoiceField(choices=["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE"])
+    path = serializers.RegexField(r"^/", max_length=2048)
+    body = serializers.JSONField(required=False)
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    """
+    Bir nechta sub-so'rovni bitta so'rovda qabul qilish uchun serializer.
+    """
+    requests = BatchRequestItemSerializer(many=True, allow_empty=False)
+    parallel = serializers.BooleanField(default=False)
+
+
 class EmailTextSerializer(serializers.Serializer):
     """
     Email uchun mavzu va matnni qabul qilish uchun serializer.
@@ -0,0 +1,147 @@
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "BIND": "0.0.0.0:8000",
+    "WORKERS": (os.cpu_count() or 1) * 2 + 1,
+    "WORKER_CLASS": "uvicorn.workers.UvicornWorker",
+    "MAX_REQUESTS": 1000,
+    "MAX_REQUESTS_JITTER": 100,
+    "TIMEOUT": 30,
+    "GRACEFUL_TIMEOUT": 30,
+    "WARM_CACHE": None,
+}
+
+TEMPLATES = ["emails/message.html", "admin/input_filter.html"]
+
+_ready = threading.Event()
+_warm_lock = threading.Lock()
+
+
+def get_setting(name):
+    """
+    `SERVER` sozlamasidan qiymatni, bo'lmasa standart qiymatni qaytaradi.
+    """
+    return getattr(settings, "SERVER", {}).get(name, DEFAULTS[name])
+
+
+def is_ready():
+    return _ready.is_set()
+
+
+def warm_serializers():
+    """
+    Router'dagi viewsetlar serializer'larining maydonlarini quradi (model `_meta` keshlari to'ladi).
+    """
+    from .routers import router
+
+    for _, viewset, _ in router.registry:
+        serializer_class = getattr(viewset, "serializer_class", None)
+
+        if serializer_class is not None:
+            serializer_class().fields
+
+
+def warm_up():
+    """
+    Ilovani so'rovlarga tayyorlaydi: URL'lar, serializer'lar, shablonlar va OpenAPI sxemasi oldindan yuklanadi.
+
+    Pre-fork serverda master jarayonda bir marta chaqiriladi: natijalar fork'dan keyin worker'lar orasida
+    copy-on-write bo'lib ulashiladi. Bazaga ochilgan ulanishlar worker'larga o'tmasligi uchun yopiladi.
+
+    `WARM_CACHE` berilsa (`warm_cache` buyrug'i parametrlari), javob keshi ham shu yerda to'ldiriladi: jarayon ichidagi
+    `LocMemCache` worker'larga fork orqali meros bo'lib o'tadi, umumiy backend (Redis/Memcached) esa bir marta to'ladi.
+    """
+    with _warm_lock:
+        if _ready.is_set():
+            return
+
+        resolver = get_resolver()
+        resolver.reverse_dict
+        resolver.namespace_dict
+
+        warm_serializers()
+
+        for name in TEMPLATES:
+            try:
+                get_template(name)
+            except TemplateDoesNotExist:
+                logger.warning("Shablon topilmadi: %s", name)
+
+        from . import docs
+
+        try:
+            docs.get_schema()
+        except Exception:
+            logger.exception("OpenAPI sxemasi oldindan yuklanmadi")
+
+        if get_setting("WARM_CACHE") is not None:
+            try:
+                call_command("warm_cache", before_fork=True, **get_setting("WARM_CACHE"))
+            except Exception:
+                logger.exception("Javob keshi oldindan to'ldirilmadi")
+
+        connections.close_all()
+        _ready.set()
+
+
+def post_fork(server, worker):
+    """
+    Worker jarayoni yaratilgandan keyin master'dan qolgan baza ulanishlarini tashlab yuboradi.
+    """
+    connections.close_all()
+
+
+def run(options):
+    """
+    Ilovani gunicorn orqali pre-fork rejimida, ASGI (uvicorn) worker'lari bilan ishga tushiradi.
+
+    ASGI worker'da SSE (`live`) ulanishlari event loop'da kutadi va worker'ni band qilmaydi; sinxron view'lar
+    Django tomonidan thread pool'da bajariladi.
+
+    `preload_app` yoqilgan: ilova master jarayonda import qilinib `warm_up` bajariladi, keyin worker'lar fork qilinadi.
+    Shu sababli `HUP` worker'larni master'dagi eski koddan qayta yaratadi - yangi kod yuklanmaydi. Deploydan keyin
+    master'ga `USR2` yuboriladi (yangi kod bilan yangi master va worker'lar ishga tushadi), so'ng eski master'ga
+    `WINCH` va `QUIT`. `max_requests` worker'larni shuncha so'rovdan keyin qayta yaratadi (xotira sizishiga qarshi).
+    """
+    from gunicorn.app.base import BaseApplication
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            from config.asgi import application
+
+            warm_up()
+            return application
+
+    Application().run()
+
+
+def get_options(bind, workers, worker_class, max_requests, max_requests_jitter, timeout, graceful_timeout):
+    """
+    Buyruq parametrlaridan gunicorn sozlamalarini yig'adi.
+    """
+    return {
+        "bind": bind,
+        "workers": workers,
+        "worker_class": worker_class,
+        "max_requests": max_requests,
+        "max_requests_jitter": max_requests_jitter,
+        "timeout": timeout,
+        "graceful_timeout": graceful_timeout,
+        "preload_app": True,
+        "post_fork": post_fork,
+    }
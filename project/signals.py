@@ -0,0 +1,252 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import media, sync
+from .events import lesson_channel, publish
+from .models import Change, Comment, Course, Lesson, Rating, User
+from .serializers import CommentSerializer
+
+
+def publish_comment_event(comment: Comment, event_type):
+    """
+    Izoh hodisasini tranzaksiya tasdiqlangach dars kanaliga e'lon qiladi.
+    """
+    data = CommentSerializer(comment).data
+
+    transaction.on_commit(lambda: publish(lesson_channel(comment.lesson_id), event_type, data))
+
+
+def publish_rating_event(lesson_id):
+    """
+    Dars reytingi o'zgarganini tranzaksiya tasdiqlangach yangi reyting bilan birga e'lon qiladi.
+    """
+
+    def send():
+        lesson = Lesson.objects.filter(pk=lesson_id).first()
+
+        if lesson is not None:
+            publish(lesson_channel(lesson_id), "rating.changed", {"lesson": lesson_id, "rating": lesson.rating})
+
+    transaction.on_commit(send)
+
+
+@receiver(post_save, sender=Comment)
+def publish_comment_saved(sender, instance: Comment, created, **kwargs):
+    """
+    Yangi yoki o'zgartirilgan izohni dars kanaliga e'lon qiladi.
+    """
+    publish_comment_event(instance, "comment.created" if created else "comment.updated")
+
+
+@receiver(post_delete, sender=Comment)
+def publish_comment_deleted(sender, instance: Comment, **kwargs):
+    """
+    O'chirilgan izoh haqida dars kanaliga xabar beradi.
+    """
+    data = {"id": instance.pk, "lesson": instance.lesson_id}
+
+    transaction.on_commit(lambda: publish(lesson_channel(instance.lesson_id), "comment.deleted", data))
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def update_lesson_rating_counts(sender, instance: Rating, **kwargs):
+    """
+    Baho o'zgarganda dars hisoblagichlarini shu tranzaksiya ichida yangilaydi.
+    """
+    Lesson.refresh_rating_counts(instance.lesson_id)
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def publish_rating_changed(sender, instance: Rating, **kwargs):
+    """
+    Dars reytingi o'zgarganini yangi reyting bilan birga e'lon qiladi.
+    """
+    publish_rating_event(instance.lesson_id)
+
+
+@receiver(post_save, sender=Course)
+def touch_course_saved(sender, instance: Course, **kwargs):
+    """
+    Kurs o'zgarganda uning versiyasini oshiradi.
+    """
+    Course.touch(instance.pk)
+
+
+@receiver(m2m_changed, sender=Course.students.through)
+def touch_course_students_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Kurs talabalari o'zgarganda kurs versiyasini oshiradi.
+    """
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if not reverse:
+        Course.touch(instance.pk)
+    elif pk_set:
+        Course.touch(*pk_set)
+    else:
+        Course.touch(*instance.course_set.values_list("pk", flat=True))
+
+
+@receiver(m2m_changed, sender=Course.students.through)
+def update_course_student_count(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Kurs talabalari o'zgarganda `student_count` ni yangilaydi.
+    """
+    if action == "pre_clear" and reverse:
+        # Foydalanuvchi barcha kurslaridan chiqariladi: har bir kursda aynan bitta talaba kamayadi.
+        instance.course_set.update(student_count=F("student_count") - 1)
+    elif action in ("post_add", "post_remove", "post_clear"):
+        course_ids = (pk_set or []) if reverse else [instance.pk]
+        Course.refresh_student_count(*course_ids)
+
+
+@receiver(pre_delete, sender=User)
+def update_user_courses_student_count(sender, instance, **kwargs):
+    """
+    Foydalanuvchi o'chirilganda (kurs yozuvlari kaskad bilan o'chadi) uning kurslarida talabalar sonini kamaytiradi.
+    """
+    instance.course_set.update(student_count=F("student_count") - 1)
+
+
+@receiver(post_save, sender=Lesson)
+def touch_lesson_saved(sender, instance: Lesson, **kwargs):
+    """
+    Dars o'zgarganda dars va kurs versiyasini oshiradi.
+    """
+    Lesson.touch(instance.pk)
+
+
+@receiver(post_delete, sender=Lesson)
+def touch_lesson_deleted(sender, instance: Lesson, **kwargs):
+    """
+    Dars o'chirilganda kurs versiyasini oshiradi.
+    """
+    Course.touch(instance.course_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def touch_lesson_activity(sender, instance, **kwargs):
+    """
+    Izoh yoki baho o'zgarganda dars va kurs versiyasini oshiradi.
+    """
+    Lesson.touch(instance.lesson_id)
+
+
+@receiver(post_save, sender=Lesson)
+def enqueue_lesson_media(sender, instance: Lesson, **kwargs):
+    """
+    Dars fayli yangi yoki almashtirilgan bo'lsa, thumbnail va metadata yaratishni navbatga qo'yadi.
+    """
+    if not instance.video or instance.video.name == instance.media_source:
+        return
+
+    Lesson.objects.filter(pk=instance.pk).update(media_status=Lesson.MEDIA_PENDING)
+    transaction.on_commit(lambda: media.enqueue(instance.pk))
+
+
+@receiver(post_save, sender=Comment)
+def count_comment_created(sender, instance: Comment, created, **kwargs):
+    """
+    Yangi izoh qo'shilganda dars izohlari hisoblagichini oshiradi.
+    """
+    if created:
+        Lesson.increment_comments_count(instance.lesson_id)
+
+
+@receiver(post_delete, sender=Comment)
+def count_comment_deleted(sender, instance: Comment, **kwargs):
+    """
+    Izoh o'chirilganda dars izohlari hisoblagichini kamaytiradi.
+    """
+    Lesson.increment_comments_count(instance.lesson_id, -1)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def record_course_change(sender, instance: Course, signal, **kwargs):
+    """
+    Kurs o'zgarishini sinxronlash jurnaliga yozadi.
+    """
+    sync.record(Change.COURSE, instance.pk, instance.pk, deleted=signal is post_delete)
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def record_lesson_change(sender, instance: Lesson, signal, **kwargs):
+    """
+    Dars o'zgarishini sinxronlash jurnaliga yozadi.
+    """
+    sync.record(Change.LESSON, instance.pk, instance.course_id, deleted=signal is post_delete)
+
+
+def get_course_id(sender, instance):
+    """
+    Izoh yoki baho darsining kursi: dars allaqachon yuklangan bo'lsa, qo'shimcha so'rovsiz.
+    """
+    if sender._meta.get_field("lesson").is_cached(instance):
+        return instance.lesson.course_id
+
+    return Lesson.objects.filter(pk=instance.lesson_id).values_list("course_id", flat=True).first()
+
+
+def is_parent_cascade(origin):
+    """
+    O'chirish dars yoki kurs o'chirilishidan kelib chiqqanmi: mijoz ularning tombstone'i bo'yicha ichidagi
+    izoh va baholarni ham o'chiradi, shuning uchun har biriga alohida yozuv (va so'rov) kerak emas.
+    """
+    return isinstance(origin, (Course, Lesson))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def record_comment_change(sender, instance: Comment, signal, origin=None, **kwargs):
+    """
+    Izoh o'zgarishini sinxronlash jurnaliga yozadi.
+    """
+    if is_parent_cascade(origin):
+        return
+
+    sync.record(Change.COMMENT, instance.pk, get_course_id(sender, instance), deleted=signal is post_delete)
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def record_rating_change(sender, instance: Rating, signal, origin=None, **kwargs):
+    """
+    Baho o'zgarishini (dars reytingi ham o'zgaradi) sinxronlash jurnaliga yozadi.
+    """
+    if is_parent_cascade(origin):
+        return
+
+    course_id = get_course_id(sender, instance)
+
+    sync.record_many([
+        Change(kind=Change.RATING, object_id=instance.pk, course_id=course_id, deleted=signal is post_delete),
+        Change(kind=Change.LESSON, object_id=instance.lesson_id, course_id=course_id),
+    ])
+
+
+@receiver(m2m_changed, sender=Course.students.through)
+def record_enrollment_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Kursga yozilish va kursdan chiqarilishni sinxronlash jurnaliga yozadi.
+    """
+    if action == "pre_clear":
+        pk_set = set(instance.course_set.values_list("pk", flat=True) if reverse else instance.students.values_list("pk", flat=True))
+    elif action not in ("post_add", "post_remove"):
+        return
+
+    pairs = [(course_id, instance.pk) for course_id in pk_set] if reverse else [(instance.pk, user_id) for user_id in pk_set]
+
+    sync.record_many([
+        Change(kind=Change.ENROLLMENT, object_id=user_id, course_id=course_id, user_id=user_id, deleted=action != "post_add")
+        for course_id, user_id in pairs
+    ])
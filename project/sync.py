@@ -0,0 +1,284 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef, Q
+from django.utils import timezone
+
+from .models import Change, Comment, Course, Lesson, Rating
+
+DEFAULTS = {
+    "PAGE_SIZE": 500,
+    "RETENTION_DAYS": 30,
+    "BATCH_SIZE": 5000,
+    "SETTLE_SECONDS": 10,
+}
+
+# Jurnal turlari va javobdagi bo'limlar.
+SECTIONS = {
+    Change.COURSE: "courses",
+    Change.LESSON: "lessons",
+    Change.COMMENT: "comments",
+    Change.RATING: "ratings",
+}
+
+
+def get_setting(name):
+    """
+    `SYNC` sozlamasidan qiymatni, bo'lmasa standart qiymatni qaytaradi.
+    """
+    return getattr(settings, "SYNC", {}).get(name, DEFAULTS[name])
+
+
+def record(kind, object_id, course_id, user_id=None, deleted=False):
+    """
+    O'zgarishni joriy tranzaksiyada jurnalga yozadi.
+    """
+    record_many([Change(kind=kind, object_id=object_id, course_id=course_id, user_id=user_id, deleted=deleted)])
+
+
+def record_many(changes):
+    """
+    Bir nechta o'zgarishni bitta `INSERT` bilan, ma'lumot o'zgarishi bilan bir tranzaksiyada jurnalga yozadi.
+
+    Tranzaksiya bekor qilinsa, yozuv ham yo'qoladi; tasdiqlangan o'zgarish esa jurnalsiz qolmaydi. `id` lar
+    tasdiqlash tartibida bo'lmasligi mumkin - buni o'quvchi tomoni `get_settled_id` bilan hisobga oladi.
+    """
+    if changes:
+        Change.objects.bulk_create(changes)
+
+
+def get_settled_id():
+    """
+    Undan kichik `id` li barcha yozuvlar tasdiqlangan deb hisoblanadigan jurnal `id` si.
+
+    `id` yozuv qo'shilganda beriladi, tranzaksiya esa keyinroq tasdiqlanadi: katta `id` ko'ringanda kichigi hali
+    ko'rinmasligi mumkin. `SETTLE_SECONDS` dan eski yozuvlar orasida bunday bo'shliq qolmaydi (sozlama eng uzun
+    yozuvchi tranzaksiyadan katta bo'lishi kerak). Mijoz kursori shu `id` dan oshmaydi: yangi yozuvlar javobda
+    qaytariladi, lekin keyingi so'rovda takrorlanadi.
+    """
+    cutoff = timezone.now() - timedelta(seconds=get_setting("SETTLE_SECONDS"))
+
+    return Change.objects.filter(created_at__lte=cutoff).order_by("-id").values_list("id", flat=True).first() or 0
+
+
+def get_signer(user):
+    return signing.Signer(salt=f"project.sync:{user.pk}")
+
+
+def make_token(user, change_id, position=None):
+    """
+    Foydalanuvchiga bog'langan sync tokenini yaratadi (`position` - to'liq holatning keyingi sahifasi).
+    """
+    return get_signer(user).sign(":".join(str(value) for value in [change_id, *(position or [])]))
+
+
+def read_token(user, token):
+    """
+    Sync tokenidan `(change_id, position)` ni o'qiydi (`signing.BadSignature` - token boshqa foydalanuvchiniki yoki buzilgan).
+    """
+    change_id, *position = (int(value) for value in get_signer(user).unsign(token).split(":"))
+
+    return change_id, tuple(position) or None
+
+
+def get_course_ids(user):
+    """
+    Foydalanuvchi sinxronlaydigan kurslar (admin uchun `None` - barcha kurslar).
+    """
+    return None if user.is_staff else list(user.course_set.values_list("pk", flat=True))
+
+
+def get_querysets(course_ids):
+    """
+    Bo'limlar querysetlari (`pk` bo'yicha tartiblangan), kurslar bo'yicha filtrlangan (`None` - barcha kurslar).
+    """
+    querysets = {
+        "courses": Course.objects.order_by("pk"),
+        "lessons": Lesson.objects.order_by("pk"),
+        "comments": Comment.objects.select_related("creator").order_by("pk"),
+        "ratings": Rating.objects.select_related("creator").order_by("pk"),
+    }
+    course_lookups = {"courses": "pk__in", "lessons": "course_id__in", "comments": "lesson__course_id__in", "ratings": "lesson__course_id__in"}
+
+    if course_ids is not None:
+        querysets = {section: queryset.filter(**{course_lookups[section]: course_ids}) for section, queryset in querysets.items()}
+
+    return querysets
+
+
+def get_objects(course_ids, ids=None):
+    """
+    Kurslar (yoki `ids` bo'yicha tanlangan) ob'ektlarini bo'limlar bo'yicha qaytaradi.
+    """
+    objects = {}
+
+    for section, queryset in get_querysets(course_ids).items():
+        if ids is not None:
+            if not ids[section]:
+                objects[section] = []
+                continue
+
+            queryset = queryset.filter(pk__in=ids[section])
+
+        objects[section] = list(queryset)
+
+    return objects
+
+
+def get_snapshot(user, change_id=None, position=None):
+    """
+    Foydalanuvchi kurslarining to'liq holatini sahifalab qaytaradi.
+
+    Bitta javobda jami ko'pi bilan `PAGE_SIZE` ta ob'ekt bo'ladi; `position` - `(bo'lim tartibi, oxirgi pk)`, keyingi
+    sahifa tokenda saqlanadi (`has_more`). `reset` faqat birinchi sahifada. `change_id` birinchi sahifadan oldin
+    olinadi: sahifalash vaqtidagi o'zgarishlar keyingi sinxronlashda takrorlanadi, lekin yo'qolmaydi.
+    """
+    reset = position is None
+    change_id = get_settled_id() if change_id is None else change_id
+    start, after = position or (0, 0)
+    remaining = get_setting("PAGE_SIZE")
+
+    objects = {section: [] for section in SECTIONS.values()}
+    next_position = None
+
+    for index, (section, queryset) in enumerate(get_querysets(get_course_ids(user)).items()):
+        if index < start:
+            continue
+
+        if index > start:
+            after = 0
+
+        items = list(queryset.filter(pk__gt=after)[:remaining + 1])
+
+        if len(items) > remaining:
+            objects[section] = items[:remaining]
+            next_position = (index, items[remaining - 1].pk if remaining else after)
+            break
+
+        objects[section] = items
+        remaining -= len(items)
+
+    return {
+        "change_id": change_id,
+        "position": next_position,
+        "reset": reset,
+        "has_more": next_position is not None,
+        **{section: {"updated": objects[section], "deleted": []} for section in SECTIONS.values()},
+    }
+
+
+def get_filter(user, course_ids):
+    if course_ids is None:
+        return ~Q(kind__in=[Change.RESET, Change.ENROLLMENT])
+
+    return (
+        Q(course_id__in=course_ids) & ~Q(kind=Change.ENROLLMENT)
+        | Q(kind=Change.ENROLLMENT, user_id=user.pk)
+        | Q(kind=Change.COURSE, deleted=True)
+    )
+
+
+def get_delta(user, since):
+    """
+    `since` dan keyingi o'zgarishlarni qaytaradi: yangilangan ob'ektlar va o'chirilganlarning `id` lari.
+
+    Javob hajmi katalog hajmiga emas, o'zgarishlar soniga bog'liq. Bitta javobda ko'pi bilan `PAGE_SIZE` ta
+    jurnal yozuvi qayta ishlanadi (`has_more`). Foydalanuvchi yangi kursga yozilgan bo'lsa, shu kursning to'liq
+    holati qo'shiladi. Token jurnal qirqilgan joydan eski bo'lsa, to'liq holat (`reset`) qaytariladi.
+    Keyingi token `get_settled_id` dan oshmaydi: hali tasdiqlanmagan bo'lishi mumkin bo'lgan yozuvlar o'tkazib yuborilmaydi.
+    """
+    watermark = Change.objects.filter(kind=Change.RESET).order_by("-id").values_list("object_id", flat=True).first() or 0
+
+    if since < watermark:
+        return get_snapshot(user)
+
+    latest = Change.objects.aggregate(latest=Max("id"))["latest"] or 0
+    settled = get_settled_id()
+    course_ids = get_course_ids(user)
+    page_size = get_setting("PAGE_SIZE")
+
+    rows = list(
+        Change.objects.filter(id__gt=since, id__lte=latest)
+        .filter(get_filter(user, course_ids))
+        .order_by("id")
+        .values("id", "kind", "object_id", "course_id", "deleted")[:page_size + 1]
+    )
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    # Har bir ob'ekt uchun sahifadagi oxirgi o'zgarish hisobga olinadi.
+    latest_rows = {}
+
+    for row in rows:
+        key = (row["kind"], row["course_id"]) if row["kind"] == Change.ENROLLMENT else (row["kind"], row["object_id"])
+        latest_rows[key] = row
+
+    ids = {section: [] for section in SECTIONS.values()}
+    deleted = {section: [] for section in SECTIONS.values()}
+    enrolled = []
+
+    for row in latest_rows.values():
+        if row["kind"] == Change.ENROLLMENT:
+            if row["deleted"]:
+                deleted["courses"].append(row["course_id"])
+            elif row["course_id"] in course_ids:
+                enrolled.append(row["course_id"])
+        else:
+            (deleted if row["deleted"] else ids)[SECTIONS[row["kind"]]].append(row["object_id"])
+
+    objects = get_objects(course_ids, ids)
+
+    if enrolled:
+        for section, items in get_objects(enrolled).items():
+            objects[section] = list({item.pk: item for item in objects[section] + items}.values())
+
+    change_id = max(since, min(rows[-1]["id"] if has_more else latest, settled))
+
+    return {
+        "change_id": change_id,
+        "position": None,
+        "reset": False,
+        # Sahifa hali tasdiqlanmagan yozuvlarda to'xtagan bo'lsa, darhol qayta so'rash o'sha sahifani qaytaradi.
+        "has_more": has_more and change_id == rows[-1]["id"],
+        **{section: {"updated": objects[section], "deleted": deleted[section]} for section in SECTIONS.values()},
+    }
+
+
+def delete_in_batches(queryset, batch_size):
+    deleted = 0
+
+    while ids := list(queryset.values_list("pk", flat=True)[:batch_size]):
+        deleted += Change.objects.filter(pk__in=ids).delete()[0]
+
+    return deleted
+
+
+def compact(retention_days=None, batch_size=None):
+    """
+    Jurnalni ixchamlaydi.
+
+    - Har bir ob'ekt uchun faqat oxirgi yozuv qoldiriladi (oraliq o'zgarishlar mijozga kerak emas).
+    - `retention_days` dan eski yozuvlar o'chiriladi; ulardan eski tokenlar keyingi so'rovda to'liq holatni oladi.
+
+    Returns:
+    - O'chirilgan yozuvlar soni.
+    """
+    retention_days = retention_days if retention_days is not None else get_setting("RETENTION_DAYS")
+    batch_size = batch_size or get_setting("BATCH_SIZE")
+
+    newer = Change.objects.filter(kind=OuterRef("kind"), object_id=OuterRef("object_id"), course_id=OuterRef("course_id"), id__gt=OuterRef("id"))
+    deleted = delete_in_batches(Change.objects.exclude(kind=Change.RESET).filter(Exists(newer)), batch_size)
+
+    expired = Change.objects.exclude(kind=Change.RESET).filter(created_at__lt=timezone.now() - timedelta(days=retention_days))
+    watermark = expired.aggregate(watermark=Max("id"))["watermark"]
+
+    if watermark is not None:
+        deleted += delete_in_batches(expired.filter(id__lte=watermark), batch_size)
+
+        with transaction.atomic():
+            Change.objects.filter(kind=Change.RESET).delete()
+            Change.objects.create(kind=Change.RESET, object_id=watermark)
+
+    return deleted
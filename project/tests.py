@@ -1,3 +1,1338 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from io import BytesIO, StringIO
+from itertools import count
+from unittest import addModuleCleanup, mock, skipIf
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import archive, events, leaderboard, media, multiplex, progress, sync
+from .models import ArchivedComment, Change, Comment, Course, Lesson, LessonProgress, LiveEvent, Rating
+
+User = get_user_model()
+
+SMALL = 2
+LARGE = 12
+
+# Har bir endpoint uchun javob vaqti budjeti (soniya, katta fixture'da). Budjetlar sekin CI uchun zaxira bilan
+# berilgan; N+1 regressiyalarini asosan so'rovlar soni ushlaydi. Juda sekin muhitda `LATENCY_BUDGET_SCALE` bilan kengaytiring.
+LATENCY_BUDGETS = {
+    "auth-register": 1.5,
+    "auth-login": 1.5,
+    "auth-refresh": 1.0,
+    "auth-whoami": 1.0,
+    "course-list": 3.0,
+    "course-list-stream": 3.0,
+    "course-detail": 1.5,
+    "course-create": 1.0,
+    "course-update": 1.5,
+    "course-destroy": 1.0,
+    "course-add-student": 1.5,
+    "course-remove-student": 1.5,
+    "course-progress": 1.0,
+    "course-students": 1.0,
+    "lesson-list": 2.0,
+    "lesson-detail": 1.0,
+    "lesson-create": 1.0,
+    "lesson-update": 1.0,
+    "lesson-destroy": 1.0,
+    "lesson-rating": 1.0,
+    "lesson-progress": 1.0,
+    "lesson-comments": 1.0,
+    "lesson-leaderboard": 1.5,
+    "comment-list": 1.5,
+    "comment-detail": 1.0,
+    "comment-create": 1.0,
+    "comment-update": 1.0,
+    "comment-destroy": 1.0,
+    "comment-batch": 1.0,
+    "rating-list": 1.5,
+    "rating-detail": 1.0,
+    "rating-create": 1.0,
+    "rating-update": 1.0,
+    "rating-destroy": 1.0,
+    "rating-batch": 1.0,
+    "send-notification": 2.0,
+    "batch": 2.0,
+    "sync-snapshot": 2.0,
+    "sync-delta": 1.0,
+}
+
+LATENCY_BUDGET_SCALE = float(os.environ.get("LATENCY_BUDGET_SCALE", 1))
+
+
+def setUpModule():
+    # Testlar bitta jarayonda: jonli lenta hodisalari jadval orqali emas, jarayon ichida tarqatiladi
+    # (`DatabaseBroker` ning so'rash oqimi test tranzaksiyasi bilan bir vaqtda bazani o'qimasligi uchun).
+    patcher = mock.patch.object(events, "_bus", events.EventBus(events.LocalBroker()))
+    patcher.start()
+    addModuleCleanup(patcher.stop)
+
+
+def format_queries(queries):
+    return "\n".join(f"  {number}. {query['sql']}" for number, query in enumerate(queries, 1))
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class EndpointBudgetTestCase(TestCase):
+    """
+    Har bir endpoint kichik va katta fixture'da bir xil sondagi SQL so'rov bajarishini va
+    javob vaqti budjetdan oshmasligini tekshiradi (N+1 regressiyalarini ushlash uchun).
+    """
+
+    def setUp(self):
+        self.numbers = count()
+        self.student = self.create_user()
+        self.admin = self.create_user(is_staff=True)
+        self.course = Course.objects.create(title="Kurs", description="Tavsif")
+        self.course.students.add(self.student)
+        self.lesson = Lesson.objects.create(course=self.course, name="Dars", video="videos/lesson.mp4")
+        self.comment = Comment.objects.create(lesson=self.lesson, creator=self.student, text="Izoh")
+        self.rating = Rating.objects.create(lesson=self.lesson, creator=self.student, liked=True)
+
+    def tearDown(self):
+        cache.clear()
+
+    def create_user(self, **extra_fields):
+        return User.objects.create_user(email=f"user{next(self.numbers)}@example.com", password="password", **extra_fields)
+
+    def seed(self, size):
+        """
+        Bazaga `size` ga mutanosib ma'lumot qo'shadi: asosiy kurs va darsga ham, yangi kurslarga ham.
+        """
+        users = User.objects.bulk_create([User(email=f"seed{next(self.numbers)}@example.com") for _ in range(size)])
+        courses = [self.course] + Course.objects.bulk_create([Course(title=f"Kurs {number}", description="Tavsif") for number in range(size)])
+
+        for course in courses:
+            course.students.add(self.student, *users)
+
+        lessons = Lesson.objects.bulk_create([Lesson(course=course, name=f"Dars {number}", video="videos/lesson.mp4") for course in courses for number in range(size)])
+        Comment.objects.bulk_create([Comment(lesson=lesson, creator=user, text="Izoh") for lesson in [self.lesson, *lessons] for user in users])
+        Rating.objects.bulk_create([Rating(lesson=lesson, creator=user, liked=bool(number % 2)) for lesson in [self.lesson, *lessons] for number, user in enumerate(users)])
+
+    def request(self, method, url, user=None, **kwargs):
+        """
+        So'rovni bajaradi va javob, bajarilgan SQL so'rovlar hamda vaqtni qaytaradi.
+        """
+        cache.clear()
+        client = APIClient()
+
+        if user is not None:
+            client.force_authenticate(user)
+
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = getattr(client, method)(url, **kwargs)
+
+            if response.streaming:
+                b"".join(response.streaming_content)
+
+            elapsed = time.perf_counter() - start
+
+        return response, context.captured_queries, elapsed
+
+    def assertBudget(self, name, make_request, status_code=200):
+        """
+        So'rovni kichik va katta fixture'da bajaradi: so'rovlar soni o'zgarmasligi va vaqt budjetda bo'lishi kerak.
+        """
+        self.seed(SMALL)
+        small_response, small_queries, _ = make_request()
+
+        self.seed(LARGE - SMALL)
+        large_response, large_queries, elapsed = make_request()
+
+        for response in (small_response, large_response):
+            self.assertEqual(response.status_code, status_code, f"{name}: {response.content[:500]!r}" if not response.streaming else name)
+
+        if len(large_queries) != len(small_queries):
+            self.fail(
+                f"{name}: so'rovlar soni ma'lumot hajmiga bog'liq ({len(small_queries)} -> {len(large_queries)})\n"
+                f"Kichik fixture:\n{format_queries(small_queries)}\nKatta fixture:\n{format_queries(large_queries)}"
+            )
+
+        budget = LATENCY_BUDGETS[name] * LATENCY_BUDGET_SCALE
+
+        if elapsed > budget:
+            self.fail(f"{name}: {elapsed:.3f}s, budjet {budget}s\n{format_queries(large_queries)}")
+
+    def test_auth_register(self):
+        self.assertBudget("auth-register", lambda: self.request("post", "/api/v1/auth/register/", data={"email": f"new{next(self.numbers)}@example.com", "password": "password"}, format="json"))
+
+    def test_auth_login(self):
+        self.assertBudget("auth-login", lambda: self.request("post", "/api/v1/auth/login/", data={"email": self.student.email, "password": "password"}, format="json"))
+
+    def test_auth_refresh(self):
+        refresh = self.client.post("/api/v1/auth/login/", {"email": self.student.email, "password": "password"}, content_type="application/json").json()["refresh"]
+
+        self.assertBudget("auth-refresh", lambda: self.request("post", "/api/v1/auth/refresh/", data={"refresh": refresh}, format="json"))
+
+    def test_auth_whoami(self):
+        self.assertBudget("auth-whoami", lambda: self.request("get", "/api/v1/auth/whoami/", self.student))
+
+    def test_course_list(self):
+        self.assertBudget("course-list", lambda: self.request("get", "/api/v1/course/", self.student))
+
+    def test_course_list_stream(self):
+        self.assertBudget("course-list-stream", lambda: self.request("get", "/api/v1/course/?stream=true", self.admin))
+
+    def test_course_detail(self):
+        self.assertBudget("course-detail", lambda: self.request("get", f"/api/v1/course/{self.course.pk}/", self.student))
+
+    def test_course_create(self):
+        self.assertBudget("course-create", lambda: self.request("post", "/api/v1/course/", self.admin, data={"title": "Yangi kurs", "description": "Tavsif"}, format="json"), status_code=201)
+
+    def test_course_update(self):
+        self.assertBudget("course-update", lambda: self.request("patch", f"/api/v1/course/{self.course.pk}/", self.admin, data={"title": "Kurs"}, format="json"))
+
+    def test_course_destroy(self):
+        def make_request():
+            course = Course.objects.create(title="Kurs", description="Tavsif")
+            course.students.add(self.student)
+            return self.request("delete", f"/api/v1/course/{course.pk}/", self.admin)
+
+        self.assertBudget("course-destroy", make_request, status_code=204)
+
+    def test_course_add_student(self):
+        self.assertBudget("course-add-student", lambda: self.request("post", f"/api/v1/course/{self.course.pk}/add-student/", self.admin, data={"student_id": self.create_user().pk}))
+
+    def test_course_remove_student(self):
+        def make_request():
+            student = self.create_user()
+            self.course.students.add(student)
+            return self.request("post", f"/api/v1/course/{self.course.pk}/remove-student/", self.admin, data={"student_id": student.pk})
+
+        self.assertBudget("course-remove-student", make_request)
+
+    def test_course_progress(self):
+        self.assertBudget("course-progress", lambda: self.request("get", f"/api/v1/course/{self.course.pk}/progress/", self.student))
+
+    def test_course_students(self):
+        self.assertBudget("course-students", lambda: self.request("get", f"/api/v1/course/{self.course.pk}/students/?limit=5&search=example", self.student))
+
+    def test_lesson_list(self):
+        self.assertBudget("lesson-list", lambda: self.request("get", "/api/v1/lesson/", self.student))
+
+    def test_lesson_detail(self):
+        self.assertBudget("lesson-detail", lambda: self.request("get", f"/api/v1/lesson/{self.lesson.pk}/", self.student))
+
+    def test_lesson_create(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+
+        with override_settings(MEDIA_ROOT=media_root):
+            self.assertBudget("lesson-create", lambda: self.request("post", "/api/v1/lesson/", self.admin, data={"course": self.course.pk, "name": "Yangi dars", "video": SimpleUploadedFile("lesson.mp4", b"video")}), status_code=201)
+
+    def test_lesson_update(self):
+        self.assertBudget("lesson-update", lambda: self.request("patch", f"/api/v1/lesson/{self.lesson.pk}/", self.admin, data={"name": "Dars"}))
+
+    def test_lesson_destroy(self):
+        def make_request():
+            lesson = Lesson.objects.create(course=self.course, name="Dars", video="videos/lesson.mp4")
+            return self.request("delete", f"/api/v1/lesson/{lesson.pk}/", self.admin)
+
+        self.assertBudget("lesson-destroy", make_request, status_code=204)
+
+    def test_lesson_rating(self):
+        def make_request():
+            student = self.create_user()
+            self.course.students.add(student)
+            return self.request("put", f"/api/v1/lesson/{self.lesson.pk}/rating/", student, data={"liked": True}, format="json")
+
+        self.assertBudget("lesson-rating", make_request)
+
+    def test_lesson_progress(self):
+        self.assertBudget("lesson-progress", lambda: self.request("post", f"/api/v1/lesson/{self.lesson.pk}/progress/", self.student, data={"position": 10}, format="json"), status_code=202)
+
+        # Buferdagi hodisalar test tranzaksiyasi ichida yoziladi.
+        progress.get_buffer().flush()
+
+    def test_lesson_comments(self):
+        self.assertBudget("lesson-comments", lambda: self.request("get", f"/api/v1/lesson/{self.lesson.pk}/comments/", self.student))
+
+    def test_lesson_leaderboard(self):
+        self.assertBudget("lesson-leaderboard", lambda: self.request("get", f"/api/v1/lesson/leaderboard/?course={self.course.pk}", self.student))
+
+    def test_comment_list(self):
+        self.assertBudget("comment-list", lambda: self.request("get", "/api/v1/comment/", self.admin))
+
+    def test_comment_detail(self):
+        self.assertBudget("comment-detail", lambda: self.request("get", f"/api/v1/comment/{self.comment.pk}/", self.student))
+
+    def test_comment_create(self):
+        self.assertBudget("comment-create", lambda: self.request("post", "/api/v1/comment/", self.student, data={"lesson": self.lesson.pk, "text": "Izoh"}, format="json"), status_code=201)
+
+    def test_comment_update(self):
+        self.assertBudget("comment-update", lambda: self.request("patch", f"/api/v1/comment/{self.comment.pk}/", self.student, data={"text": "Yangi izoh"}, format="json"))
+
+    def test_comment_destroy(self):
+        def make_request():
+            comment = Comment.objects.create(lesson=self.lesson, creator=self.student, text="Izoh")
+            return self.request("delete", f"/api/v1/comment/{comment.pk}/", self.student)
+
+        self.assertBudget("comment-destroy", make_request, status_code=204)
+
+    def test_comment_batch(self):
+        data = [{"lesson": self.lesson.pk, "text": f"Izoh {number}"} for number in range(3)]
+
+        self.assertBudget("comment-batch", lambda: self.request("post", "/api/v1/comment/batch/", self.student, data=data, format="json"), status_code=201)
+
+    def test_rating_list(self):
+        self.assertBudget("rating-list", lambda: self.request("get", "/api/v1/rating/", self.admin))
+
+    def test_rating_detail(self):
+        self.assertBudget("rating-detail", lambda: self.request("get", f"/api/v1/rating/{self.rating.pk}/", self.student))
+
+    def test_rating_create(self):
+        def make_request():
+            lesson = Lesson.objects.create(course=self.course, name="Dars", video="videos/lesson.mp4")
+            return self.request("post", "/api/v1/rating/", self.student, data={"lesson": lesson.pk, "liked": True}, format="json")
+
+        self.assertBudget("rating-create", make_request, status_code=201)
+
+    def test_rating_update(self):
+        self.assertBudget("rating-update", lambda: self.request("patch", f"/api/v1/rating/{self.rating.pk}/", self.student, data={"liked": False}, format="json"))
+
+    def test_rating_destroy(self):
+        def make_request():
+            lesson = Lesson.objects.create(course=self.course, name="Dars", video="videos/lesson.mp4")
+            rating = Rating.objects.create(lesson=lesson, creator=self.student, liked=True)
+            return self.request("delete", f"/api/v1/rating/{rating.pk}/", self.student)
+
+        self.assertBudget("rating-destroy", make_request, status_code=204)
+
+    def test_rating_batch(self):
+        self.assertBudget("rating-batch", lambda: self.request("post", "/api/v1/rating/batch/", self.student, data=[{"lesson": self.lesson.pk, "liked": False}], format="json"), status_code=201)
+
+    def test_send_notification(self):
+        data = {"title": "Salom, %(email)s", "body": "Yangi dars qo'shildi", "for_student": True}
+
+        self.assertBudget("send-notification", lambda: self.request("post", "/api/v1/send-notification/", self.admin, data=data, format="json"))
+
+    def test_batch(self):
+        token = RefreshToken.for_user(self.student).access_token
+        data = {
+            "requests": [
+                {"method": "GET", "path": "/api/v1/auth/whoami/"},
+                {"method": "GET", "path": f"/api/v1/course/{self.course.pk}/"},
+                {"method": "GET", "path": f"/api/v1/lesson/{self.lesson.pk}/"},
+                {"method": "GET", "path": f"/api/v1/comment/?lesson={self.lesson.pk}"},
+                {"method": "GET", "path": f"/api/v1/rating/?lesson={self.lesson.pk}"},
+            ],
+        }
+
+        self.assertBudget("batch", lambda: self.request("post", "/api/v1/batch/", data=data, format="json", HTTP_AUTHORIZATION=f"Bearer {token}"))
+
+    @override_settings(SYNC={"PAGE_SIZE": 2})
+    def test_sync_snapshot(self):
+        # Sahifa ikkala fixture'da ham kurslar bo'limida to'ladi.
+        self.assertBudget("sync-snapshot", lambda: self.request("get", "/api/v1/sync/", self.student))
+
+    @override_settings(SYNC={"SETTLE_SECONDS": 0})
+    def test_sync_delta(self):
+        token = sync.make_token(self.student, Change.objects.order_by("-id").values_list("id", flat=True).first())
+        rating_id = self.rating.pk
+
+        with self.captureOnCommitCallbacks(execute=True):
+            comment = Comment.objects.create(lesson=self.lesson, creator=self.student, text="Yangi izoh")
+            self.rating.delete()
+
+        self.assertBudget("sync-delta", lambda: self.request("get", "/api/v1/sync/", self.student, data={"token": token}))
+
+        data = self.request("get", "/api/v1/sync/", self.student, data={"token": token})[0].json()
+
+        self.assertFalse(data["reset"])
+        self.assertIn(comment.pk, [item["id"] for item in data["comments"]["updated"]])
+        self.assertIn(self.lesson.pk, [item["id"] for item in data["lessons"]["updated"]])
+        self.assertEqual(data["ratings"]["deleted"], [rating_id])
+        self.assertNotIn(rating_id, [item["id"] for item in data["ratings"]["updated"]])
+
+
+class AdminChangelistTestCase(TestCase):
+    """
+    Matnli filtrli admin ro'yxatlari oddiy, filtrlangan va "Sonlarni ko'rsatish" (`_facets`) rejimlarida ochilishini tekshiradi.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email="admin@example.com", password="password")
+        self.course = Course.objects.create(title="Kurs", description="Tavsif")
+        self.lesson = Lesson.objects.create(course=self.course, name="Dars", video="videos/lesson.mp4")
+        Comment.objects.create(lesson=self.lesson, creator=self.admin, text="Izoh")
+        Rating.objects.create(lesson=self.lesson, creator=self.admin, liked=True)
+        self.client.force_login(self.admin)
+
+    def test_input_filters(self):
+        urls = {
+            "/admin/project/course/": ("student_email", "admin@example.com"),
+            "/admin/project/lesson/": ("course_id", self.course.pk),
+            "/admin/project/comment/": ("lesson_id", self.lesson.pk),
+            "/admin/project/rating/": ("lesson_id", self.lesson.pk),
+        }
+
+        for url, (name, value) in urls.items():
+            for params in ("", "?_facets=True", f"?{name}={value}", f"?{name}={value}&_facets=True"):
+                with self.subTest(url=url, params=params):
+                    response = self.client.get(url + params)
+
+                    self.assertEqual(response.status_code, 200)
+                    self.assertContains(response, f'<input type="text" name="{name}"')
+
+
+class BatchCreateTestCase(TestCase):
+    """
+    `POST .../batch/`: elementlar bo'yicha xatolar (`207`), baholar upsert'i va `bulk_create` chetlab o'tadigan
+    signallar o'rniga bajariladigan yangilanishlar.
+    """
+
+    def setUp(self):
+        self.student = User.objects.create_user(email="student@example.com", password="password")
+        self.course = Course.objects.create(title="Kurs", description="Tavsif")
+        self.course.students.add(self.student)
+        self.lessons = [Lesson.objects.create(course=self.course, name=f"Dars {number}", video="videos/lesson.mp4") for number in range(2)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_partial_failure_returns_207(self):
+        data = [
+            {"lesson": self.lessons[0].pk, "text": "Izoh"},
+            {"lesson": self.lessons[0].pk},
+            {"lesson": 0, "text": "Izoh"},
+        ]
+
+        response = self.client.post("/api/v1/comment/batch/", data, format="json")
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([item["status"] for item in response.data], [201, 400, 400])
+        self.assertEqual(set(response.data[1]["errors"]), {"text"})
+        self.assertEqual(set(response.data[2]["errors"]), {"lesson"})
+        self.assertEqual(list(Comment.objects.values_list("pk", flat=True)), [response.data[0]["data"]["id"]])
+
+    def test_all_valid_returns_201(self):
+        response = self.client.post("/api/v1/comment/batch/", [{"lesson": lesson.pk, "text": "Izoh"} for lesson in self.lessons], format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([item["status"] for item in response.data], [201, 201])
+
+    def test_rating_batch_upserts(self):
+        existing = Rating.objects.create(lesson=self.lessons[0], creator=self.student, liked=True)
+        data = [
+            {"lesson": self.lessons[0].pk, "liked": False},
+            {"lesson": self.lessons[1].pk, "liked": True},
+        ]
+
+        response = self.client.post("/api/v1/rating/batch/", data, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Rating.objects.count(), 2)
+
+        ratings = {rating.lesson_id: rating for rating in Rating.objects.all()}
+
+        self.assertEqual([item["data"]["id"] for item in response.data], [existing.pk, ratings[self.lessons[1].pk].pk])
+        self.assertFalse(ratings[self.lessons[0].pk].liked)
+
+        response = self.client.post("/api/v1/rating/batch/", [{"lesson": self.lessons[0].pk, "liked": True}], format="json")
+
+        self.assertEqual(response.data[0]["data"]["id"], existing.pk)
+        self.assertEqual(Rating.objects.filter(lesson=self.lessons[0], creator=self.student).count(), 1)
+        self.assertEqual(Lesson.objects.get(pk=self.lessons[0].pk).likes_count, 1)
+
+    def test_side_effects_without_signals(self):
+        lesson = self.lessons[0]
+        version = lesson.version
+
+        with mock.patch("project.signals.publish") as publish, self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/api/v1/comment/batch/", [{"lesson": lesson.pk, "text": f"Izoh {number}"} for number in range(2)], format="json")
+
+        ids = [item["data"]["id"] for item in response.data]
+        lesson.refresh_from_db()
+
+        self.assertEqual(lesson.comments_count, 2)
+        self.assertGreater(lesson.version, version)
+        self.assertEqual(sorted(Change.objects.filter(kind=Change.COMMENT).values_list("object_id", "course_id")), [(pk, self.course.pk) for pk in ids])
+        self.assertEqual(
+            [(call.args[0], call.args[1], call.args[2]["id"]) for call in publish.call_args_list],
+            [(events.lesson_channel(lesson.pk), "comment.created", pk) for pk in ids],
+        )
+
+        with mock.patch("project.signals.publish") as publish, self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/v1/rating/batch/", [{"lesson": lesson.pk, "liked": True}], format="json")
+
+        lesson.refresh_from_db()
+
+        self.assertEqual((lesson.likes_count, lesson.ratings_count), (1, 1))
+        self.assertTrue(Change.objects.filter(kind=Change.RATING, course_id=self.course.pk).exists())
+        self.assertEqual([call.args[1] for call in publish.call_args_list], ["rating.changed"])
+
+
+class LessonRatingTestCase(TestCase):
+    """
+    `PUT/DELETE /lesson/{id}/rating/`: bitta baho qatori, javobdagi yangi hisoblagichlar va takroriy so'rovlar xavfsizligi.
+    """
+
+    def setUp(self):
+        self.student = User.objects.create_user(email="student@example.com", password="password")
+        self.other = User.objects.create_user(email="other@example.com", password="password")
+        self.course = Course.objects.create(title="Kurs", description="Tavsif")
+        self.course.students.add(self.student, self.other)
+        self.lesson = Lesson.objects.create(course=self.course, name="Dars", video="videos/lesson.mp4")
+        Rating.objects.create(lesson=self.lesson, creator=self.other, liked=True)
+        self.url = f"/api/v1/lesson/{self.lesson.pk}/rating/"
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def get_summary(self, response):
+        self.assertEqual(response.status_code, 200)
+        return {key: response.data[key] for key in ("liked", "likes_count", "ratings_count", "rating")}
+
+    def test_repeated_put_keeps_single_rating(self):
+        for _ in range(2):
+            summary = self.get_summary(self.client.put(self.url, {"liked": False}, format="json"))
+
+            self.assertEqual(summary, {"liked": False, "likes_count": 1, "ratings_count": 2, "rating": 50})
+            self.assertEqual(Rating.objects.filter(lesson=self.lesson, creator=self.student).count(), 1)
+
+        summary = self.get_summary(self.client.put(self.url, {"liked": True}, format="json"))
+
+        self.assertEqual(summary, {"liked": True, "likes_count": 2, "ratings_count": 2, "rating": 100})
+        self.assertEqual(Rating.objects.filter(lesson=self.lesson, creator=self.student).count(), 1)
+
+    def test_delete_is_idempotent(self):
+        self.client.put(self.url, {"liked": False}, format="json")
+
+        for _ in range(2):
+            summary = self.get_summary(self.client.delete(self.url))
+
+            self.assertEqual(summary, {"liked": None, "likes_count": 1, "ratings_count": 1, "rating": 100})
+            self.assertFalse(Rating.objects.filter(lesson=self.lesson, creator=self.student).exists())
+
+    def test_invalid_body(self):
+        response = self.client.put(self.url, {}, format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Rating.objects.filter(creator=self.student).exists())
+
+
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class CourseStudentsTestCase(TestCase):
+    """
+    Kurs talabalari ro'yxatining keyset sahifalanishi va `student_count` hisoblagichi.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_user(email="admin@example.com", password="password", is_staff=True)
+        self.courses = [Course.objects.create(title=f"Kurs {number}", description="Tavsif") for number in range(2)]
+        self.students = [User.objects.create_user(email=f"student{number}@example.com", password="password", first_name=f"Talaba{number}") for number in range(5)]
+        self.courses[0].students.add(*self.students)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def tearDown(self):
+        cache.clear()
+
+    def get_counts(self):
+        return list(Course.objects.filter(pk__in=[course.pk for course in self.courses]).order_by("pk").values_list("student_count", flat=True))
+
+    def test_keyset_pages_follow_next(self):
+        url = f"http://testserver/api/v1/course/{self.courses[0].pk}/students/?limit=2"
+        pages = []
+
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data["count"], 5)
+            pages.append([student["id"] for student in response.data["results"]])
+            url = response.data["next"]
+
+        ids = [student.pk for student in self.students]
+
+        self.assertEqual(pages, [ids[:2], ids[2:4], ids[4:]])
+
+    def test_after_and_search(self):
+        url = f"/api/v1/course/{self.courses[0].pk}/students/"
+        response = self.client.get(url, {"after": self.students[2].pk})
+
+        self.assertEqual([student["id"] for student in response.data["results"]], [student.pk for student in self.students[3:]])
+        self.assertIsNone(response.data["next"])
+
+        response = self.client.get(url, {"search": "talaba3"})
+
+        self.assertEqual([student["id"] for student in response.data["results"]], [self.students[3].pk])
+        self.assertEqual(self.client.get(url, {"limit": 0}).status_code, 400)
+
+    def test_student_count_follows_membership(self):
+        first, second = self.courses
+        student = self.students[0]
+        steps = [
+            ("add", lambda: second.students.add(*self.students[:3]), [5, 3]),
+            ("add-reverse", lambda: self.students[3].course_set.add(second), [5, 4]),
+            ("add-existing", lambda: second.students.add(self.students[0]), [5, 4]),
+            ("remove", lambda: first.students.remove(self.students[4]), [4, 4]),
+            ("remove-reverse", lambda: student.course_set.remove(second), [4, 3]),
+            ("clear-reverse", lambda: self.students[1].course_set.clear(), [3, 2]),
+            ("delete-user", lambda: self.students[2].delete(), [2, 1]),
+            ("clear", lambda: second.students.clear(), [2, 0]),
+        ]
+
+        for name, change, expected in steps:
+            change()
+
+            with self.subTest(step=name):
+                self.assertEqual(self.get_counts(), expected)
+                self.assertEqual(expected, [course.students.count() for course in self.courses])
+
+
+class ConditionalGetTestCase(TestCase):
+    """
+    `ETag`/`Last-Modified` bo'yicha shartli so'rovlarni va ichki izoh/baho o'zgarganda ETag yangilanishini tekshiradi.
+    """
+
+    def setUp(self):
+        self.student = User.objects.create_user(email="student@example.com", password="password")
+        self.course = Course.objects.create(title="Kurs", description="Tavsif")
+        self.course.students.add(self.student)
+        self.lesson = Lesson.objects.create(course=self.course, name="Dars", video="videos/lesson.mp4")
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def tearDown(self):
+        cache.clear()
+
+    def get_etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def test_if_none_match_returns_304(self):
+        for url in (f"/api/v1/lesson/{self.lesson.pk}/", "/api/v1/lesson/", f"/api/v1/course/{self.course.pk}/", "/api/v1/course/"):
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=self.get_etag(url))
+
+                self.assertEqual(response.status_code, 304)
+                self.assertFalse(response.content)
+
+    def test_if_modified_since_returns_304(self):
+        url = f"/api/v1/lesson/{self.lesson.pk}/"
+        last_modified = self.client.get(url)["Last-Modified"]
+
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+    def test_list_ignores_if_modified_since_after_removal(self):
+        other = Lesson.objects.create(course=self.course, name="Boshqa dars", video="videos/lesson.mp4")
+        since = http_date(time.time() + 60)
+        removals = [
+            ("/api/v1/lesson/", other.pk, lambda: other.delete()),
+            ("/api/v1/course/", self.course.pk, lambda: self.course.students.remove(self.student)),
+        ]
+
+        for url, pk, remove in removals:
+            with self.subTest(url=url):
+                self.assertFalse(self.client.get(url).has_header("Last-Modified"))
+                remove()
+
+                response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertNotIn(pk, [item["id"] for item in response.data["results"]])
+
+    def test_stale_etag_returns_200(self):
+        url = f"/api/v1/lesson/{self.lesson.pk}/"
+        etag = self.get_etag(url)
+        Lesson.objects.filter(pk=self.lesson.pk).update(name="Yangi dars")
+        Lesson.touch(self.lesson.pk)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["name"], "Yangi dars")
+
+    def test_gzip_stream_has_own_etag(self):
+        url = "/api/v1/lesson/?stream=true"
+        plain = self.client.get(url)
+        compressed = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+
+        for response in (plain, compressed):
+            self.assertIn("Accept-Encoding", response["Vary"])
+
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertNotEqual(plain["ETag"], compressed["ETag"])
+        self.assertEqual(self.client.get(url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=plain["ETag"]).status_code, 200)
+
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=compressed["ETag"])
+
+        self.assertEqual(response.status_code, 304)
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_nested_changes_change_etag(self):
+        urls = [f"/api/v1/lesson/{self.lesson.pk}/", "/api/v1/lesson/", f"/api/v1/course/{self.course.pk}/", "/api/v1/course/"]
+        changes = [
+            ("comment-create", lambda: Comment.objects.create(lesson=self.lesson, creator=self.student, text="Izoh")),
+            ("comment-update", lambda: Comment.objects.get(lesson=self.lesson).save()),
+            ("rating-create", lambda: Rating.objects.create(lesson=self.lesson, creator=self.student, liked=True)),
+            ("rating-update", lambda: Rating.objects.filter(lesson=self.lesson).first().save()),
+            ("rating-delete", lambda: Rating.objects.filter(lesson=self.lesson).delete()),
+            ("comment-delete", lambda: Comment.objects.filter(lesson=self.lesson).delete()),
+        ]
+
+        for name, change in changes:
+            etags = {url: self.get_etag(url) for url in urls}
+            change()
+
+            for url in urls:
+                with self.subTest(change=name, url=url):
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+
+                    self.assertEqual(response.status_code, 200)
+                    self.assertNotEqual(response["ETag"], etags[url])
+
+
+class ActivityExportTestCase(TestCase):
+    """
+    Faoliyat eksportida vaqt oralig'i filtrlarini va arxivlangan izohlar eksportga kirishini tekshiradi.
+    """
+
+    def setUp(self):
+        self.admin = User.objects.create_user(email="admin@example.com", password="password", is_staff=True)
+        course = Course.objects.create(title="Kurs", description="Tavsif")
+        course.students.add(self.admin)
+        lesson = Lesson.objects.create(course=course, name="Dars", video="videos/lesson.mp4")
+        self.old = Comment.objects.create(lesson=lesson, creator=self.admin, text="Eski")
+        self.new = Comment.objects.create(lesson=lesson, creator=self.admin, text="Yangi")
+        Comment.objects.filter(pk=self.old.pk).update(created_at=timezone.now() - timedelta(days=10))
+        Rating.objects.create(lesson=lesson, creator=self.admin, liked=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def export(self, kind, **params):
+        response = self.client.get(f"/api/v1/export/{kind}/", params)
+
+        if response.status_code != 200:
+            return response, None
+
+        return response, [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+
+    def test_comments_filtered_by_time_range(self):
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        until = (timezone.now() - timedelta(days=5)).isoformat()
+
+        self.assertEqual([row["id"] for row in self.export("comments", since=since)[1]], [self.new.pk])
+        self.assertEqual([row["id"] for row in self.export("comments", until=until)[1]], [self.old.pk])
+        self.assertEqual(len(self.export("comments")[1]), 2)
+
+    def test_time_range_rejected_without_timestamp(self):
+        since = timezone.now().isoformat()
+
+        for kind in ("ratings", "enrollments"):
+            with self.subTest(kind=kind):
+                response, _ = self.export(kind, since=since, until=since)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(set(response.data), {"since", "until"})
+                self.assertEqual(len(self.export(kind)[1]), 1)
+
+    def test_comments_include_archived(self):
+        self.assertEqual(archive.archive_comments(older_than=timedelta(days=5)), 1)
+
+        rows = self.export("comments")[1]
+
+        self.assertEqual([(row["id"], row["text"]) for row in rows], [(self.old.pk, "Eski"), (self.new.pk, "Yangi")])
+        self.assertEqual(rows[0]["course_id"], self.new.lesson.course_id)
+        self.assertEqual([row["id"] for row in self.export("comments", after_id=self.old.pk)[1]], [self.new.pk])
+        self.assertEqual([row["id"] for row in self.export("comments", until=(timezone.now() - timedelta(days=5)).isoformat())[1]], [self.old.pk])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "comments.ndjson")
+            call_command("export_activity", "comments", output=path, stdout=StringIO())
+
+            with open(path, encoding="utf-8") as file:
+                self.assertEqual([json.loads(line)["id"] for line in file], [self.old.pk, self.new.pk])
+
+
+class CommentArchiveTestCase(TestCase):
+    """
+    Izohlarni arxivlash buyrug'i va arxiv bilan birga sahifalangan izohlar tarixini tekshiradi.
+    """
+
+    def setUp(self):
+        self.student = User.objects.create_user(email="student@example.com", password="password")
+        self.course = Course.objects.create(title="Kurs", description="Tavsif")
+        self.course.students.add(self.student)
+        self.lesson = Lesson.objects.create(course=self.course, name="Dars", video="videos/lesson.mp4")
+        self.comments = [Comment.objects.create(lesson=self.lesson, creator=self.student, text=f"Izoh {number}") for number in range(5)]
+        Comment.objects.filter(pk__in=[comment.pk for comment in self.comments[:3]]).update(created_at=timezone.now() - timedelta(days=200))
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def tearDown(self):
+        cache.clear()
+
+    def archive(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("archive_comments", days=180, batch_size=2, stdout=StringIO())
+
+    def test_archive_moves_old_comments(self):
+        leaderboard.reconcile()
+        version = Lesson.objects.get(pk=self.lesson.pk).version
+
+        self.archive()
+
+        archived = [comment.pk for comment in self.comments[:3]]
+        lesson = Lesson.objects.get(pk=self.lesson.pk)
+
+        self.assertEqual(sorted(ArchivedComment.objects.values_list("pk", flat=True)), archived)
+        self.assertFalse(Comment.objects.filter(pk__in=archived).exists())
+        self.assertEqual(lesson.comments_count, 5)
+        self.assertGreater(lesson.version, version)
+        self.assertEqual(leaderboard.get_top("comments")[0]["comments_count"], 5)
+        self.assertEqual(
+            sorted(Change.objects.filter(kind=Change.COMMENT, deleted=True).values_list("object_id", "course_id")),
+            [(pk, self.course.pk) for pk in archived],
+        )
+
+        # Ikkinchi ishga tushirishda ko'chiriladigan izoh qolmagan.
+        self.archive()
+        self.assertEqual(ArchivedComment.objects.count(), 3)
+
+    def test_history_pages_through_archive(self):
+        self.archive()
+
+        url = f"/api/v1/lesson/{self.lesson.pk}/comments/?limit=2"
+        pages = []
+
+        while url:
+            data = self.client.get(url).json()
+            pages.append([(item["id"], item["archived"]) for item in data["results"]])
+            url = data["next"]
+
+        expected = [(comment.pk, index < 3) for index, comment in enumerate(self.comments)][::-1]
+
+        self.assertEqual([item for page in pages for item in page], expected)
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+
+
+class LessonMediaTestCase(TestCase):
+    """
+    Dars hosilalari: worker'larga uzatiladigan sozlamalar va mazmun xeshli thumbnail nomlari.
+    """
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        self.course = Course.objects.create(title="Kurs", description="Tavsif")
+
+    def test_worker_settings_follow_overrides(self):
+        with override_settings(MEDIA_ROOT=self.media_root):
+            worker_settings = media.get_worker_settings()
+
+        self.assertEqual(worker_settings["MEDIA_ROOT"], self.media_root)
+        self.assertEqual(worker_settings["DATABASES"]["default"]["NAME"], connection.settings_dict["NAME"])
+
+    @skipIf(media.Image is None, "Pillow o'rnatilmagan")
+    def test_thumbnail_names_change_with_content(self):
+        with override_settings(MEDIA_ROOT=self.media_root, LESSON_MEDIA={"WORKERS": 0, "THUMBNAIL_SIZES": {"small": 16}}):
+            paths = []
+
+            for color in ("red", "blue"):
+                buffer = BytesIO()
+                media.Image.new("RGB", (64, 64), color).save(buffer, format="PNG")
+
+                with self.captureOnCommitCallbacks(execute=True):
+                    lesson = Lesson.objects.filter(name="Dars").first() or Lesson(course=self.course, name="Dars")
+                    lesson.video = SimpleUploadedFile(f"{color}.png", buffer.getvalue())
+                    lesson.save()
+
+                lesson.refresh_from_db()
+                paths.append(lesson.thumbnails["small"])
+
+            self.assertEqual(lesson.media_status, Lesson.MEDIA_READY)
+            self.assertNotEqual(*paths)
+            self.assertRegex(paths[1], rf"^thumbnails/{lesson.pk}/small-[0-9a-f]{{12}}\.jpg$")
+            self.assertFalse(os.path.exists(os.path.join(self.media_root, paths[0])))
+            self.assertTrue(os.path.exists(os.path.join(self.media_root, paths[1])))
+
+
+class LessonProgressTestCase(TestCase):
+    """
+    Kurs progressi boshqa worker buferidagi hali yozilmagan hodisalarni ham ko'rishini tekshiradi.
+    """
+
+    def setUp(self):
+        self.student = User.objects.create_user(email="student@example.com", password="password")
+        self.course = Course.objects.create(title="Kurs", description="Tavsif")
+        self.course.students.add(self.student)
+        self.lessons = [Lesson.objects.create(course=self.course, name=f"Dars {number}", video="videos/lesson.mp4") for number in range(2)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_summary_includes_other_worker_buffer(self):
+        local = progress.ProgressBuffer()
+        other = progress.ProgressBuffer()
+        self.addCleanup(local.stop)
+        self.addCleanup(other.stop)
+
+        with mock.patch.object(progress, "_buffer", local):
+            self.client.post(f"/api/v1/lesson/{self.lessons[0].pk}/progress/", {"position": 30}, format="json")
+            other.add(self.student.pk, self.lessons[1].pk, 90, completed=True)
+
+            data = self.client.get(f"/api/v1/course/{self.course.pk}/progress/").json()
+
+            self.assertEqual(data["lessons_completed"], 1)
+            self.assertEqual([(item["lesson"], item["position"], item["completed"]) for item in data["lessons"]], [(self.lessons[0].pk, 30, False), (self.lessons[1].pk, 90, True)])
+
+            # Kesh yozuvi bazadagidan eski bo'lsa, bazadagi qiymat ustun.
+            other.flush()
+            LessonProgress.objects.filter(user=self.student, lesson=self.lessons[1]).update(position=150, updated_at=timezone.now())
+            data = self.client.get(f"/api/v1/course/{self.course.pk}/progress/").json()
+
+            self.assertEqual(data["lessons"][1]["position"], 150)
+            self.assertTrue(data["lessons"][1]["completed"])
+
+    def test_flush_drops_deleted_lesson_and_user(self):
+        buffer = progress.ProgressBuffer()
+        self.addCleanup(buffer.stop)
+        other = User.objects.create_user(email="other@example.com", password="password")
+
+        buffer.add(self.student.pk, self.lessons[0].pk, 30)
+        buffer.add(self.student.pk, self.lessons[1].pk, 60)
+        buffer.add(other.pk, self.lessons[0].pk, 90)
+        self.lessons[1].delete()
+        other.delete()
+
+        self.assertEqual(buffer.flush(), 1)
+        self.assertEqual(buffer.entries, {})
+        self.assertEqual(list(LessonProgress.objects.values_list("user_id", "lesson_id", "position")), [(self.student.pk, self.lessons[0].pk, 30)])
+
+
+class LeaderboardTestCase(TestCase):
+    """
+    Reyting jadvali bazadagi ballardan o'qilishini va baho/izoh bilan darhol yangilanishini tekshiradi.
+    """
+
+    def setUp(self):
+        self.users = [User.objects.create_user(email=f"user{number}@example.com", password="password") for number in range(3)]
+        self.courses = [Course.objects.create(title=f"Kurs {number}", description="Tavsif") for number in range(2)]
+        self.lessons = [Lesson.objects.create(course=self.courses[number % 2], name=f"Dars {number}", video="videos/lesson.mp4") for number in range(3)]
+
+    def get_lessons(self, metric, course_id=None):
+        return [entry["lesson"] for entry in leaderboard.get_top(metric, course_id)]
+
+    def test_ratings_update_ranking(self):
+        first, second, third = self.lessons
+        self.assertEqual(self.get_lessons("rating"), [first.pk, second.pk, third.pk])
+
+        for user in self.users:
+            Rating.objects.create(lesson=third, creator=user, liked=True)
+
+        Rating.objects.create(lesson=second, creator=self.users[0], liked=True)
+
+        self.assertEqual(self.get_lessons("rating"), [third.pk, second.pk, first.pk])
+        self.assertEqual(self.get_lessons("rating", self.courses[0].pk), [third.pk, first.pk])
+
+        Rating.objects.filter(lesson=third).update(liked=False)
+        Lesson.refresh_rating_counts(third.pk)
+
+        self.assertEqual(self.get_lessons("rating")[0], second.pk)
+
+    def test_comments_update_ranking(self):
+        first, second, third = self.lessons
+        Comment.objects.create(lesson=second, creator=self.users[0], text="Izoh")
+
+        self.assertEqual(self.get_lessons("comments"), [second.pk, first.pk, third.pk])
+
+        Comment.objects.filter(lesson=second).delete()
+
+        self.assertEqual(self.get_lessons("comments"), [first.pk, second.pk, third.pk])
+
+    def test_reconcile_restores_scores(self):
+        Rating.objects.create(lesson=self.lessons[2], creator=self.users[0], liked=True)
+        Lesson.objects.update(rating_score=0)
+
+        self.assertEqual(leaderboard.reconcile(), 1)
+        self.assertEqual(self.get_lessons("rating")[0], self.lessons[2].pk)
+        self.assertEqual(leaderboard.reconcile(), 0)
+
+
+class BatchAPITestCase(TransactionTestCase):
+    """
+    Batch API: faqat API manzillari, bir martalik autentifikatsiya, batch keshi, sub-so'rovlar sessiyasi, parallel rejim.
+    """
+
+    def setUp(self):
+        self.student = User.objects.create_user(email="student@example.com", password="password")
+        self.course = Course.objects.create(title="Kurs", description="Tavsif")
+        self.course.students.add(self.student)
+        # `media_source` fayl bilan bir xil: tasdiqlangan tranzaksiyada hosilalar navbatga qo'yilmaydi.
+        self.lesson = Lesson.objects.create(course=self.course, name="Dars", video="videos/lesson.mp4", media_source="videos/lesson.mp4")
+        self.client = APIClient()
+
+    def tearDown(self):
+        cache.clear()
+
+    def batch(self, requests, parallel=False, **extra):
+        response = self.client.post("/api/v1/batch/", {"requests": requests, "parallel": parallel}, format="json", **extra)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()["results"]
+
+    def bearer(self):
+        return {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(self.student).access_token}"}
+
+    def test_only_api_paths(self):
+        results = self.batch(
+            [
+                {"method": "GET", "path": "/admin/"},
+                {"method": "GET", "path": "/logout/"},
+                {"method": "GET", "path": "/swagger/"},
+                {"method": "GET", "path": f"/api/v1/course/{self.course.pk}/"},
+            ],
+            **self.bearer(),
+        )
+
+        self.assertEqual([result["status"] for result in results], [400, 400, 400, 200])
+
+    def test_subrequests_authenticate_with_jwt(self):
+        results = self.batch([{"method": "GET", "path": f"/api/v1/course/{self.course.pk}/"}], **self.bearer())
+
+        self.assertEqual(results[0]["status"], 200)
+        self.assertEqual(results[0]["body"]["id"], self.course.pk)
+
+    def test_session_user_keeps_own_session(self):
+        self.client.force_login(self.student)
+        session_key = self.client.session.session_key
+
+        results = self.batch([{"method": "GET", "path": "/logout/"}, {"method": "GET", "path": f"/api/v1/course/{self.course.pk}/"}])
+
+        self.assertEqual([result["status"] for result in results], [400, 200])
+        self.assertEqual(self.client.session.session_key, session_key)
+        self.assertEqual(self.client.get(f"/api/v1/course/{self.course.pk}/").status_code, 200)
+
+    def test_subrequest_session_is_separate(self):
+        self.client.force_login(self.student)
+        request = self.client.get("/api/v1/course/").wsgi_request
+        outer = Request(request, authenticators=[SessionAuthentication()])
+        outer.user
+
+        subrequest = multiplex.build_request(outer, "GET", "/api/v1/course/", None)
+
+        self.assertIsNot(subrequest.session, request.session)
+        self.assertIsNone(subrequest.session.session_key)
+        self.assertEqual(subrequest.user, self.student)
+
+    def test_parallel_reads_between_writes(self):
+        requests = [
+            {"id": "course", "method": "GET", "path": f"/api/v1/course/{self.course.pk}/"},
+            {"id": "lesson", "method": "GET", "path": f"/api/v1/lesson/{self.lesson.pk}/"},
+            {"id": "comment", "method": "POST", "path": "/api/v1/comment/", "body": {"lesson": self.lesson.pk, "text": "Izoh"}},
+            {"id": "comments", "method": "GET", "path": f"/api/v1/comment/?lesson={self.lesson.pk}"},
+            {"id": "after", "method": "GET", "path": f"/api/v1/lesson/{self.lesson.pk}/"},
+            {"id": "missing", "method": "GET", "path": "/api/v1/lesson/0/"},
+        ]
+
+        self.assertEqual([[item["id"] for item in group] for group in multiplex.get_groups(requests, parallel=True)], [["course", "lesson"], ["comment"], ["comments", "after", "missing"]])
+
+        results = self.batch(requests, parallel=True, **self.bearer())
+
+        self.assertEqual([(result["id"], result["status"]) for result in results], [("course", 200), ("lesson", 200), ("comment", 201), ("comments", 200), ("after", 200), ("missing", 404)])
+        self.assertEqual([comment["text"] for comment in results[4]["body"]["comments"]], ["Izoh"])
+
+    def test_authenticates_once(self):
+        requests = [
+            {"method": "GET", "path": "/api/v1/auth/whoami/"},
+            {"method": "GET", "path": f"/api/v1/course/{self.course.pk}/"},
+            {"method": "GET", "path": f"/api/v1/lesson/{self.lesson.pk}/"},
+        ]
+
+        with mock.patch.object(JWTAuthentication, "authenticate", autospec=True, side_effect=JWTAuthentication.authenticate) as authenticate:
+            results = self.batch(requests, **self.bearer())
+
+        self.assertEqual([result["status"] for result in results], [200, 200, 200])
+        self.assertEqual(results[0]["body"]["email"], self.student.email)
+        self.assertEqual(authenticate.call_count, 1)
+
+    def test_throttle_history_shared_within_batch(self):
+        backend = caches["default"]
+        whoami = {"method": "GET", "path": "/api/v1/auth/whoami/"}
+
+        with mock.patch.object(backend, "get", wraps=backend.get) as get, mock.patch.object(backend, "set", wraps=backend.set) as set_:
+            results = self.batch([whoami, whoami], **self.bearer())
+
+        # Ikkinchi so'rov ham hisobga olinadi (`1/second`), lekin throttle tarixi keshdan bir marta o'qiladi va yoziladi.
+        self.assertEqual([result["status"] for result in results], [200, 429])
+        self.assertEqual(len([call for call in get.call_args_list if call.args[0].startswith("throttle_")]), 1)
+        self.assertEqual(len([call for call in set_.call_args_list if call.args[0].startswith("throttle_")]), 1)
+
+
+@override_settings(SYNC={"PAGE_SIZE": 3, "SETTLE_SECONDS": 0})
+class SyncTestCase(TestCase):
+    """
+    Sinxronlash jurnali ma'lumot bilan bir tranzaksiyada yozilishini, kursor tasdiqlanmagan yozuvlardan oshmasligini
+    va to'liq holat sahifalanishini tekshiradi.
+    """
+
+    def setUp(self):
+        self.student = User.objects.create_user(email="student@example.com", password="password")
+        self.course = Course.objects.create(title="Kurs", description="Tavsif")
+        self.course.students.add(self.student)
+        self.lesson = Lesson.objects.create(course=self.course, name="Dars", video="videos/lesson.mp4")
+        self.comments = [Comment.objects.create(lesson=self.lesson, creator=self.student, text=f"Izoh {number}") for number in range(4)]
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def sync(self, token=None):
+        response = self.client.get("/api/v1/sync/", {"token": token} if token else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def sync_pages(self, token=None):
+        """
+        `has_more` tugaguncha barcha sahifalarni oladi.
+        """
+        pages = [self.sync(token)]
+
+        while pages[-1]["has_more"]:
+            pages.append(self.sync(pages[-1]["token"]))
+
+        return pages
+
+    def test_changes_written_in_transaction(self):
+        with self.captureOnCommitCallbacks():
+            comment = Comment.objects.create(lesson=self.lesson, creator=self.student, text="Yangi izoh")
+
+            # Yozuv `on_commit` callback'larisiz, shu tranzaksiyaning o'zida mavjud.
+            self.assertTrue(Change.objects.filter(kind=Change.COMMENT, object_id=comment.pk, course_id=self.course.pk).exists())
+
+    def test_snapshot_pages(self):
+        pages = self.sync_pages()
+
+        self.assertEqual(len(pages), 2)
+        self.assertEqual([page["reset"] for page in pages], [True, False])
+        self.assertTrue(all(sum(len(page[section]["updated"]) for section in sync.SECTIONS.values()) <= 3 for page in pages))
+        self.assertEqual(sorted(item["id"] for page in pages for item in page["comments"]["updated"]), [comment.pk for comment in self.comments])
+        self.assertEqual([item["id"] for page in pages for item in page["lessons"]["updated"]], [self.lesson.pk])
+
+        # Oxirgi sahifa tokeni delta uchun: yangi o'zgarish bo'lmasa, bo'sh javob.
+        self.assertFalse(any(self.sync(pages[-1]["token"])[section]["updated"] for section in sync.SECTIONS.values()))
+
+    def test_delta_tombstones(self):
+        token = self.sync_pages()[-1]["token"]
+        comment_id = self.comments[0].pk
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.comments[0].delete()
+            self.comments[1].text = "Tahrirlangan"
+            self.comments[1].save()
+
+        data = self.sync(token)
+
+        self.assertEqual(data["comments"]["deleted"], [comment_id])
+        self.assertEqual([item["text"] for item in data["comments"]["updated"]], ["Tahrirlangan"])
+
+    def test_lesson_delete_skips_child_tombstones(self):
+        token = self.sync_pages()[-1]["token"]
+        lesson_id = self.lesson.pk
+
+        with CaptureQueriesContext(connection) as context:
+            self.lesson.delete()
+
+        self.assertFalse(Change.objects.filter(kind=Change.COMMENT, deleted=True).exists())
+        self.assertFalse(any('"project_lesson"."course_id"' in query["sql"] and "LIMIT" in query["sql"] for query in context.captured_queries))
+        self.assertEqual(self.sync(token)["lessons"]["deleted"], [lesson_id])
+
+    def test_cursor_stops_before_unsettled_changes(self):
+        token = self.sync_pages()[-1]["token"]
+        comment = Comment.objects.create(lesson=self.lesson, creator=self.student, text="Yangi izoh")
+
+        with override_settings(SYNC={"SETTLE_SECONDS": 60}):
+            data = self.sync(token)
+
+        # Yangi izoh qaytariladi, lekin kursor uni o'tkazmaydi: keyingi so'rov uni yana oladi.
+        self.assertIn(comment.pk, [item["id"] for item in data["comments"]["updated"]])
+        self.assertIn(comment.pk, [item["id"] for item in self.sync(data["token"])["comments"]["updated"]])
+
+    def test_invalid_token(self):
+        response = self.client.get("/api/v1/sync/", {"token": sync.make_token(User(pk=0), 0)})
+
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(LIVE_FEED={"BROKER": "project.events.DatabaseBroker", "POLL_INTERVAL": 0, "BACKLOG": 3})
+class DatabaseBrokerTestCase(TestCase):
+    """
+    Bir worker'da e'lon qilingan hodisa boshqa worker obunachilariga `LiveEvent` jadvali orqali yetishini
+    va `Last-Event-ID` worker'lar orasida amal qilishini tekshiradi.
+    """
+
+    channel = events.lesson_channel(1)
+
+    def setUp(self):
+        self.workers = [events.EventBus(events.DatabaseBroker(), backlog=3) for _ in range(2)]
+
+        for bus in self.workers:
+            bus.broker.poll()
+
+    def test_event_reaches_other_worker(self):
+        first, second = self.workers
+        first.publish(self.channel, "comment.created", {"id": 1})
+        first.publish(self.channel, "comment.created", {"id": 2})
+
+        for bus in self.workers:
+            self.assertEqual(bus.broker.poll(), 2)
+
+        self.assertEqual([event["data"] for event in second.backlogs[self.channel]], [{"id": 1}, {"id": 2}])
+        self.assertEqual([event["id"] for event in first.backlogs[self.channel]], [event["id"] for event in second.backlogs[self.channel]])
+
+    async def test_resume_on_other_worker(self):
+        first, second = self.workers
+        await sync_to_async(first.publish)(self.channel, "comment.created", {"id": 1})
+        await sync_to_async(first.publish)(self.channel, "comment.created", {"id": 2})
+
+        for bus in self.workers:
+            await sync_to_async(bus.broker.poll)()
+
+        last_event_id = first.backlogs[self.channel][0]["id"]
+        subscription, missed, complete = second.subscribe(self.channel, last_event_id)
+        second.unsubscribe(subscription)
+
+        self.assertTrue(complete)
+        self.assertEqual([event["data"] for event in missed], [{"id": 2}])
+
+    async def test_reset_before_floor(self):
+        for number in range(5):
+            await sync_to_async(self.workers[0].publish)(self.channel, "comment.created", {"id": number})
+
+        # Yangi worker faqat oxirgi `BACKLOG` ta hodisani o'qiydi: undan eski `id` uchun `reset`.
+        bus = events.EventBus(events.DatabaseBroker(), backlog=3)
+        await sync_to_async(bus.broker.poll)()
+        oldest = await LiveEvent.objects.order_by("id").afirst()
+        subscription, missed, complete = bus.subscribe(self.channel, events.make_event_id(bus.broker.epoch, oldest.id))
+        bus.unsubscribe(subscription)
+
+        self.assertFalse(complete)
+
+    def test_late_commit_is_delivered(self):
+        bus = self.workers[0]
+        rows = [LiveEvent.objects.create(channel=self.channel, type="comment.created", data={"id": number}) for number in range(3)]
+        LiveEvent.objects.filter(pk=rows[1].pk).delete()
+
+        # O'rtadagi `id` hali tasdiqlanmagan: keyingi so'rovda paydo bo'lsa ham yetkaziladi.
+        self.assertEqual(bus.broker.poll(), 2)
+        LiveEvent.objects.create(id=rows[1].pk, channel=self.channel, type="comment.created", data={"id": 1})
+
+        self.assertEqual(bus.broker.poll(), 1)
+        self.assertEqual(sorted(event["data"]["id"] for event in bus.backlogs[self.channel]), [0, 1, 2])
+
+
+@override_settings(LIVE_FEED={"HEARTBEAT": 0.05, "RETRY": 1000})
+class LiveFeedTestCase(SimpleTestCase):
+    """
+    Dars hodisalari oqimi (SSE): `Last-Event-ID` bilan davom ettirish, `reset`, navbat to'lishi va heartbeat.
+    """
+
+    channel = events.lesson_channel(1)
+
+    def setUp(self):
+        self.bus = events.EventBus(events.LocalBroker(), backlog=3, queue_size=2)
+        patcher = mock.patch.object(events, "_bus", self.bus)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def publish(self, count):
+        ids = []
+
+        for number in range(count):
+            self.bus.publish(self.channel, "comment.created", {"number": number})
+            ids.append(self.bus.backlogs[self.channel][-1]["id"])
+
+        return ids
+
+    async def read(self, stream, count):
+        return [await anext(stream) for _ in range(count)]
+
+    async def test_resume_from_last_event_id(self):
+        ids = self.publish(3)
+        stream = events.stream(self.channel, ids[0])
+
+        try:
+            chunks = await self.read(stream, 3)
+        finally:
+            await stream.aclose()
+
+        self.assertEqual(chunks[0], "retry: 1000\n\n")
+        self.assertEqual([chunk.split("\n")[0] for chunk in chunks[1:]], [f"id: {ids[1]}", f"id: {ids[2]}"])
+
+    async def test_reset_when_backlog_trimmed(self):
+        ids = self.publish(5)
+        stream = events.stream(self.channel, ids[0])
+
+        try:
+            chunks = await self.read(stream, 2)
+        finally:
+            await stream.aclose()
+
+        self.assertEqual(chunks[1], "event: reset\ndata: {}\n\n")
+
+    async def test_reset_when_event_id_unknown(self):
+        self.publish(2)
+
+        # Jarayon qayta ishga tushgandan keyingi eski (boshqa epoch) va eski formatdagi `id` lar.
+        for last_event_id in (events.make_event_id(self.bus.broker.epoch - 1, 100), "100", "abc"):
+            stream = events.stream(self.channel, last_event_id)
+
+            try:
+                chunks = await self.read(stream, 2)
+            finally:
+                await stream.aclose()
+
+            self.assertEqual(chunks[1], "event: reset\ndata: {}\n\n", last_event_id)
+
+    async def test_event_ids_increase_across_restarts(self):
+        first = self.publish(1)[0]
+        restarted = events.LocalBroker()
+        restarted.epoch = self.bus.broker.epoch + 1
+        second = events.make_event_id(restarted.epoch, 1)
+
+        self.assertGreater(events.parse_event_id(second), events.parse_event_id(first))
+
+    async def test_overflow_closes_stream(self):
+        stream = events.stream(self.channel)
+
+        try:
+            await anext(stream)
+            self.publish(3)
+            chunks = [chunk async for chunk in stream]
+        finally:
+            await stream.aclose()
+
+        self.assertEqual(chunks[-1], "event: overflow\ndata: {}\n\n")
+        self.assertFalse(self.bus.subscribers)
+
+    async def test_heartbeat(self):
+        stream = events.stream(self.channel)
+
+        try:
+            chunks = await self.read(stream, 2)
+        finally:
+            await stream.aclose()
+
+        self.assertEqual(chunks[1], ": heartbeat\n\n")
@@ -1,10 +1,16 @@
+from django.db import transaction
 from django.urls import include, path
-from .views import EmailAPIView
+from .views import ActivityExportAPIView, BatchAPIView, EmailAPIView, ReadinessAPIView, SyncAPIView
 from .routers import router
 
 app_name = 'project'
 
 urlpatterns = [
     path("", include(router.urls)),
-    path("send-notification/", EmailAPIView.as_view())
+    path("send-notification/", EmailAPIView.as_view()),
+    path("export/<str:kind>/", ActivityExportAPIView.as_view()),
+    path("ready/", ReadinessAPIView.as_view()),
+    # Har bir yozuvchi sub-so'rov o'z tranzaksiyasida bajariladi (`multiplex.execute`).
+    path("batch/", transaction.non_atomic_requests(BatchAPIView.as_view())),
+    path("sync/", SyncAPIView.as_view()),
 ]
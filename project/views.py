@@ -1,29 +1,194 @@
+import re
+from collections import Counter
+from itertools import islice
+
 from django.conf import settings
 from django.contrib.auth import get_user_model, logout
+from django.core import signing
 from django.core.mail import EmailMultiAlternatives
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from django.forms.models import model_to_dict
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, resolve_url
 from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils.cache import patch_vary_headers
 from django.utils.decorators import method_decorator
+from django.utils.text import compress_sequence
 from django.views.decorators.cache import cache_page
 from drf_yasg.utils import swagger_auto_schema
-from rest_framework import filters, permissions, viewsets
+from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.exceptions import AuthenticationFailed, NotFound, ValidationError
 from rest_framework.generics import GenericAPIView
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
+from rest_framework.permissions import IsAdminUser
+from rest_framework.renderers import JSONRenderer
 from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
+from rest_framework.utils.urls import replace_query_param
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from .models import Comment, Course, Lesson, Rating
-from .permissions import IsAdminUser, IsCourseStudent, IsCreator, IsStudent
-from .serializers import CommentSerializer, CourseSerializer, EmailTextSerializer, LessonSerializer, LoginSerializer, RatingSerializer, RegisterSerializer, StudentIdSerializer, StudentSerializer
+from . import archive, events, exports, leaderboard, multiplex, progress, server, sync
+from .caching import ConditionalGetMixin, conditional_cache
+from .models import Change, Comment, Course, Lesson, Rating
+from .permissions import IsCourseStudent, IsCreator, IsStudent
+from .renderers import CSVRenderer, EventStreamRenderer, NDJSONRenderer, StreamingJSONRenderer
+from .serializers import BatchRequestSerializer, CommentHistoryParamsSerializer, CommentHistorySerializer, CommentSerializer, CourseProgressSerializer, CourseSerializer, CourseStudentsParamsSerializer, EmailTextSerializer, EnrollmentSerializer, ExportParamsSerializer, LeaderboardEntrySerializer, LeaderboardParamsSerializer, LessonRatingSerializer, LessonSerializer, LoginSerializer, ProgressEventSerializer, RatingSerializer, RatingUpsertSerializer, RegisterSerializer, StudentIdSerializer, StudentSerializer, SyncCourseSerializer, SyncLessonSerializer, SyncParamsSerializer
+from .signals import publish_comment_event, publish_rating_event
 
 User = get_user_model()
 
+accepts_gzip = re.compile(r"\bgzip\b")
+
+
+def chunked(iterable, size):
+    """
+    Iterable elementlarini `size` o'lchamli ro'yxatlarga bo'lib beradi.
+    """
+    iterator = iter(iterable)
+
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class StreamingListMixin:
+    """
+    StreamingListMixin
+
+    `?stream=true` parametri bilan `list` javobini `StreamingHttpResponse` orqali bo'laklab uzatadi.
+    `page` parametri bo'lsa - shu sahifa, bo'lmasa - butun ro'yxat `iterator(chunk_size=...)` bilan o'qiladi,
+    shuning uchun xotira sarfi javob hajmiga emas, bo'lak hajmiga bog'liq. Mijoz qabul qilsa, javob gzip bilan siqiladi.
+    """
+
+    stream_chunk_size = 100
+
+    def is_stream_request(self, request):
+        return self.action == "list" and request.query_params.get("stream", "").lower() in ("1", "true")
+
+    def get_content_encoding(self, request):
+        """
+        Oqim javobining kodlashi: `gzip` yoki `identity`; oqim so'ralmagan bo'lsa `None` (javob `Accept-Encoding` ga bog'liq emas).
+        """
+        if not self.is_stream_request(request):
+            return None
+
+        return "gzip" if accepts_gzip.search(request.headers.get("Accept-Encoding", "")) else "identity"
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_stream_request(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+
+        if not queryset.ordered:
+            queryset = queryset.order_by("pk")
+
+        envelope = None
+
+        if self.paginator is not None and self.paginator.page_query_param in request.query_params:
+            objects = self.paginate_queryset(queryset)
+            envelope = {
+                "count": self.paginator.page.paginator.count,
+                "next": self.paginator.get_next_link(),
+                "previous": self.paginator.get_previous_link(),
+            }
+        else:
+            objects = queryset.iterator(chunk_size=self.stream_chunk_size)
+
+        chunks = (self.get_serializer(chunk, many=True).data for chunk in chunked(objects, self.stream_chunk_size))
+        content = StreamingJSONRenderer().render_stream(chunks, envelope)
+
+        response = StreamingHttpResponse(content, content_type="application/json")
+        patch_vary_headers(response, ["Accept-Encoding"])
+
+        if self.get_content_encoding(request) == "gzip":
+            response.streaming_content = compress_sequence(response.streaming_content)
+            response["Content-Encoding"] = "gzip"
+
+        return response
+
+
+class ResponsePrefetchMixin:
+    """
+    ResponsePrefetchMixin
+
+    Javobida ichki ob'ektlar chiqadigan amallar uchun `response_prefetch_related` ni qo'llaydi: `list`/`retrieve`
+    queryset'iga qo'shiladi, yangilashdan keyin esa ob'ekt javobdan oldin prefetch bilan qayta o'qiladi (DRF
+    yangilangan ob'ektning prefetch keshini tozalaydi). Ichki ob'ektlarni o'qimaydigan amallar ularni yuklamaydi.
+    """
+
+    response_prefetch_related = []
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        if self.action in ("list", "retrieve"):
+            queryset = queryset.prefetch_related(*self.response_prefetch_related)
+
+        return queryset
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        serializer.instance = self.get_queryset().prefetch_related(*self.response_prefetch_related).get(pk=serializer.instance.pk)
+
+
+class BatchCreateMixin:
+    """
+    BatchCreateMixin
+
+    Bitta so'rovda bir nechta ob'ekt yaratish uchun `POST .../batch/` amalini qo'shadi.
+    Har bir element alohida tekshiriladi, to'g'rilari bitta tranzaksiyada `bulk_create` orqali saqlanadi
+    va har bir element uchun natija (yoki xatolik) qaytariladi.
+    """
+
+    batch_size_limit = 100
+    batch_item_status = status.HTTP_201_CREATED
+
+    @action(methods=["POST"], detail=False, url_path="batch", parser_classes=[JSONParser])
+    def batch_create(self, request, *args, **kwargs):
+        """
+        Ro'yxat ko'rinishidagi ma'lumotlardan ob'ektlarni yaratadi.
+
+        Returns:
+        - Har bir element uchun `status` va `data` yoki `errors`. Barchasi saqlansa `201`, aks holda `207`.
+        """
+        if not isinstance(request.data, list):
+            raise ValidationError("Ma'lumotlar ro'yxat ko'rinishida yuborilishi kerak.")
+
+        if len(request.data) > self.batch_size_limit:
+            raise ValidationError(f"Bir so'rovda ko'pi bilan {self.batch_size_limit} ta element yuborish mumkin.")
+
+        serializer = self.get_serializer(data=request.data, many=True)
+        results = [None] * len(request.data)
+        valid = []
+
+        for index, item in enumerate(request.data):
+            try:
+                valid.append((index, serializer.child.run_validation(item)))
+            except ValidationError as exc:
+                results[index] = {"status": status.HTTP_400_BAD_REQUEST, "errors": exc.detail}
+
+        if valid:
+            model = self.get_queryset().model
+            objects = [model(creator=request.user, **validated_data) for _, validated_data in valid]
+
+            with transaction.atomic():
+                objects = self.perform_batch_create(objects)
+
+            data = self.get_serializer(objects, many=True).data
+
+            for (index, _), item in zip(valid, data):
+                results[index] = {"status": self.batch_item_status, "data": item}
+
+        failed = any(result["status"] == status.HTTP_400_BAD_REQUEST for result in results)
+
+        return Response(results, status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_201_CREATED)
+
+    def perform_batch_create(self, objects):
+        return self.get_queryset().model.objects.bulk_create(objects)
+
 
 class AuthViewset(viewsets.GenericViewSet):
     """
@@ -44,7 +209,7 @@ class AuthViewset(viewsets.GenericViewSet):
     parser_classes = [JSONParser]
     pagination_class = None
     filter_backends = []
-    throttle_classes = [AnonRateThrottle, UserRateThrottle]
+    throttle_classes = [multiplex.AnonRateThrottle, multiplex.UserRateThrottle]
 
     @swagger_auto_schema(request_body=RegisterSerializer)
     @action(methods=["POST"], detail=False)
@@ -108,7 +273,7 @@ class AuthViewset(viewsets.GenericViewSet):
         return Response(StudentSerializer(request.user, context={"request": request}).data)
 
 
-class CourseViewset(viewsets.ModelViewSet):
+class CourseViewset(ResponsePrefetchMixin, ConditionalGetMixin, StreamingListMixin, viewsets.ModelViewSet):
     """
     CourseViewset
 
@@ -117,19 +282,36 @@ class CourseViewset(viewsets.ModelViewSet):
     Methods:
         - add_student: Kursga talaba qo'shish.
         - remove_student: Kursdan talabani olib tashlash.
-        - list: Kurslar ro'yxatini olish (keshlangan).
-        - retrieve: Bitta kurs ma'lumotlarini olish (keshlangan).
+        - students: Kurs talabalari ro'yxati (keyset sahifalash va qidiruv bilan).
+        - progress: Joriy talabaning kurs bo'yicha progressi.
+        - list: Kurslar ro'yxatini olish (keshlangan, ETag bilan, `?stream=true` bilan oqim ko'rinishida).
+        - retrieve: Bitta kurs ma'lumotlarini olish (keshlangan, ETag/Last-Modified bilan).
     """
 
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
     permission_classes = [permissions.IsAuthenticated, IsStudent]
     search_fields = ["title", "description"]
+    response_prefetch_related = ["lessons__comments__creator"]
 
     def get_queryset(self):
-        return super().get_queryset().filter(students=self.request.user) if not self.request.user.is_staff else super().get_queryset()
+        if getattr(self, "swagger_fake_view", False):
+            return super().get_queryset().none()
 
-    @swagger_auto_schema(request_body=StudentIdSerializer, responses={200: CourseSerializer})
+        queryset = super().get_queryset()
+
+        return queryset.filter(students=self.request.user) if not self.request.user.is_staff else queryset
+
+    def get_enrollment(self, course, student):
+        """
+        Kursga yozilish holati haqida qisqa javob tayyorlaydi.
+        """
+        course.refresh_from_db(fields=["student_count"])
+        enrolled = course.students.filter(pk=student.pk).exists()
+
+        return EnrollmentSerializer({"course": course.pk, "student": student.pk, "enrolled": enrolled, "student_count": course.student_count}).data
+
+    @swagger_auto_schema(request_body=StudentIdSerializer, responses={200: EnrollmentSerializer})
     @action(methods=["POST"], detail=True, permission_classes=[IsAdminUser], url_path="add-student", url_name="add_student", serializer_class=StudentIdSerializer)
     def add_student(self, request, pk):
         """
@@ -142,21 +324,21 @@ class CourseViewset(viewsets.ModelViewSet):
         - Agar talaba allaqachon kursga qo'shilgan bo'lsa, `ValidationError` qaytaradi.
 
         Returns:
-        - Yangilangan kurs ma'lumotlarini qaytaradi.
+        - Kurs, talaba va kursdagi talabalar soni.
         """
         course = self.get_object()
 
         user_id = request.data.get("student_id", None)
         student = get_object_or_404(User, pk=user_id)
 
-        if student in course.students.all():
+        if course.students.filter(pk=student.pk).exists():
             raise ValidationError("Talaba allaqachon kursga qo'shilgan.")
 
         course.students.add(student)
 
-        return Response(CourseSerializer(course).data)
+        return Response(self.get_enrollment(course, student))
 
-    @swagger_auto_schema(request_body=StudentIdSerializer, responses={200: CourseSerializer})
+    @swagger_auto_schema(request_body=StudentIdSerializer, responses={200: EnrollmentSerializer})
     @action(methods=["POST"], detail=True, permission_classes=[IsAdminUser], url_path="remove-student", url_name="remove_student", serializer_class=StudentIdSerializer)
     def remove_student(self, request, pk):
         """
@@ -169,28 +351,79 @@ class CourseViewset(viewsets.ModelViewSet):
         - Agar talaba kursga qo'shilmagan bo'lsa, `ValidationError` qaytaradi.
 
         Returns:
-        - Yangilangan kurs ma'lumotlarini qaytaradi.
+        - Kurs, talaba va kursdagi talabalar soni.
         """
         course = self.get_object()
 
         user_id = request.data.get("student_id", None)
         student = get_object_or_404(User, pk=user_id)
 
-        if student not in course.students.all():
+        if not course.students.filter(pk=student.pk).exists():
             raise ValidationError("Talaba kursga  qo'shilmagan.")
 
         course.students.remove(student)
 
-        return Response(CourseSerializer(course).data)
+        return Response(self.get_enrollment(course, student))
 
-    @method_decorator(cache_page(60 * 5))
+    @swagger_auto_schema(query_serializer=CourseStudentsParamsSerializer, responses={200: StudentSerializer(many=True)})
+    @action(methods=["GET"], detail=True, pagination_class=None, filter_backends=[])
+    def students(self, request, pk):
+        """
+        Kurs talabalarini `id` bo'yicha o'sish tartibida qaytaradi.
+
+        Sahifalash `after` kursori bilan (keyset): `OFFSET` ishlatilmaydi, shuning uchun katta kurslarda ham
+        har bir sahifa bir xil tez qaytadi.
+
+        Params:
+        - `after`: Shu `id` dan keyingi talabalar.
+        - `limit`: Sahifadagi talabalar soni (ko'pi bilan 200).
+        - `search`: Email yoki ism bo'yicha qidiruv.
+
+        Returns:
+        - `results`, kursdagi jami talabalar soni `count` va keyingi sahifa manzili `next`.
+        """
+        course = self.get_object()
+
+        params = CourseStudentsParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        limit = params.validated_data["limit"]
+        students = course.students.order_by("pk")
+
+        if "after" in params.validated_data:
+            students = students.filter(pk__gt=params.validated_data["after"])
+
+        if search := params.validated_data.get("search"):
+            students = students.filter(Q(email__icontains=search) | Q(first_name__icontains=search) | Q(last_name__icontains=search))
+
+        students = list(students[:limit + 1])
+        has_more = len(students) > limit
+        students = students[:limit]
+        next_url = replace_query_param(request.build_absolute_uri(), "after", students[-1].pk) if has_more else None
+
+        return Response({"count": course.student_count, "next": next_url, "results": StudentSerializer(students, many=True).data})
+
+    @conditional_cache(60 * 5)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
-    @method_decorator(cache_page(60 * 5))
+    @conditional_cache(60 * 5)
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
+    @swagger_auto_schema(responses={200: CourseProgressSerializer})
+    @action(methods=["GET"], detail=True)
+    def progress(self, request, pk):
+        """
+        Joriy talabaning kurs darslari bo'yicha progressini qaytaradi.
+
+        Returns:
+        - Darslar soni, tugatilganlari, foizi va har bir dars bo'yicha oxirgi pozitsiya.
+        """
+        course = self.get_object()
+
+        return Response(CourseProgressSerializer(progress.get_course_summary(request.user.pk, course)).data)
+
     def get_serializer_class(self):
         if self.action in ["remove_student", "add_student"]:
             return StudentIdSerializer
@@ -198,15 +431,20 @@ class CourseViewset(viewsets.ModelViewSet):
         return self.serializer_class
 
 
-class LessonViewset(viewsets.ModelViewSet):
+class LessonViewset(ResponsePrefetchMixin, ConditionalGetMixin, StreamingListMixin, viewsets.ModelViewSet):
     """
     LessonViewset
 
     Darslar bilan bog'liq CRUD amallarni boshqaruvchi viewset. Ushbu viewset orqali darslarni yaratish, yangilash, o'chirish va ko'rish mumkin. Foydalanuvchi faqat o'zi ro'yxatda bo'lgan kursning darslarini ko'rishi mumkin.
 
     Methods:
-        - list: Darslar ro'yxatini olish (keshlangan).
-        - retrieve: Bitta dars ma'lumotlarini olish (keshlangan).
+        - list: Darslar ro'yxatini olish (keshlangan, ETag bilan, `?stream=true` bilan oqim ko'rinishida).
+        - retrieve: Bitta dars ma'lumotlarini olish (keshlangan, ETag/Last-Modified bilan).
+        - live: Dars izohlari va reytingi o'zgarishlarining jonli oqimi (SSE).
+        - rating: Foydalanuvchining darsga bahosini qo'yish/o'zgartirish yoki o'chirish.
+        - comments: Dars izohlari tarixi (arxivlangan izohlar bilan birga, sahifalab).
+        - progress: Dars ko'rish holatini (heartbeat) yuborish.
+        - leaderboard: Reyting yoki izohlar soni bo'yicha eng yaxshi darslar (global yoki kurs bo'yicha).
     """
 
     queryset = Lesson.objects.all()
@@ -216,20 +454,175 @@ class LessonViewset(viewsets.ModelViewSet):
     filterset_fields = ["course", "created_at"]
     search_fields = ["name"]
     ordering_fields = ["name", "created_at", "pk"]
+    response_prefetch_related = ["comments__creator"]
 
     def get_queryset(self):
-        return super().get_queryset().filter(course__students=self.request.user) if not self.request.user.is_staff else super().get_queryset()
+        if getattr(self, "swagger_fake_view", False):
+            return super().get_queryset().none()
 
-    @method_decorator(cache_page(60 * 5))
+        queryset = super().get_queryset()
+
+        return queryset.filter(course__students=self.request.user) if not self.request.user.is_staff else queryset
+
+    @conditional_cache(60 * 5)
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
-    @method_decorator(cache_page(60 * 5))
+    @conditional_cache(60 * 5)
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
+    @swagger_auto_schema(responses={200: "text/event-stream"})
+    @action(methods=["GET"], detail=True, renderer_classes=[EventStreamRenderer, JSONRenderer])
+    def live(self, request, pk):
+        """
+        Dars izohlari va reytingi o'zgarishlarini Server-Sent Events orqali uzatadi.
+
+        ASGI serverda (`serve` buyrug'i, uvicorn worker'lari) ishlaydi: WSGI worker'da har bir ulanish butun oqimni
+        band qiladi. Qayta ulanganda `Last-Event-ID` sarlavhasi (yoki `last_event_id` parametri)
+        yuborilsa, faqat o'tkazib yuborilgan hodisalar qaytariladi.
+
+        Hodisalar:
+        - `comment.created`, `comment.updated`, `comment.deleted`
+        - `rating.changed`
+        - `reset`: o'tkazib yuborilgan hodisalar backlogda qolmagan yoki `Last-Event-ID` noma'lum (masalan, server
+          qayta ishga tushgan), ma'lumotlarni qayta yuklash kerak.
+        - `overflow`: mijoz sekin o'qiyapti, ulanish yopiladi va qayta ulanish kerak.
+        """
+        lesson = self.get_object()
+
+        last_event_id = request.headers.get("Last-Event-ID") or request.query_params.get("last_event_id") or None
+
+        response = StreamingHttpResponse(events.stream(events.lesson_channel(lesson.pk), last_event_id), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+
+        return response
+
+    @swagger_auto_schema(methods=["PUT"], request_body=RatingUpsertSerializer, responses={200: LessonRatingSerializer})
+    @swagger_auto_schema(methods=["DELETE"], request_body=None, responses={200: LessonRatingSerializer})
+    @action(methods=["PUT", "DELETE"], detail=True, parser_classes=[JSONParser, FormParser, MultiPartParser], serializer_class=RatingUpsertSerializer)
+    def rating(self, request, pk):
+        """
+        Joriy foydalanuvchining darsga bahosini bitta so'rovda qo'yadi yoki o'chiradi.
+
+        Params (PUT):
+        - `liked`: Dars yoqdimi yoki yo'qmi.
+
+        `(lesson, creator)` bo'yicha bitta baho saqlanadi, shuning uchun so'rovni takrorlash xavfsiz.
+        Dars hisoblagichlari shu tranzaksiya ichida yangilanadi.
+
+        Returns:
+        - Foydalanuvchi bahosi va darsning yangi reytingi.
+        """
+        lesson = self.get_object()
+        liked = None
+
+        with transaction.atomic():
+            if request.method == "PUT":
+                serializer = RatingUpsertSerializer(data=request.data)
+                serializer.is_valid(raise_exception=True)
+                liked = serializer.validated_data["liked"]
+
+                Rating.objects.update_or_create(lesson=lesson, creator=request.user, defaults={"liked": liked})
+            else:
+                Rating.objects.filter(lesson=lesson, creator=request.user).delete()
+
+            lesson.refresh_from_db(fields=["likes_count", "ratings_count"])
+
+        data = {
+            "lesson": lesson.pk,
+            "liked": liked,
+            "rating": lesson.rating,
+            "likes_count": lesson.likes_count,
+            "ratings_count": lesson.ratings_count,
+        }
+
+        return Response(LessonRatingSerializer(data).data)
+
+    @swagger_auto_schema(request_body=ProgressEventSerializer, responses={202: "Qabul qilindi"})
+    @action(methods=["POST"], detail=True, parser_classes=[JSONParser, FormParser], serializer_class=ProgressEventSerializer)
+    def progress(self, request, pk):
+        """
+        Dars ko'rish holatini qabul qiladi.
+
+        Hodisa darhol bazaga yozilmaydi: xotiradagi buferga qo'shiladi va boshqa hodisalar bilan birga
+        bitta upsert orqali `LessonProgress` jadvaliga yoziladi.
+
+        Params:
+        - `position`: Videodagi joriy pozitsiya (soniya).
+        - `completed`: Dars tugatildimi (ixtiyoriy; pozitsiya davomiylikning 90% idan oshsa avtomatik).
+        """
+        lesson = self.get_object()
+
+        serializer = ProgressEventSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        position = serializer.validated_data["position"]
+        completed = serializer.validated_data["completed"] or bool(lesson.media_duration and position >= lesson.media_duration * 0.9)
 
-class CommentViewset(viewsets.ModelViewSet):
+        progress.record(request.user.pk, lesson.pk, position, completed)
+
+        return Response({"lesson": lesson.pk, "position": position, "completed": completed}, status=status.HTTP_202_ACCEPTED)
+
+    @swagger_auto_schema(query_serializer=LeaderboardParamsSerializer, responses={200: LeaderboardEntrySerializer(many=True)})
+    @action(methods=["GET"], detail=False, pagination_class=None, filter_backends=[])
+    def leaderboard(self, request):
+        """
+        Eng yaxshi darslar ro'yxatini qaytaradi.
+
+        Ballar darslar jadvalida izoh yoki baho bilan bir tranzaksiyada yangilanadi, bu amal esa ularni
+        indeks bo'yicha bitta so'rov bilan o'qiydi.
+
+        Params:
+        - `metric`: `rating` (Wilson bahosi bo'yicha) yoki `comments` (izohlar soni bo'yicha).
+        - `course`: Kurs ID'si (talabalar uchun majburiy, faqat o'zi o'qiyotgan kurs).
+        - `limit`: Darslar soni.
+        """
+        params = LeaderboardParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        course_id = params.validated_data.get("course")
+
+        if not request.user.is_staff:
+            if course_id is None:
+                raise ValidationError({"course": "Kurs ko'rsatilishi shart."})
+
+            if not Course.objects.filter(pk=course_id, students=request.user).exists():
+                raise NotFound("Kurs topilmadi.")
+
+        entries = leaderboard.get_top(params.validated_data["metric"], course_id, params.validated_data.get("limit"))
+
+        return Response(LeaderboardEntrySerializer(entries, many=True).data)
+
+    @swagger_auto_schema(query_serializer=CommentHistoryParamsSerializer, responses={200: CommentHistorySerializer(many=True)})
+    @action(methods=["GET"], detail=True, url_path="comments", pagination_class=None, filter_backends=[])
+    def comments(self, request, pk):
+        """
+        Dars izohlarini yangidan eskiga qarab qaytaradi.
+
+        Dars javobida faqat asosiy jadvaldagi izohlar bo'ladi; bu amal esa `before` kursori bilan
+        eskiroq izohlarni, jumladan arxivlanganlarini ham uzluksiz qaytaradi.
+
+        Params:
+        - `before`: Shu `id` dan oldingi izohlar.
+        - `limit`: Sahifadagi izohlar soni (ko'pi bilan 100).
+
+        Returns:
+        - `results` va keyingi sahifa manzili `next`.
+        """
+        lesson = self.get_object()
+
+        params = CommentHistoryParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+
+        comments, has_more = archive.get_comment_history(lesson.pk, before=params.validated_data.get("before"), limit=params.validated_data["limit"])
+        next_url = replace_query_param(request.build_absolute_uri(), "before", comments[-1].pk) if has_more else None
+
+        return Response({"next": next_url, "results": CommentHistorySerializer(comments, many=True).data})
+
+
+class CommentViewset(BatchCreateMixin, viewsets.ModelViewSet):
     """
     CommentViewset
 
@@ -238,9 +631,10 @@ class CommentViewset(viewsets.ModelViewSet):
     Methods:
         - list: Izohlar ro'yxatini olish (keshlangan).
         - retrieve: Bitta izoh ma'lumotlarini olish (keshlangan).
+        - batch_create: Bir nechta izohni bitta so'rovda yaratish.
     """
 
-    queryset = Comment.objects.all()
+    queryset = Comment.objects.select_related("creator")
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated, IsCreator]
     search_fields = ["text"]
@@ -253,6 +647,22 @@ class CommentViewset(viewsets.ModelViewSet):
     def perform_update(self, serializer):
         serializer.save(creator_id=self.request.user.id)
 
+    def perform_batch_create(self, objects):
+        objects = Comment.objects.bulk_create(objects)
+
+        for comment in objects:
+            publish_comment_event(comment, "comment.created")
+
+        counts = Counter(comment.lesson_id for comment in objects)
+
+        for lesson_id, count in counts.items():
+            Lesson.increment_comments_count(lesson_id, count)
+
+        Lesson.touch(*counts)
+        sync.record_many([Change(kind=Change.COMMENT, object_id=comment.pk, course_id=comment.lesson.course_id) for comment in objects])
+
+        return objects
+
     @method_decorator(cache_page(60 * 5))
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
@@ -262,7 +672,7 @@ class CommentViewset(viewsets.ModelViewSet):
         return super().retrieve(request, *args, **kwargs)
 
 
-class RatingViewset(viewsets.ModelViewSet):
+class RatingViewset(BatchCreateMixin, viewsets.ModelViewSet):
     """
     RatingViewset
 
@@ -271,11 +681,13 @@ class RatingViewset(viewsets.ModelViewSet):
     Methods:
         - list: Reytinglar ro'yxatini olish (keshlangan).
         - retrieve: Bitta reyting ma'lumotlarini olish (keshlangan).
+        - batch_create: Bir nechta bahoni bitta so'rovda qo'yish yoki yangilash.
     """
 
-    queryset = Rating.objects.all()
+    queryset = Rating.objects.select_related("creator")
     serializer_class = RatingSerializer
     permission_classes = [permissions.IsAuthenticated, IsCreator]
+    batch_item_status = status.HTTP_200_OK
 
     @method_decorator(cache_page(60 * 5))
     def list(self, request, *args, **kwargs):
@@ -286,10 +698,201 @@ class RatingViewset(viewsets.ModelViewSet):
         return super().retrieve(request, *args, **kwargs)
 
     def perform_create(self, serializer):
-        serializer.save(creator_id=self.request.user.id)
+        try:
+            with transaction.atomic():
+                serializer.save(creator_id=self.request.user.id)
+        except IntegrityError:
+            raise ValidationError("Siz bu darsni allaqachon baholagansiz.")
 
     def perform_update(self, serializer):
-        serializer.save(creator_id=self.request.user.id)
+        try:
+            with transaction.atomic():
+                serializer.save(creator_id=self.request.user.id)
+        except IntegrityError:
+            raise ValidationError("Siz bu darsni allaqachon baholagansiz.")
+
+    def perform_batch_create(self, objects):
+        """
+        Baholarni `(lesson, creator)` bo'yicha bitta `INSERT ... ON CONFLICT` bilan saqlaydi
+        va o'zgargan darslar hisoblagichlarini yangilaydi.
+        """
+        latest = {rating.lesson_id: rating for rating in objects}
+
+        Rating.objects.bulk_create(latest.values(), update_conflicts=True, unique_fields=["lesson", "creator"], update_fields=["liked"])
+
+        for lesson_id in latest:
+            Lesson.refresh_rating_counts(lesson_id)
+            publish_rating_event(lesson_id)
+
+        Lesson.touch(*latest)
+
+        changes = []
+
+        for pk, lesson_id, course_id in Rating.objects.filter(lesson_id__in=latest, creator=self.request.user).values_list("pk", "lesson_id", "lesson__course_id"):
+            changes += [
+                Change(kind=Change.RATING, object_id=pk, course_id=course_id),
+                Change(kind=Change.LESSON, object_id=lesson_id, course_id=course_id),
+            ]
+
+        sync.record_many(changes)
+
+        return [latest[rating.lesson_id] for rating in objects]
+
+
+class ActivityExportAPIView(GenericAPIView):
+    """
+    ActivityExportAPIView
+
+    Kurs faoliyatini (izohlar, baholar, kursga yozilishlar) NDJSON yoki CSV ko'rinishida oqim bilan eksport qiladi.
+    Format `?format=ndjson|csv` yoki `Accept` sarlavhasi orqali tanlanadi.
+
+    Methods:
+        - get: Eksportni yuklab olish.
+
+    Params:
+        - `course`: Faqat shu kurs bo'yicha.
+        - `since`, `until`: Vaqt oralig'i (faqat izohlar uchun; baholar va yozilishlar uchun berilsa `400`).
+        - `after_id`: Oxirgi eksport qilingan `id` dan keyingilari (to'xtagan joydan davom ettirish uchun).
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    serializer_class = ExportParamsSerializer
+    pagination_class = None
+    filter_backends = []
+
+    @swagger_auto_schema(query_serializer=ExportParamsSerializer)
+    def get(self, request, kind, *args, **kwargs):
+        if kind not in exports.EXPORT_FIELDS:
+            raise NotFound(f"Noma'lum eksport turi: {kind}")
+
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        params = serializer.validated_data
+        file_format = request.accepted_renderer.format
+
+        if kind not in exports.TIMESTAMP_FIELDS:
+            unsupported = [name for name in ("since", "until") if name in params]
+
+            if unsupported:
+                raise ValidationError({name: f"{kind} eksportini vaqt bo'yicha filtrlash mumkin emas." for name in unsupported})
+
+        content = exports.export(
+            kind,
+            file_format=file_format,
+            course_id=params.get("course"),
+            since=params.get("since"),
+            until=params.get("until"),
+            after_id=params.get("after_id"),
+        )
+
+        response = StreamingHttpResponse(content, content_type=request.accepted_renderer.media_type)
+        response["Content-Disposition"] = f'attachment; filename="{kind}.{file_format}"'
+
+        return response
+
+
+class BatchAPIView(GenericAPIView):
+    """
+    BatchAPIView
+
+    Bir nechta API so'rovini bitta HTTP so'rovda bajaradi. Sub-so'rovlar mavjud router orqali jarayon ichida
+    bajariladi (faqat `/api/v1/` manzillari): autentifikatsiya tashqi so'rovda bir marta bajariladi, throttle
+    tarixi batch keshi orqali ulashiladi, har bir sub-so'rov alohida sessiya oladi, middleware qayta ishlamaydi.
+
+    Methods:
+        - post: Sub-so'rovlarni bajarish.
+
+    Params:
+        - `requests`: `method`, `path` (masalan, `/api/v1/course/1/`), ixtiyoriy `body` va `id` lardan iborat ro'yxat
+          (ko'pi bilan `BATCH_API["MAX_REQUESTS"]` ta).
+        - `parallel`: Yozuvchi so'rovlar orasidagi GET so'rovlarni bir vaqtda bajarish.
+    """
+
+    parser_classes = [JSONParser]
+    serializer_class = BatchRequestSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None
+    filter_backends = []
+
+    @swagger_auto_schema(request_body=BatchRequestSerializer, responses={200: "Sub-so'rovlar natijalari (`id`, `status`, `headers`, `body`)"})
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        items = serializer.validated_data["requests"]
+        limit = multiplex.get_setting("MAX_REQUESTS")
+
+        if len(items) > limit:
+            raise ValidationError({"requests": [f"Bitta so'rovda ko'pi bilan {limit} ta sub-so'rov bo'lishi mumkin."]})
+
+        results = multiplex.execute_all(request, items, type(self), parallel=serializer.validated_data["parallel"])
+
+        return Response({"results": results})
+
+
+class SyncAPIView(GenericAPIView):
+    """
+    SyncAPIView
+
+    Offline mijozlar uchun delta sinxronlash. Tokensiz so'rov foydalanuvchi kurslarining to'liq holatini, tokenli so'rov
+    esa faqat shu tokendan keyingi o'zgarishlarni (o'chirilganlar - `deleted` ro'yxatida) qaytaradi. Ikkalasi ham
+    sahifalanadi: `has_more` bo'lsa, keyingi sahifa javobdagi token bilan so'raladi. O'chirilgan kurs yoki dars
+    ichidagi izoh va baholar alohida `deleted` ro'yxatida kelmaydi.
+
+    Methods:
+        - get: O'zgarishlarni olish.
+
+    Params:
+        - `token`: Oldingi javobdagi `token`.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = SyncParamsSerializer
+    pagination_class = None
+    filter_backends = []
+
+    section_serializers = {
+        "courses": SyncCourseSerializer,
+        "lessons": SyncLessonSerializer,
+        "comments": CommentSerializer,
+        "ratings": RatingSerializer,
+    }
+
+    @swagger_auto_schema(query_serializer=SyncParamsSerializer, responses={200: "`token`, `reset`, `has_more` va bo'limlar (`updated`, `deleted`)"})
+    def get(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        token = serializer.validated_data.get("token")
+
+        if token is None:
+            changes = sync.get_snapshot(request.user)
+        else:
+            try:
+                since, position = sync.read_token(request.user, token)
+            except signing.BadSignature:
+                raise ValidationError({"token": "Sync token noto'g'ri."})
+
+            if position is not None:
+                changes = sync.get_snapshot(request.user, since, position)
+            else:
+                changes = sync.get_delta(request.user, since)
+
+        data = {
+            "token": sync.make_token(request.user, changes["change_id"], changes["position"]),
+            "reset": changes["reset"],
+            "has_more": changes["has_more"],
+        }
+
+        for section, section_serializer in self.section_serializers.items():
+            data[section] = {
+                "updated": section_serializer(changes[section]["updated"], many=True, context={"request": request}).data,
+                "deleted": changes[section]["deleted"],
+            }
+
+        return Response(data)
 
 
 class EmailAPIView(GenericAPIView):
@@ -317,13 +920,14 @@ class EmailAPIView(GenericAPIView):
         for_admin = serializer.validated_data.get("for_admin", False)
         for_student = serializer.validated_data.get("for_student", False)
 
-        users = User.objects.all()
+        # `model_to_dict` ko'p-ko'pga maydonlarni ham o'qiydi, shuning uchun ular oldindan yuklanadi.
+        users = User.objects.prefetch_related("groups", "user_permissions")
 
         if for_admin and not for_student:
-            users = User.objects.filter(is_staff=True)
+            users = users.filter(is_staff=True)
 
         elif for_student and not for_admin:
-            users = User.objects.filter(is_staff=False)
+            users = users.filter(is_staff=False)
 
         for user in users:
             msg = EmailMultiAlternatives(
@@ -365,3 +969,25 @@ def logout_view(request):
     next_page = request.GET.get("next", "/api/")
     logout(request)
     return redirect(next_page)
+
+
+class ReadinessAPIView(GenericAPIView):
+    """
+    ReadinessAPIView
+
+    Load balancer uchun tayyorlik tekshiruvi: ilova `server.warm_up()` bilan qizdirilgunga qadar 503 qaytaradi.
+
+    Methods:
+        - get: Tayyorlik holatini olish.
+    """
+
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    throttle_classes = []
+
+    @swagger_auto_schema(responses={200: "Tayyor", 503: "Tayyor emas"})
+    def get(self, request, *args, **kwargs):
+        if not server.is_ready():
+            return Response({"status": "starting"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        return Response({"status": "ready"})